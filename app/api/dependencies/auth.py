@@ -1,8 +1,20 @@
+import logging
 from datetime import datetime, timedelta, timezone
 from typing import Annotated
 from app.models import *
 import jwt
 from app.api.dependencies.password_utils import *
+from app.api.exceptions.global_exceptions import PasswordHashingUnavailableException
+from app.api.dependencies.token_cache import verified_token_cache
+from app.api.dependencies.principal_cache import (
+    Principal,
+    principal_cache,
+    principal_statement,
+    to_principal,
+)
+from app.db.database import DB_ASYNC_ENABLED, get_session
+from starlette.concurrency import run_in_threadpool
+from uuid import UUID
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jwt.exceptions import InvalidTokenError
@@ -13,6 +25,8 @@ ALGORITHM = os.getenv("ALGORITHM", "HS256")
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", 30))
 
 
+logger = logging.getLogger(__name__)
+
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 # this is a fake DB, I will remove it when adding the real DB
 user_db = {
@@ -36,14 +50,16 @@ def get_user(db, username: str):
         return None
 
 
-def authenticate_user(username: str, password: str):
+async def authenticate_user(username: str, password: str):
     try:
         user = get_user(user_db, username)
         if not user:
             return False
-        if not verify_password(password, user.hashed_password):
+        if not await verify_password_async(password, user.hashed_password):
             return False
         return user
+    except PasswordHashingUnavailableException:
+        raise
     except Exception as e:
         print(f"An error occurred during authentication: {e}")
         return False
@@ -64,32 +80,59 @@ def create_access_token(data: dict, expires_delta: timedelta | None = None):
         return None
 
 
-async def get_current_user(token: Annotated[str, Depends(oauth2_scheme)]):
+def load_principal(db, user_id: UUID) -> Principal | None:
+    return to_principal(db.execute(principal_statement(user_id)).first())
+
+
+async def load_principal_async(db, user_id: UUID) -> Principal | None:
+    return to_principal((await db.execute(principal_statement(user_id))).first())
+
+
+async def get_current_user(
+    token: Annotated[str, Depends(oauth2_scheme)],
+    db=Depends(get_session),
+):
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+    # Repeat requests with the same bearer token skip signature verification
+    # for up to TOKEN_CACHE_TTL seconds.
+    payload = verified_token_cache.get(token)
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        if payload is None:
+            payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+            verified_token_cache.put(token, payload)
         username: str = payload.get("sub")
         if username is None:
             raise credentials_exception
         token_data = TokenData(username=username)
     except Exception as e:
-        print(f"An error occurred while decoding token: {e}")
+        logger.info("rejected bearer token: %s", e)
         raise credentials_exception
-    user = get_user(user_db, username=token_data.username)
-    if user is None:
+    try:
+        user_id = UUID(token_data.username)
+    except ValueError:
         raise credentials_exception
-    return user
+
+    principal = principal_cache.get(user_id)
+    if principal is None:
+        if DB_ASYNC_ENABLED:
+            principal = await load_principal_async(db, user_id)
+        else:
+            principal = await run_in_threadpool(load_principal, db, user_id)
+        if principal is None:
+            raise credentials_exception
+        principal_cache.put(principal)
+    return principal
 
 
 async def get_current_active_user(
-    current_user: Annotated[User, Depends(get_current_user)],
+    current_user: Annotated[Principal, Depends(get_current_user)],
 ):
     try:
-        if not current_user.active:
+        if not current_user.is_active:
             raise HTTPException(status_code=400, detail="Inactive user")
         return current_user
     except Exception as e:
@@ -98,7 +141,7 @@ async def get_current_active_user(
 
 
 async def get_current_active_admin(
-    current_user: Annotated[User, Depends(get_current_active_user)]
+    current_user: Annotated[Principal, Depends(get_current_active_user)]
 ):
     if not current_user.is_admin:
         raise HTTPException(
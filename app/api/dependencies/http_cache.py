@@ -0,0 +1,64 @@
+import os
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Optional
+from fastapi import Request, Response, status
+
+PRODUCT_CACHE_CONTROL = os.getenv("PRODUCT_CACHE_CONTROL", "public, max-age=60")
+USER_CACHE_CONTROL = os.getenv("USER_CACHE_CONTROL", "private, no-cache")
+
+
+def last_modified(entity) -> datetime:
+    modified = entity.updated_at or entity.created_at
+    # Stored timestamps are naive UTC.
+    if modified.tzinfo is None:
+        modified = modified.replace(tzinfo=timezone.utc)
+    return modified.astimezone(timezone.utc)
+
+
+def entity_tag(entity) -> str:
+    return f'W/"{entity.id.hex}-{last_modified(entity).strftime("%Y%m%d%H%M%S%f")}"'
+
+
+def _matches(if_none_match: str, etag: str) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    # Weak comparison: the W/ prefix is ignored on both sides.
+    candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return etag.removeprefix("W/") in candidates
+
+
+def _not_modified_since(if_modified_since: str, modified: datetime) -> bool:
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    # HTTP dates have one-second resolution.
+    return modified.replace(microsecond=0) <= since
+
+
+def conditional_get(
+    request: Request, response: Response, entity, cache_control: str
+) -> Optional[Response]:
+    modified = last_modified(entity)
+    headers = {
+        "ETag": entity_tag(entity),
+        "Last-Modified": format_datetime(modified, usegmt=True),
+        "Cache-Control": cache_control,
+    }
+
+    if_none_match = request.headers.get("if-none-match")
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_none_match is not None:
+        not_modified = _matches(if_none_match, headers["ETag"])
+    elif if_modified_since is not None:
+        not_modified = _not_modified_since(if_modified_since, modified)
+    else:
+        not_modified = False
+
+    if not_modified:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    response.headers.update(headers)
+    return None
@@ -0,0 +1,153 @@
+import asyncio
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from passlib.context import CryptContext
+
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+# Upper bounds in milliseconds for the hash/verify latency histogram.
+LATENCY_BUCKETS_MS = (50, 100, 250, 500, 1000, 2500, 5000, float("inf"))
+
+
+def _hash(password: str) -> str:
+    return pwd_context.hash(password)
+
+
+def _verify(plain_password: str, hashed_password: str) -> bool:
+    return pwd_context.verify(plain_password, hashed_password)
+
+
+class PasswordHasherBusy(Exception):
+    pass
+
+
+class PasswordHasher:
+    def __init__(self, workers: int, queue_limit: int, timeout: float):
+        self.workers = workers
+        self.queue_limit = queue_limit
+        self.timeout = timeout
+        self._executor = None
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.completed = 0
+        self.rejected = 0
+        self.timeouts = 0
+        self.latency_total_ms = 0.0
+        self.latency_buckets = [0] * len(LATENCY_BUCKETS_MS)
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.workers,
+                        mp_context=multiprocessing.get_context("spawn"),
+                    )
+        return self._executor
+
+    def _submit(self, fn, *args):
+        with self._lock:
+            if self.in_flight >= self.queue_limit:
+                self.rejected += 1
+                raise PasswordHasherBusy()
+            self.in_flight += 1
+        try:
+            future = self._get_executor().submit(fn, *args)
+        except Exception:
+            self._release()
+            raise
+        # The slot is held until the job itself ends, not until the caller
+        # stops waiting: a timed-out or cancelled bcrypt call still occupies
+        # a worker until it finishes.
+        future.add_done_callback(self._release)
+        return future, time.perf_counter()
+
+    def _release(self, future=None):
+        with self._lock:
+            self.in_flight -= 1
+
+    def _record(self, started_at):
+        elapsed_ms = (time.perf_counter() - started_at) * 1000
+        with self._lock:
+            self.completed += 1
+            self.latency_total_ms += elapsed_ms
+            for index, bound in enumerate(LATENCY_BUCKETS_MS):
+                if elapsed_ms <= bound:
+                    self.latency_buckets[index] += 1
+                    break
+
+    def _record_timeout(self):
+        with self._lock:
+            self.timeouts += 1
+
+    def _run(self, fn, *args):
+        future, started_at = self._submit(fn, *args)
+        try:
+            result = future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            future.cancel()
+            self._record_timeout()
+            raise
+        self._record(started_at)
+        return result
+
+    async def _run_async(self, fn, *args):
+        future, started_at = self._submit(fn, *args)
+        try:
+            result = await asyncio.wait_for(asyncio.wrap_future(future), self.timeout)
+        except asyncio.TimeoutError:
+            self._record_timeout()
+            raise
+        except BaseException:
+            # Includes CancelledError when the client disconnects mid-verify;
+            # a job that has not started yet is dropped from the queue.
+            future.cancel()
+            raise
+        self._record(started_at)
+        return result
+
+    def hash(self, password: str) -> str:
+        return self._run(_hash, password)
+
+    def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return self._run(_verify, plain_password, hashed_password)
+
+    async def hash_async(self, password: str) -> str:
+        return await self._run_async(_hash, password)
+
+    async def verify_async(self, plain_password: str, hashed_password: str) -> bool:
+        return await self._run_async(_verify, plain_password, hashed_password)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "queue_limit": self.queue_limit,
+                "queue_depth": self.in_flight,
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "timeouts": self.timeouts,
+                "latency_ms": {
+                    "total": round(self.latency_total_ms, 3),
+                    "buckets": {
+                        ("+Inf" if bound == float("inf") else str(bound)): count
+                        for bound, count in zip(LATENCY_BUCKETS_MS, self.latency_buckets)
+                    },
+                },
+            }
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+password_hasher = PasswordHasher(
+    workers=int(os.getenv("PASSWORD_HASH_WORKERS", os.cpu_count() or 2)),
+    queue_limit=int(os.getenv("PASSWORD_HASH_QUEUE_LIMIT", 64)),
+    timeout=float(os.getenv("PASSWORD_HASH_TIMEOUT", 5)),
+)
@@ -1,9 +1,15 @@
 
+import asyncio
 import re
-from app.api.exceptions.GlobalException import InvalidPasswordException
-from passlib.context import CryptContext
-
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from app.api.exceptions.global_exceptions import (
+    InvalidPasswordException,
+    PasswordHashingUnavailableException,
+)
+from app.api.dependencies.password_hasher import (
+    PasswordHasherBusy,
+    password_hasher,
+)
 
 
 
@@ -26,9 +32,29 @@ def validate_password(password: str):
 
 
 def verify_password(plain_password, hashed_password):
-    return pwd_context.verify(plain_password, hashed_password)
+    try:
+        return password_hasher.verify(plain_password, hashed_password)
+    except (PasswordHasherBusy, FutureTimeoutError):
+        raise PasswordHashingUnavailableException()
 
 
 def get_password_hash(password):
-    return pwd_context.hash(password)
+    try:
+        return password_hasher.hash(password)
+    except (PasswordHasherBusy, FutureTimeoutError):
+        raise PasswordHashingUnavailableException()
+
+
+async def verify_password_async(plain_password, hashed_password):
+    try:
+        return await password_hasher.verify_async(plain_password, hashed_password)
+    except (PasswordHasherBusy, asyncio.TimeoutError):
+        raise PasswordHashingUnavailableException()
+
+
+async def get_password_hash_async(password):
+    try:
+        return await password_hasher.hash_async(password)
+    except (PasswordHasherBusy, asyncio.TimeoutError):
+        raise PasswordHashingUnavailableException()
 
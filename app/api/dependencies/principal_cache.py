@@ -0,0 +1,79 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional
+from uuid import UUID
+from sqlalchemy import select
+from app.models import User
+
+
+@dataclass(frozen=True)
+class Principal:
+    id: UUID
+    is_active: bool
+    is_admin: bool
+
+
+class PrincipalCache:
+    # Per-process: invalidate() only clears this worker's entry, so other
+    # workers may keep authorizing a deactivated or demoted user for up to
+    # ttl seconds. Keep the ttl short enough to be an acceptable window.
+    def __init__(self, ttl: float, max_entries: int):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, user_id: UUID) -> Optional[Principal]:
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None or entry[1] < time.monotonic():
+                self._entries.pop(user_id, None)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(user_id)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, principal: Principal) -> None:
+        with self._lock:
+            self._entries[principal.id] = (principal, time.monotonic() + self.ttl)
+            self._entries.move_to_end(principal.id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_id: UUID) -> None:
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+principal_cache = PrincipalCache(
+    ttl=float(os.getenv("PRINCIPAL_CACHE_TTL", 10)),
+    max_entries=int(os.getenv("PRINCIPAL_CACHE_SIZE", 10000)),
+)
+
+
+def principal_statement(user_id: UUID):
+    # Primary-key lookup of only the columns authorization needs.
+    return select(User.id, User.is_active, User.is_admin).where(User.id == user_id)
+
+
+def to_principal(row) -> Optional[Principal]:
+    if row is None:
+        return None
+    return Principal(
+        id=row.id, is_active=bool(row.is_active), is_admin=bool(row.is_admin)
+    )
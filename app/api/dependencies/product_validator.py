@@ -1,10 +1,17 @@
+from typing import Iterable, Set
+from sqlalchemy import select
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.models import Product
 from app.api.exceptions.global_exceptions import (
     ProductAlreadyExistsException,
 )
 
 
+def existing_names_statement(names: Iterable[str]):
+    return select(Product.name).where(Product.name.in_(set(names)))
+
+
 class ProductValidator:
     def __init__(self, db: Session):
         self.db = db
@@ -13,3 +20,28 @@ class ProductValidator:
         existing_product = self.db.query(Product).filter(Product.name == name).first()
         if existing_product:
             raise ProductAlreadyExistsException()
+
+    def existing_names(self, names: Iterable[str]) -> Set[str]:
+        names = set(names)
+        if not names:
+            return set()
+        return set(self.db.execute(existing_names_statement(names)).scalars())
+
+
+class AsyncProductValidator:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def validate_unique_name(self, name: str):
+        result = await self.db.execute(
+            select(Product.id).where(Product.name == name).limit(1)
+        )
+        if result.first() is not None:
+            raise ProductAlreadyExistsException()
+
+    async def existing_names(self, names: Iterable[str]) -> Set[str]:
+        names = set(names)
+        if not names:
+            return set()
+        result = await self.db.execute(existing_names_statement(names))
+        return set(result.scalars())
@@ -0,0 +1,63 @@
+import inspect
+from fastapi import Depends, Request
+from starlette.concurrency import run_in_threadpool
+from app.db.database import (
+    DB_ASYNC_ENABLED,
+    REPLICA_ENABLED,
+    get_read_session,
+    get_session,
+)
+from app.db.read_your_writes import reads_from_primary
+from app.api.services.product_service import AsyncProductService, ProductService
+from app.api.services.user_service import AsyncUserService, UserService
+from app.api.services.order_service import AsyncOrderService, OrderService
+from app.api.services.order_status_service import (
+    AsyncOrderStatusService,
+    OrderStatusService,
+)
+
+
+async def run_service(method, *args, **kwargs):
+    # Async services run on the event loop, sync ones keep using the threadpool.
+    if inspect.iscoroutinefunction(method):
+        return await method(*args, **kwargs)
+    return await run_in_threadpool(method, *args, **kwargs)
+
+
+async def get_product_service(db=Depends(get_session)):
+    if DB_ASYNC_ENABLED:
+        return AsyncProductService(db)
+    return ProductService(db)
+
+
+async def get_read_product_service(request: Request, db=Depends(get_read_session)):
+    # A replica can lag the write that just invalidated the shared read cache,
+    # so only reads served by the primary refill it.
+    fill_read_cache = not REPLICA_ENABLED or reads_from_primary(request)
+    if DB_ASYNC_ENABLED:
+        return AsyncProductService(db, fill_read_cache)
+    return ProductService(db, fill_read_cache)
+
+
+async def get_user_service(db=Depends(get_session)):
+    if DB_ASYNC_ENABLED:
+        return AsyncUserService(db)
+    return UserService(db)
+
+
+async def get_read_user_service(db=Depends(get_read_session)):
+    if DB_ASYNC_ENABLED:
+        return AsyncUserService(db)
+    return UserService(db)
+
+
+async def get_order_service(db=Depends(get_session)):
+    if DB_ASYNC_ENABLED:
+        return AsyncOrderService(db)
+    return OrderService(db)
+
+
+async def get_order_status_service(db=Depends(get_session)):
+    if DB_ASYNC_ENABLED:
+        return AsyncOrderStatusService(db)
+    return OrderStatusService(db)
@@ -0,0 +1,60 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+
+class VerifiedTokenCache:
+    # Entries live until the token's exp or ttl seconds, whichever is first,
+    # so a cached token is re-verified against SECRET_KEY at least every ttl.
+    def __init__(self, ttl: float, max_entries: int):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, token: str) -> Optional[dict]:
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is None:
+                self.misses += 1
+                return None
+            claims, expires_at = entry
+            if expires_at <= now:
+                del self._entries[token]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(token)
+            self.hits += 1
+            return claims
+
+    def put(self, token: str, claims: dict) -> None:
+        expires_at = claims.get("exp")
+        if expires_at is None:
+            return
+        expires_at = min(float(expires_at), time.time() + self.ttl)
+        with self._lock:
+            self._entries[token] = (claims, expires_at)
+            self._entries.move_to_end(token)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "ttl": self.ttl,
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+verified_token_cache = VerifiedTokenCache(
+    ttl=float(os.getenv("TOKEN_CACHE_TTL", 300)),
+    max_entries=int(os.getenv("TOKEN_CACHE_SIZE", 10000))
+)
@@ -19,6 +19,15 @@ class InvalidPasswordException(HTTPException):
         )
 
 
+class PasswordHashingUnavailableException(HTTPException):
+    def __init__(self):
+        super().__init__(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Password processing is busy, please retry shortly.",
+            headers={"Retry-After": "1"},
+        )
+
+
 class PriceValidationException(HTTPException):
     def __init__(self):
         super().__init__(
@@ -49,6 +58,27 @@ class InvalidUUIDException(HTTPException):
             detail="The provided user ID is not a valid UUID.",
         )
 
+class InvalidCursorException(HTTPException):
+    def __init__(self):
+        super().__init__(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="The provided cursor is invalid for this search.",
+        )
+
+class ProductNotFoundException(HTTPException):
+    def __init__(self, product_id=None):
+        super().__init__(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Product not found.",
+        )
+
+class ProductAlreadyExistsException(HTTPException):
+    def __init__(self):
+        super().__init__(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Product Already Exist.",
+        )
+
 class ProductDoesNotExistException(HTTPException):
     def __init__(self, item_number: int = None):
         if item_number is not None:
@@ -72,6 +102,13 @@ class OutOfStockException(HTTPException):
             detail=detail_message,
         )
 
+class StockReservationException(HTTPException):
+    def __init__(self, failed_items: list):
+        super().__init__(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={"failed_items": failed_items},
+        )
+
 class OrderNotFoundException(HTTPException):
     def __init__(self):
         super().__init__(
@@ -1,10 +1,13 @@
 from fastapi import APIRouter
-from app.api.routes import user, login, status, order, product
+from app.api.routes import user, login, order_status, order, product
 
 api_router = APIRouter()
 
+# The login, status and order routers are intentionally not mounted yet:
+# without login there is no way to obtain the bearer token the order routes
+# require. The order services are exercised directly by tests/ and benchmarks/.
 # api_router.include_router(login.router, prefix="/login", tags=["login"])
 api_router.include_router(user.router, prefix="/users", tags=["users"])
-# api_router.include_router(status.router, prefix="/statuses", tags=["statuses"])
+# api_router.include_router(order_status.router, prefix="/statuses", tags=["statuses"])
 # api_router.include_router(order.router, prefix="/orders", tags=["orders"])
 api_router.include_router(product.router, prefix="/products", tags=["products"])
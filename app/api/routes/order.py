@@ -5,43 +5,68 @@ from app.api.exceptions.global_exceptions import (
     OutOfStockException,
     ProductDoesNotExistException,
 )
-from fastapi import Depends
-from app.api.routes import status
+from fastapi import Body, Depends, status
 from app.api.services.order_service import OrderService
-from app.schemas.order import OrderCreationResponse, OrderItem, OrderResponse
+from app.schemas.order import BatchOrderRequest, BatchOrderResponse, OrderCreationResponse, OrderItem, OrderResponse
 from fastapi import FastAPI, HTTPException, APIRouter
 from typing import List, Optional
 from fastapi.responses import JSONResponse
 from app.models import User
 from app.api.dependencies.auth import get_current_active_admin, get_current_active_user
+from app.api.dependencies.services import get_order_service, run_service
 
 
 router = APIRouter()
-order_service = OrderService()
 
 
 @router.post("/orders", response_model=OrderCreationResponse)
-def create_order(
-    orderItems: List[OrderItem],
+async def create_order(
+    orderItems: List[OrderItem] = Body(..., min_length=1),
+    order_service: OrderService = Depends(get_order_service),
     current_user: User = Depends(get_current_active_user),
 ):
     try:
-        orderResponse = order_service.create_order(order_items=orderItems)
+        orderResponse = await run_service(
+            order_service.create_order, order_items=orderItems, user_id=current_user.id
+        )
+    except HTTPException:
+        raise
     except Exception:
         raise InternalServerErrorException()
 
     return JSONResponse(
-        status_code=status.HTTP_201_CREATED, content=orderResponse.dict()
+        status_code=status.HTTP_201_CREATED, content=orderResponse.model_dump(mode="json")
     )
 
 
+@router.post("/orders/batch", response_model=BatchOrderResponse)
+async def create_orders(
+    batch: BatchOrderRequest,
+    order_service: OrderService = Depends(get_order_service),
+    current_user: User = Depends(get_current_active_user),
+):
+    try:
+        return await run_service(
+            order_service.create_orders,
+            carts=[order.items for order in batch.orders],
+            user_id=current_user.id,
+        )
+    except HTTPException:
+        raise
+    except Exception:
+        raise InternalServerErrorException()
+
+
 @router.get("/orders/{order_id}", response_model=OrderResponse)
-def get_order_details(
+async def get_order_details(
     order_id: UUID,
+    order_service: OrderService = Depends(get_order_service),
     current_user: User = Depends(get_current_active_user),
 ):
     try:
-        order_details = order_service.get_order_by_id(order_id)
+        order_details = await run_service(order_service.get_order_by_id, order_id)
+    except HTTPException:
+        raise
     except Exception:
         raise InternalServerErrorException()
 
@@ -49,17 +74,19 @@ def get_order_details(
 
 
 @router.put("/orders/{order_id}/status", response_model=OrderResponse)
-def update_order_status(
+async def update_order_status(
     order_id: UUID,
     status_name: str,
+    order_service: OrderService = Depends(get_order_service),
     current_admin: User = Depends(get_current_active_admin),
 ):
-    # TODO: Implement admin authorization check when dependency is available
     try:
-        updated_order_response = order_service.update_order_status(
-            order_id, status_name
+        updated_order_response = await run_service(
+            order_service.update_order_status, order_id, status_name
         )
 
+    except HTTPException:
+        raise
     except Exception:
         raise InternalServerErrorException()
 
@@ -68,12 +95,14 @@ def update_order_status(
 
 
 @router.delete("/orders/{order_id}", status_code=status.HTTP_204_NO_CONTENT)
-def cancel_order(
+async def cancel_order(
     order_id: UUID,
+    order_service: OrderService = Depends(get_order_service),
     current_user: User = Depends(get_current_active_user),
 ):
-    # TODO: Implement user authentication check when dependency is available
     try:
-        order_service.cancel_order(order_id)
+        await run_service(order_service.cancel_order, order_id)
+    except HTTPException:
+        raise
     except Exception as e:
         raise InternalServerErrorException()
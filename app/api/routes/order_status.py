@@ -10,20 +10,23 @@ from app.api.services.order_status_service import OrderStatusService
 from fastapi import APIRouter, HTTPException, status
 from app.models import User
 from app.api.dependencies.auth import get_current_active_admin, get_current_active_user
+from app.api.dependencies.services import get_order_status_service, run_service
 from fastapi import Depends
 
 router = APIRouter()
-order_status_service = OrderStatusService
 
 
 @router.post("/statuses/", status_code=status.HTTP_201_CREATED)
-def create_order_status(
+async def create_order_status(
     name: str,
+    order_status_service: OrderStatusService = Depends(get_order_status_service),
     current_admin: User = Depends(get_current_active_admin),
 ):
 
     try:
-        new_status = order_status_service.create_order_status(name=name)
+        new_status = await run_service(order_status_service.create_order_status, name=name)
+    except HTTPException:
+        raise
     except Exception:
         raise InternalServerErrorException()
 
@@ -31,13 +34,18 @@ def create_order_status(
 
 
 @router.get("/statuses/{status_id}", status_code=status.HTTP_200_OK)
-def get_order_status_by_id(
+async def get_order_status_by_id(
     status_id: UUID,
+    order_status_service: OrderStatusService = Depends(get_order_status_service),
     current_user: User = Depends(get_current_active_user),
 ):
 
     try:
-        order_status = order_status_service.get_order_status_by_id(status_id=status_id)
+        order_status = await run_service(
+            order_status_service.get_order_status_by_id, status_id=status_id
+        )
+    except HTTPException:
+        raise
     except Exception:
         raise InternalServerErrorException()
 
@@ -45,16 +53,19 @@ def get_order_status_by_id(
 
 
 @router.put("/statuses/{status_id}", status_code=status.HTTP_200_OK)
-def update_order_status(
+async def update_order_status(
     status_id: UUID,
     name: str,
+    order_status_service: OrderStatusService = Depends(get_order_status_service),
     current_admin: User = Depends(get_current_active_admin),
 ):
 
     try:
-        updated_status = order_status_service.update_order_status(
-            status_id=status_id, name=name
+        updated_status = await run_service(
+            order_status_service.update_order_status, status_id=status_id, name=name
         )
+    except HTTPException:
+        raise
     except Exception:
         raise InternalServerErrorException()
 
@@ -62,12 +73,15 @@ def update_order_status(
 
 
 @router.delete("/statuses/{status_id}", status_code=status.HTTP_204_NO_CONTENT)
-def remove_order_status(
+async def remove_order_status(
     status_id: UUID,
+    order_status_service: OrderStatusService = Depends(get_order_status_service),
     current_admin: User = Depends(get_current_active_admin),
 ):
 
     try:
-        order_status_service.remove_order_status(status_id=status_id)
+        await run_service(order_status_service.remove_order_status, status_id=status_id)
+    except HTTPException:
+        raise
     except Exception:
         raise InternalServerErrorException()
@@ -1,13 +1,21 @@
-from sqlalchemy.orm import Session
-from app.db.database import get_db
 from app.schemas.product import (
     ProductCreate,
+    ProductImportRequest,
+    ProductImportResponse,
     ProductResponse,
     ProductUpdate,
+    ProductSearchPage,
     ProductSearchParams,
 )
-from fastapi import HTTPException, status, Query, Depends
+from fastapi import APIRouter, HTTPException, Request, Response, status, Query, Depends
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from app.api.services.product_service import ProductService
+from app.api.services.product_export import (
+    EXPORT_MEDIA_TYPES,
+    export_products,
+    export_products_async,
+)
+from app.db.database import DB_ASYNC_ENABLED, read_session_factory
 from uuid import UUID
 from typing import List, Optional, Dict
 from app.api.exceptions.global_exceptions import (
@@ -17,7 +25,12 @@ from app.api.exceptions.global_exceptions import (
     DatabaseCommitException,
 )
 from sqlalchemy.exc import IntegrityError
-from app.api.dependencies.product_validator import ProductValidator
+from app.api.dependencies.services import (
+    get_product_service,
+    get_read_product_service,
+    run_service,
+)
+from app.api.dependencies.http_cache import PRODUCT_CACHE_CONTROL, conditional_get
 from app.models import Product, User
 from app.api.dependencies.auth import get_current_active_admin, get_current_active_user
 
@@ -25,40 +38,63 @@ router = APIRouter()
 
 
 @router.post("/", response_model=ProductResponse, status_code=status.HTTP_201_CREATED)
-def create_product(
+async def create_product(
     product_data: ProductCreate,
-    db: Session = Depends(get_db),
+    service: ProductService = Depends(get_product_service),
     current_admin: User = Depends(get_current_active_admin),
 ):
-    service = ProductService(db)
-
     try:
-        if service._is_product_existing(name=product_data.name):
-            raise ProductAlreadyExistsException()
-
-        new_product = Product(**product_data.dict())
-        db.add(new_product)
-
-        db.commit()
-        db.refresh(new_product)
-
-        return new_product
-
-    except ProductAlreadyExistsException:
-        raise HTTPException(
-            status_code=status.HTTP_409_CONFLICT,
-            detail="Product Already Exist.",
-        )
+        return await run_service(service.create_product, product_data)
 
     except IntegrityError:
-        db.rollback()
         raise DatabaseCommitException()
 
 
+@router.post("/import", response_model=ProductImportResponse)
+async def import_products(
+    request: ProductImportRequest,
+    service: ProductService = Depends(get_product_service),
+    current_admin: User = Depends(get_current_active_admin),
+):
+    return await run_service(service.import_products, request)
+
+
+@router.get("/export")
+async def export_products_endpoint(
+    request: Request,
+    format: str = Query(
+        "csv", pattern="^(csv|ndjson)$", description="Export format: csv or ndjson"
+    ),
+    q: Optional[str] = Query(
+        None, description="Full-text search over name and description"
+    ),
+    name: Optional[str] = Query(None, description="Filter by product name"),
+    min_price: Optional[float] = Query(None, description="Filter by minimum price"),
+    max_price: Optional[float] = Query(None, description="Filter by maximum price"),
+    isAvailable: Optional[bool] = Query(None, description="Filter by availability"),
+    current_admin: User = Depends(get_current_active_admin),
+):
+    params = ProductSearchParams(
+        q=q,
+        name=name,
+        min_price=min_price,
+        max_price=max_price,
+        isAvailable=isAvailable,
+    )
+    export = export_products_async if DB_ASYNC_ENABLED else export_products
+    return StreamingResponse(
+        export(params, format, read_session_factory(request)),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="products.{format}"'},
+    )
+
+
 @router.get("/{product_id}", response_model=ProductResponse)
-def get_product(
+async def get_product(
     product_id: str,
-    db: Session = Depends(get_db),
+    request: Request,
+    response: Response,
+    service: ProductService = Depends(get_read_product_service),
 ):
 
     try:
@@ -68,53 +104,68 @@ def get_product(
             status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid UUID!"
         )
 
-    service = ProductService(db)
-    try:
-        return service.get_product_by_id(product_id)
-    except ProductNotFoundException:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="Product not found."
-        )
+    product = await run_service(service.get_product_by_id, product_id)
+    return (
+        conditional_get(request, response, product, PRODUCT_CACHE_CONTROL) or product
+    )
 
 
 @router.delete(
     "/{product_id}",
     status_code=status.HTTP_204_NO_CONTENT,
 )
-def delete_product(
+async def delete_product(
     product_id: UUID,
-    db: Session = Depends(get_db),
+    service: ProductService = Depends(get_product_service),
     current_admin: User = Depends(get_current_active_admin),
 ):
-    service = ProductService(db)
     try:
-        service.delete_product(product_id)
+        await run_service(service.delete_product, product_id)
         return
-    except ProductNotFoundException:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="Product not found."
-        )
     except InvalidUUIDException:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid UUID!"
         )
 
 
-@router.get("/", response_model=Dict)
-def search_products(
+# The service already returns a validated page, so it is serialized once
+# here instead of being re-validated against a response_model.
+@router.get(
+    "/",
+    response_model=None,
+    response_class=ORJSONResponse,
+    responses={200: {"model": ProductSearchPage}},
+)
+async def search_products(
+    q: Optional[str] = Query(
+        None, description="Full-text search over name and description"
+    ),
     name: Optional[str] = Query(None, description="Filter by product name"),
     min_price: Optional[float] = Query(None, description="Filter by minimum price"),
     max_price: Optional[float] = Query(None, description="Filter by maximum price"),
     isAvailable: Optional[bool] = Query(None, description="Filter by availability"),
     page: int = Query(1, ge=1, description="Page number"),
     page_size: int = Query(20, ge=1, le=100, description="Products per page"),
-    sort_by: str = Query("name", description="Sort by field"),
-    sort_order: str = Query("asc", description="Sort order: asc or desc"),
-    db: Session = Depends(get_db),
+    sort_by: Optional[str] = Query(
+        None, description="Sort by field (default: relevance with q, else name)"
+    ),
+    sort_order: Optional[str] = Query(
+        None, description="Sort order: asc or desc (default: desc for relevance)"
+    ),
+    cursor: Optional[str] = Query(
+        None, description="Cursor from a previous response's next_cursor"
+    ),
+    count: str = Query(
+        "exact",
+        pattern="^(exact|estimated|cached|none)$",
+        description="Total count strategy: exact, estimated, cached or none",
+    ),
+    service: ProductService = Depends(get_read_product_service),
 ):
-    service = ProductService(db)
     try:
+        sort_by = sort_by or ("relevance" if q else "name")
         params = ProductSearchParams(
+            q=q,
             name=name,
             min_price=min_price,
             max_price=max_price,
@@ -122,9 +173,14 @@ def search_products(
             page=page,
             page_size=page_size,
             sort_by=sort_by,
-            sort_order=sort_order,
+            sort_order=sort_order or ("desc" if sort_by == "relevance" else "asc"),
+            cursor=cursor,
+            count=count,
         )
-        return service.search_products(params)
+        page = await run_service(service.search_products, params)
+        return ORJSONResponse(page.model_dump(mode="json"))
+    except HTTPException:
+        raise
     except Exception:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
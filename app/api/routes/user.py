@@ -1,13 +1,21 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Response
-from sqlalchemy.orm import Session
-from app.db.database import get_db
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status, Response
+from fastapi.responses import StreamingResponse
+from datetime import datetime
+from typing import Optional
 from app.schemas.user import (
     UserCreateRequest,
+    UserListParams,
+    UserPage,
     UserResponse,
     UserUpdateRequest,
     ChangeRoleRequest,
 )
-from app.api.services.user_service import UserService
+from app.api.services.user_service import (
+    UserService,
+    stream_users,
+    stream_users_async,
+)
+from app.db.database import DB_ASYNC_ENABLED, read_session_factory
 from app.api.exceptions.global_exceptions import (
     InvalidPasswordException,
     EmailAlreadyExistsException,
@@ -16,34 +24,42 @@ from app.api.exceptions.global_exceptions import (
 )
 from uuid import UUID
 from app.api.dependencies.auth import *
+from app.api.dependencies.services import (
+    get_read_user_service,
+    get_user_service,
+    run_service,
+)
+from app.api.dependencies.http_cache import USER_CACHE_CONTROL, conditional_get
 
 router = APIRouter()
 
 
 # this method for normal user
 @router.post("/register", response_model=UserResponse)
-def register_user(user: UserCreateRequest, db: Session = Depends(get_db)):
-    service = UserService(db)
+async def register_user(
+    user: UserCreateRequest, service: UserService = Depends(get_user_service)
+):
     user_dict = user.model_dump()
     user_dict["is_admin"] = False
-    return service.create_user(UserCreateRequest(**user_dict))
+    return await run_service(service.create_user, UserCreateRequest(**user_dict))
 
 
 # this method only for admins to regiter users
 @router.post("/", response_model=UserResponse)
-def create_user(
+async def create_user(
     user: UserCreateRequest,
-    db: Session = Depends(get_db),
+    service: UserService = Depends(get_user_service),
     current_admin: User = Depends(get_current_active_admin),
 ):
-    service = UserService(db)
-    return service.create_user(user)
+    return await run_service(service.create_user, user)
 
 
 @router.get("/{user_id}", response_model=UserResponse)
-def get_user(
+async def get_user(
     user_id: str,
-    db: Session = Depends(get_db),
+    request: Request,
+    response: Response,
+    service: UserService = Depends(get_read_user_service),
     current_user: User = Depends(get_current_active_user),
 ):
     try:
@@ -51,20 +67,20 @@ def get_user(
     except ValueError:
         raise InvalidUUIDException()
 
-    service = UserService(db)
     try:
-        return service.get_user(user_uuid)
+        user = await run_service(service.get_user, user_uuid)
     except UserNotFoundException:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="User not found."
         )
+    return conditional_get(request, response, user, USER_CACHE_CONTROL) or user
 
 
 @router.put("/{user_id}", response_model=UserResponse)
-def update_user(
+async def update_user(
     user_id: str,
     user_data: UserUpdateRequest,
-    db: Session = Depends(get_db),
+    service: UserService = Depends(get_user_service),
     current_user: User = Depends(get_current_active_user),
 ):
     try:
@@ -72,14 +88,13 @@ def update_user(
     except ValueError:
         raise InvalidUUIDException()
 
-    service = UserService(db)
-    return service.update_user(user_uuid, user_data)
+    return await run_service(service.update_user, user_uuid, user_data)
 
 
 @router.delete("/{user_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_user(
+async def delete_user(
     user_id: str,
-    db: Session = Depends(get_db),
+    service: UserService = Depends(get_user_service),
     current_user: User = Depends(get_current_active_user),
 ):
     try:
@@ -87,32 +102,64 @@ def delete_user(
     except ValueError:
         raise InvalidUUIDException()
 
-    service = UserService(db)
     try:
-        service.delete_user(user_uuid)
+        await run_service(service.delete_user, user_uuid)
     except UserNotFoundException:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="User not found."
         )
 
 
-@router.get("/", response_model=list[UserResponse])
-def get_all_users(
-    db: Session = Depends(get_db),
+@router.get("/", response_model=UserPage)
+async def get_all_users(
+    request: Request,
+    email_prefix: Optional[str] = Query(None, description="Email starts with"),
+    username_prefix: Optional[str] = Query(None, description="Username starts with"),
+    is_active: Optional[bool] = Query(None),
+    is_admin: Optional[bool] = Query(None),
+    created_from: Optional[datetime] = Query(None, description="Created at or after"),
+    created_to: Optional[datetime] = Query(None, description="Created before"),
+    limit: int = Query(100, ge=1, le=1000, description="Users per page"),
+    cursor: Optional[str] = Query(
+        None, description="Cursor from a previous response's next_cursor"
+    ),
+    format: str = Query(
+        "json",
+        pattern="^(json|ndjson)$",
+        description="json for one page, ndjson to stream every matching user",
+    ),
+    service: UserService = Depends(get_read_user_service),
     current_admin: User = Depends(get_current_active_admin),
 ):
-    service = UserService(db)
-    return service.get_all_users()
+    params = UserListParams(
+        email_prefix=email_prefix,
+        username_prefix=username_prefix,
+        is_active=is_active,
+        is_admin=is_admin,
+        created_from=created_from,
+        created_to=created_to,
+        limit=limit,
+        cursor=cursor,
+    )
+    if format == "ndjson":
+        stream = stream_users_async if DB_ASYNC_ENABLED else stream_users
+        return StreamingResponse(
+            stream(params, read_session_factory(request)),
+            media_type="application/x-ndjson",
+        )
+    return await run_service(service.list_users, params)
 
 
 @router.put("/users/change_role", status_code=status.HTTP_200_OK)
-def change_role(
+async def change_role(
     request: ChangeRoleRequest,
-    db: Session = Depends(get_db),
+    service: UserService = Depends(get_user_service),
     current_user: User = Depends(get_current_active_admin),
 ):
     try:
-        UserService.change_user_role(request.user_id, request.is_admin, db)
+        await run_service(service.change_user_role, request.user_id, request.is_admin)
         return {"message": "User role updated successfully."}
+    except HTTPException:
+        raise
     except Exception:
         raise HTTPException(status_code=500, detail="Internal Server Error")
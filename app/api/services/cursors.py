@@ -0,0 +1,20 @@
+import base64
+import json
+from app.api.exceptions.global_exceptions import InvalidCursorException
+
+
+def encode_cursor(payload: dict) -> str:
+    raw = json.dumps(payload, default=str, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> dict:
+    try:
+        payload = json.loads(
+            base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        )
+    except ValueError:
+        raise InvalidCursorException()
+    if not isinstance(payload, dict):
+        raise InvalidCursorException()
+    return payload
@@ -1,135 +1,313 @@
+import logging
+import os
 from datetime import datetime
 from uuid import uuid4, UUID
 from typing import Optional, List
-from app.api.exceptions.global_exceptions import OrderNotFoundException, ProductDoesNotExistException, OutOfStockException, StatusNotFoundException
-from app.api.routes import status
-from app.api.services.order_status_service import OrderStatusService
-from app.api.services.product_service import ProductService 
+from app.api.exceptions.global_exceptions import OrderNotFoundException, StatusNotFoundException, StockReservationException
+from app.api.services.order_status_service import AsyncOrderStatusService, OrderStatusService
+from app.api.services.stock_reservation import (
+    allocate_orders,
+    failed_products_statement,
+    lock_products_statement,
+    order_lines,
+    requested_quantities,
+    reservation_failures,
+    reserve_stock_statement,
+)
+from app.api.services.read_cache import product_read_cache
 from app.models import Order, OrderProduct, Product
 from decimal import Decimal
-from app.schemas.order import OrderCreationResponse, OrderItem, OrderResponse
-from fastapi import FastAPI, HTTPException, APIRouter, Query
-from sqlalchemy.orm import Session, joinedload  
+from app.schemas.order import BatchOrderResponse, BatchOrderResult, OrderCreationResponse, OrderItem, OrderResponse
+from fastapi import FastAPI, HTTPException, APIRouter, Query, status
+from sqlalchemy import insert, select
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session, selectinload
+from sqlalchemy.ext.asyncio import AsyncSession
 
 
-product_service = ProductService()
-order_status_service = OrderStatusService()
+def _order_response(order: Order, status_name: str) -> OrderResponse:
+    return OrderResponse(
+        id=order.id,
+        user_id=order.user_id,
+        status=status_name,
+        total_price=order.total_price,
+        created_at=order.created_at,
+        updated_at=order.updated_at,
+        products=[
+            OrderItem(product_id=product.product_id, quantity=product.quantity)
+            for product in order.products
+        ]
+    )
+
+
+logger = logging.getLogger(__name__)
+
+ORDER_BATCH_TRANSACTION_SIZE = int(os.getenv("ORDER_BATCH_TRANSACTION_SIZE", 200))
+
+
+def _batch_chunks(carts: List[List[OrderItem]]):
+    for start in range(0, len(carts), ORDER_BATCH_TRANSACTION_SIZE):
+        yield start, carts[start:start + ORDER_BATCH_TRANSACTION_SIZE]
+
+
+def _batch_rows(carts, accepted, prices, user_id, status_id):
+    orders, lines, results = [], [], {}
+    for index in accepted:
+        order_id = uuid4()
+        total_price, cart_lines = order_lines(order_id, carts[index], prices)
+        orders.append({"id": order_id, "user_id": user_id, "status_id": status_id, "total_price": total_price})
+        lines.extend(cart_lines)
+        results[index] = BatchOrderResult(index=index, status="created", order_id=order_id, total_price=total_price)
+    return orders, lines, results
+
+
+def _chunk_failed(offset: int, chunk) -> List[BatchOrderResult]:
+    # Earlier chunks are already committed, so the batch reports this chunk
+    # as failed and carries on rather than hiding what was created.
+    return [
+        BatchOrderResult(
+            index=offset + index,
+            status="failed",
+            failed_items=[{"reason": "The order could not be saved; retry it."}],
+        )
+        for index in range(len(chunk))
+    ]
+
+
+def _batch_response(results: List[BatchOrderResult]) -> BatchOrderResponse:
+    created = sum(1 for result in results if result.status == "created")
+    return BatchOrderResponse(created=created, failed=len(results) - created, results=results)
+
+
+def _order_details_statement(order_id: UUID):
+    return select(Order).where(Order.id == order_id).options(selectinload(Order.products))
+
 
 class OrderService:
     def __init__(self, db: Session):
         self.db = db
-  
+        self.order_status_service = OrderStatusService(db)
+
     def create_order(self, order_items: List[OrderItem], user_id: Optional[UUID] = None) -> OrderCreationResponse:
-        total_price = Decimal(0)
+        status_id = self.order_status_service.get_status_id("pending")
+
+        quantities = requested_quantities(order_items)
+        reserved = dict(self.db.execute(reserve_stock_statement(quantities)).all())
+        if len(reserved) != len(quantities):
+            found = self.db.execute(
+                failed_products_statement([product_id for product_id in quantities if product_id not in reserved])
+            ).all()
+            self.db.rollback()
+            raise StockReservationException(reservation_failures(order_items, reserved, found))
+
+        order_id = uuid4()
+        total_price, lines = order_lines(order_id, order_items, reserved)
 
-        status_id = order_status_service.get_order_status_by_name("pending").id
         order = Order(
+            id=order_id,
             user_id=user_id,
             total_price=total_price,
             status_id=status_id
         )
-        
+
         self.db.add(order)
         self.db.flush()
-
-        for index, item in enumerate(order_items):
-            product = self.product_service.get_product(item.product_id)
-            if product is None:
-                raise ProductDoesNotExistException(index + 1)
-            if item.quantity > product.stock:
-                raise OutOfStockException(index + 1)
-            if not product.is_available :
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="The product is not currently available."
-                )
-
-            total_price += product.price * item.quantity
-            product.stock -= item.quantity 
-            
-            self.db.add(OrderProduct(order_id=order.id, product_id=item.product_id, quantity=item.quantity))
-        
-        self.db.commit()  
+        if lines:
+            self.db.execute(insert(OrderProduct), lines)
+        self.db.commit()
+        product_read_cache.invalidate(reserved)
 
         order_response = OrderCreationResponse(
             id=order.id,
             user_id=user_id,
             total_price=total_price,
-            status_id=status_id
+            status="pending",
+            created_at=order.created_at
         )
-        
+
         return order_response
 
+    def create_orders(self, carts: List[List[OrderItem]], user_id: Optional[UUID] = None) -> BatchOrderResponse:
+        status_id = self.order_status_service.get_status_id("pending")
+        results = []
+
+        for offset, chunk in _batch_chunks(carts):
+            product_ids = {item.product_id for items in chunk for item in items}
+            try:
+                locked = self.db.execute(lock_products_statement(product_ids)).all()
+                accepted, failures, allocated, prices = allocate_orders(chunk, locked)
+                orders, lines, created = _batch_rows(chunk, accepted, prices, user_id, status_id)
+
+                if orders:
+                    self.db.execute(reserve_stock_statement(allocated))
+                    self.db.execute(insert(Order), orders)
+                    self.db.execute(insert(OrderProduct), lines)
+                self.db.commit()
+            except SQLAlchemyError:
+                logger.exception("batch order chunk at %d failed", offset)
+                self.db.rollback()
+                results.extend(_chunk_failed(offset, chunk))
+                continue
+            if orders:
+                product_read_cache.invalidate(allocated)
+
+            for index in range(len(chunk)):
+                result = created.get(index) or BatchOrderResult(
+                    index=index, status="failed", failed_items=failures[index]
+                )
+                result.index = offset + index
+                results.append(result)
+
+        return _batch_response(results)
+
     def get_order_by_id(self, order_id: UUID) -> OrderResponse:
-        order = self.db.query(Order).filter(Order.id == order_id)\
-            .options(joinedload(Order.order_products))\
-            .first()
+        order = self.db.execute(_order_details_statement(order_id)).scalars().first()
 
         if not order:
             raise OrderNotFoundException()
 
-        product_responses = []
-        for product in order.order_products:
-            product_response = OrderItem(
-                product_id=product.product_id,
-                quantity=product.quantity
-            )
-            product_responses.append(product_response)
+        status_name = self.order_status_service.get_status_name(order.status_id)
 
-        status_name = order_status_service.get_order_status_by_id(order.status_id).name
+        return _order_response(order, status_name)
 
-        return OrderResponse(
-            id=order.id,
-            user_id=order.user_id,
-            status=status_name,
-            total_price=order.total_price,
-            created_at=order.created_at,
-            updated_at=order.updated_at,
-            products=product_responses
-        )
+    def update_order_status(self, order_id: UUID, status_name: str) -> OrderResponse:
+        order = self.db.execute(_order_details_statement(order_id)).scalars().first()
+        if not order:
+            raise OrderNotFoundException()
 
+        order.status_id = self.order_status_service.get_status_id(status_name)
+        order.updated_at = datetime.now()
 
-     
-    def update_order_status(self, order_id: UUID, status_name: str) -> OrderResponse:
+        self.db.commit()
+
+        return _order_response(order, status_name)
 
+    def cancel_order(self, order_id: UUID) -> None:
         order = self.db.query(Order).filter(Order.id == order_id).first()
         if not order:
             raise OrderNotFoundException()
+        elif order.status_id != self.order_status_service.get_status_id('pending'):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Only pending orders can be canceled."
+            )
 
-        status = order_status_service.get_order_status_by_name(status_name)
-        if not status:
-            raise StatusNotFoundException()
-        
-        order.status_id = status.id
+        order.status_id = self.order_status_service.get_status_id('canceled')
         order.updated_at = datetime.now()
-        
+
         self.db.commit()
 
-        return OrderResponse(
+
+class AsyncOrderService:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+        self.order_status_service = AsyncOrderStatusService(db)
+
+    async def create_order(self, order_items: List[OrderItem], user_id: Optional[UUID] = None) -> OrderCreationResponse:
+        status_id = await self.order_status_service.get_status_id("pending")
+
+        quantities = requested_quantities(order_items)
+        reserved = dict((await self.db.execute(reserve_stock_statement(quantities))).all())
+        if len(reserved) != len(quantities):
+            found = (
+                await self.db.execute(
+                    failed_products_statement([product_id for product_id in quantities if product_id not in reserved])
+                )
+            ).all()
+            await self.db.rollback()
+            raise StockReservationException(reservation_failures(order_items, reserved, found))
+
+        order_id = uuid4()
+        total_price, lines = order_lines(order_id, order_items, reserved)
+
+        order = Order(
+            id=order_id,
+            user_id=user_id,
+            total_price=total_price,
+            status_id=status_id
+        )
+
+        self.db.add(order)
+        await self.db.flush()
+        if lines:
+            await self.db.execute(insert(OrderProduct), lines)
+        await self.db.commit()
+        await product_read_cache.ainvalidate(reserved)
+
+        return OrderCreationResponse(
             id=order.id,
-            user_id=order.user_id,
-            status=status.id,
-            total_price=order.total_price,
-            created_at=order.created_at,
-            updated_at=order.updated_at
+            user_id=user_id,
+            total_price=total_price,
+            status="pending",
+            created_at=order.created_at
         )
 
-    
-    def cancel_order(self, order_id: UUID) -> None:
-        order = self.db.query(Order).filter(Order.id == order_id).first()
-        status = order_status_service.get_order_status_by_name('pending')
-        
+    async def create_orders(self, carts: List[List[OrderItem]], user_id: Optional[UUID] = None) -> BatchOrderResponse:
+        status_id = await self.order_status_service.get_status_id("pending")
+        results = []
+
+        for offset, chunk in _batch_chunks(carts):
+            product_ids = {item.product_id for items in chunk for item in items}
+            try:
+                locked = (await self.db.execute(lock_products_statement(product_ids))).all()
+                accepted, failures, allocated, prices = allocate_orders(chunk, locked)
+                orders, lines, created = _batch_rows(chunk, accepted, prices, user_id, status_id)
+
+                if orders:
+                    await self.db.execute(reserve_stock_statement(allocated))
+                    await self.db.execute(insert(Order), orders)
+                    await self.db.execute(insert(OrderProduct), lines)
+                await self.db.commit()
+            except SQLAlchemyError:
+                logger.exception("batch order chunk at %d failed", offset)
+                await self.db.rollback()
+                results.extend(_chunk_failed(offset, chunk))
+                continue
+            if orders:
+                await product_read_cache.ainvalidate(allocated)
+
+            for index in range(len(chunk)):
+                result = created.get(index) or BatchOrderResult(
+                    index=index, status="failed", failed_items=failures[index]
+                )
+                result.index = offset + index
+                results.append(result)
+
+        return _batch_response(results)
+
+    async def get_order_by_id(self, order_id: UUID) -> OrderResponse:
+        order = (await self.db.execute(_order_details_statement(order_id))).scalars().first()
+
         if not order:
             raise OrderNotFoundException()
-        elif order.status_id != status.id:
+
+        status_name = await self.order_status_service.get_status_name(order.status_id)
+
+        return _order_response(order, status_name)
+
+    async def update_order_status(self, order_id: UUID, status_name: str) -> OrderResponse:
+        order = (await self.db.execute(_order_details_statement(order_id))).scalars().first()
+        if not order:
+            raise OrderNotFoundException()
+
+        order.status_id = await self.order_status_service.get_status_id(status_name)
+        order.updated_at = datetime.now()
+
+        await self.db.commit()
+
+        return _order_response(order, status_name)
+
+    async def cancel_order(self, order_id: UUID) -> None:
+        order = await self.db.get(Order, order_id)
+        if not order:
+            raise OrderNotFoundException()
+        elif order.status_id != await self.order_status_service.get_status_id('pending'):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Only pending orders can be canceled."
             )
 
-        canceled_status = order_status_service.get_order_status_by_name('canceled')
-        order.status_id = canceled_status.id
+        order.status_id = await self.order_status_service.get_status_id('canceled')
         order.updated_at = datetime.now()
 
-        self.db.commit()
-
+        await self.db.commit()
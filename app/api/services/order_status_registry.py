@@ -0,0 +1,72 @@
+import os
+import threading
+import time
+from typing import Dict, Iterable, Optional, Tuple
+from uuid import UUID
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+from app.models import CacheVersion, OrderStatus
+
+REGISTRY_NAME = "order_status"
+
+
+class OrderStatusRegistry:
+    def __init__(self, check_interval: float):
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._by_name: Dict[str, UUID] = {}
+        self._by_id: Dict[UUID, str] = {}
+        self._version: Optional[int] = None
+        self._checked_at = 0.0
+
+    @property
+    def version(self) -> Optional[int]:
+        return self._version
+
+    def needs_check(self) -> bool:
+        return (
+            self._version is None
+            or time.monotonic() - self._checked_at >= self.check_interval
+        )
+
+    def mark_checked(self) -> None:
+        self._checked_at = time.monotonic()
+
+    def invalidate(self) -> None:
+        self._checked_at = 0.0
+
+    def replace(self, statuses: Iterable[Tuple[UUID, str]], version: int) -> None:
+        by_name = {name: status_id for status_id, name in statuses}
+        by_id = {status_id: name for name, status_id in by_name.items()}
+        with self._lock:
+            self._by_name, self._by_id = by_name, by_id
+            self._version = version
+            self._checked_at = time.monotonic()
+
+    def id_for(self, name: str) -> Optional[UUID]:
+        return self._by_name.get(name)
+
+    def name_for(self, status_id: UUID) -> Optional[str]:
+        return self._by_id.get(status_id)
+
+
+order_status_registry = OrderStatusRegistry(
+    check_interval=float(os.getenv("ORDER_STATUS_REGISTRY_CHECK_INTERVAL", 30))
+)
+
+
+def version_statement():
+    return select(CacheVersion.version).where(CacheVersion.name == REGISTRY_NAME)
+
+
+def statuses_statement():
+    return select(OrderStatus.id, OrderStatus.name)
+
+
+def bump_version_statement():
+    # Other workers notice the new version on their next periodic check.
+    statement = insert(CacheVersion).values(name=REGISTRY_NAME, version=1)
+    return statement.on_conflict_do_update(
+        index_elements=[CacheVersion.name],
+        set_={"version": CacheVersion.version + 1},
+    )
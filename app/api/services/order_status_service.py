@@ -1,9 +1,17 @@
-import datetime
+from datetime import datetime
 from typing import List
 from uuid import UUID
 from app.api.exceptions.global_exceptions import StatusAlreadyExistsException, StatusInUseException, StatusNotFoundException
-from app.models import OrderStatus
+from app.models import Order, OrderStatus
+from app.api.services.order_status_registry import (
+    bump_version_statement,
+    order_status_registry,
+    statuses_statement,
+    version_statement,
+)
+from sqlalchemy import select
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 
 class OrderStatusService:
@@ -16,53 +24,206 @@ class OrderStatusService:
 
         new_status = OrderStatus(name=name)
         self.db.add(new_status)
+        self.db.execute(bump_version_statement())
         self.db.commit()
         self.db.refresh(new_status)
-        
+        self.refresh_registry()
+
         return new_status
 
     def get_order_status_by_name(self, name: str) -> OrderStatus:
         status = self.db.query(OrderStatus).filter(OrderStatus.name == name).first()
         if status :
             return status
-        
+
         raise StatusNotFoundException()
-    
+
     def get_order_status_by_id(self, status_id: UUID) -> OrderStatus:
         status = self.db.query(OrderStatus).filter(OrderStatus.id == status_id).first()
         if status :
             return status
-        
+
         raise StatusNotFoundException()
-        
+
     def update_order_status(self, status_id: UUID, name: str) -> OrderStatus:
         if self.db.query(OrderStatus).filter(OrderStatus.name == name).first():
             raise StatusAlreadyExistsException()
 
         status = self.db.query(OrderStatus).filter(OrderStatus.id == status_id).first()
-        
+
         if not status:
             raise StatusNotFoundException()
 
         status.name = name
         status.updated_at = datetime.now()
 
+        self.db.execute(bump_version_statement())
         self.db.commit()
-        
+        self.refresh_registry()
+
         return status
-    
-def is_status_in_use(self, status_id: UUID) -> bool:
-    return self.db.query(Order).filter(Order.status_id == status_id).first() is not None
-
-def remove_order_status(self, status_id: UUID):
-    status_to_remove = self.db.query(OrderStatus).filter(OrderStatus.id == status_id).first()
-    
-    if not status_to_remove:
+
+    def is_status_in_use(self, status_id: UUID) -> bool:
+        return self.db.query(Order).filter(Order.status_id == status_id).first() is not None
+
+    def remove_order_status(self, status_id: UUID):
+        status_to_remove = self.db.query(OrderStatus).filter(OrderStatus.id == status_id).first()
+
+        if not status_to_remove:
+            raise StatusNotFoundException()
+
+        if self.is_status_in_use(status_id):
+            raise StatusInUseException()
+
+        self.db.delete(status_to_remove)
+        self.db.execute(bump_version_statement())
+        self.db.commit()
+        self.refresh_registry()
+
+    def refresh_registry(self) -> None:
+        version = self.db.execute(version_statement()).scalar() or 0
+        order_status_registry.replace(self.db.execute(statuses_statement()).all(), version)
+
+    def _ensure_registry(self, force: bool = False) -> None:
+        if not force and not order_status_registry.needs_check():
+            return
+        version = self.db.execute(version_statement()).scalar() or 0
+        if version != order_status_registry.version:
+            order_status_registry.replace(self.db.execute(statuses_statement()).all(), version)
+        else:
+            order_status_registry.mark_checked()
+
+    def get_status_id(self, name: str) -> UUID:
+        self._ensure_registry()
+        status_id = order_status_registry.id_for(name)
+        if status_id is None:
+            # May have been created through another worker since our last check;
+            # reload only if the version moved, so unknown names cost one
+            # version lookup rather than a full reload.
+            self._ensure_registry(force=True)
+            status_id = order_status_registry.id_for(name)
+        if status_id is None:
+            raise StatusNotFoundException()
+        return status_id
+
+    def get_status_name(self, status_id: UUID) -> str:
+        self._ensure_registry()
+        name = order_status_registry.name_for(status_id)
+        if name is None:
+            self._ensure_registry(force=True)
+            name = order_status_registry.name_for(status_id)
+        if name is None:
+            raise StatusNotFoundException()
+        return name
+
+
+class AsyncOrderStatusService:
+    def __init__(self, db : AsyncSession):
+        self.db = db
+
+    async def _find_by_name(self, name: str):
+        result = await self.db.execute(select(OrderStatus).where(OrderStatus.name == name))
+        return result.scalars().first()
+
+    async def create_order_status(self, name: str) -> OrderStatus:
+        if await self._find_by_name(name):
+            raise StatusAlreadyExistsException()
+
+        new_status = OrderStatus(name=name)
+        self.db.add(new_status)
+        await self.db.execute(bump_version_statement())
+        await self.db.commit()
+        await self.db.refresh(new_status)
+        await self.refresh_registry()
+
+        return new_status
+
+    async def get_order_status_by_name(self, name: str) -> OrderStatus:
+        status = await self._find_by_name(name)
+        if status :
+            return status
+
+        raise StatusNotFoundException()
+
+    async def get_order_status_by_id(self, status_id: UUID) -> OrderStatus:
+        status = await self.db.get(OrderStatus, status_id)
+        if status :
+            return status
+
         raise StatusNotFoundException()
-    
-    if self.is_status_in_use(status_id):
-        raise StatusInUseException()
 
-    self.db.delete(status_to_remove)
-    self.db.commit()
+    async def update_order_status(self, status_id: UUID, name: str) -> OrderStatus:
+        if await self._find_by_name(name):
+            raise StatusAlreadyExistsException()
+
+        status = await self.db.get(OrderStatus, status_id)
+
+        if not status:
+            raise StatusNotFoundException()
 
+        status.name = name
+        status.updated_at = datetime.now()
+
+        await self.db.execute(bump_version_statement())
+        await self.db.commit()
+        await self.refresh_registry()
+
+        return status
+
+    async def is_status_in_use(self, status_id: UUID) -> bool:
+        result = await self.db.execute(
+            select(Order.id).where(Order.status_id == status_id).limit(1)
+        )
+        return result.first() is not None
+
+    async def remove_order_status(self, status_id: UUID):
+        status_to_remove = await self.db.get(OrderStatus, status_id)
+
+        if not status_to_remove:
+            raise StatusNotFoundException()
+
+        if await self.is_status_in_use(status_id):
+            raise StatusInUseException()
+
+        await self.db.delete(status_to_remove)
+        await self.db.execute(bump_version_statement())
+        await self.db.commit()
+        await self.refresh_registry()
+
+    async def refresh_registry(self) -> None:
+        version = (await self.db.execute(version_statement())).scalar() or 0
+        statuses = (await self.db.execute(statuses_statement())).all()
+        order_status_registry.replace(statuses, version)
+
+    async def _ensure_registry(self, force: bool = False) -> None:
+        if not force and not order_status_registry.needs_check():
+            return
+        version = (await self.db.execute(version_statement())).scalar() or 0
+        if version != order_status_registry.version:
+            statuses = (await self.db.execute(statuses_statement())).all()
+            order_status_registry.replace(statuses, version)
+        else:
+            order_status_registry.mark_checked()
+
+    async def get_status_id(self, name: str) -> UUID:
+        await self._ensure_registry()
+        status_id = order_status_registry.id_for(name)
+        if status_id is None:
+            # May have been created through another worker since our last check;
+            # reload only if the version moved, so unknown names cost one
+            # version lookup rather than a full reload.
+            await self._ensure_registry(force=True)
+            status_id = order_status_registry.id_for(name)
+        if status_id is None:
+            raise StatusNotFoundException()
+        return status_id
+
+    async def get_status_name(self, status_id: UUID) -> str:
+        await self._ensure_registry()
+        name = order_status_registry.name_for(status_id)
+        if name is None:
+            await self._ensure_registry(force=True)
+            name = order_status_registry.name_for(status_id)
+        if name is None:
+            raise StatusNotFoundException()
+        return name
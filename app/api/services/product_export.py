@@ -0,0 +1,113 @@
+import csv
+import io
+import json
+import os
+from datetime import datetime
+from decimal import Decimal
+from typing import AsyncIterator, Iterator
+from uuid import UUID
+from sqlalchemy import Select, select
+from app.db import database
+from app.models import Product
+from app.schemas.product import ProductSearchParams
+from app.api.services.product_service import apply_search_filters
+
+PRODUCT_EXPORT_BATCH_SIZE = int(os.getenv("PRODUCT_EXPORT_BATCH_SIZE", 5000))
+
+EXPORT_COLUMNS = (
+    Product.id,
+    Product.name,
+    Product.description,
+    Product.price,
+    Product.stock,
+    Product.is_available,
+    Product.created_at,
+    Product.updated_at,
+)
+
+EXPORT_FIELDS = [column.key for column in EXPORT_COLUMNS]
+
+EXPORT_MEDIA_TYPES = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+}
+
+
+def export_statement(params: ProductSearchParams) -> Select:
+    # Plain column rows in primary-key order: no ORM identity map, and the
+    # scan can follow the pkey index as the cursor is drained.
+    query = apply_search_filters(select(*EXPORT_COLUMNS), params)
+    return query.order_by(Product.id).execution_options(
+        yield_per=PRODUCT_EXPORT_BATCH_SIZE
+    )
+
+
+def _json_default(value):
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, UUID):
+        return str(value)
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def _csv_chunk(rows, header: bool = False) -> bytes:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header:
+        writer.writerow(EXPORT_FIELDS)
+    writer.writerows(rows)
+    return buffer.getvalue().encode()
+
+
+def _ndjson_chunk(rows) -> bytes:
+    return "".join(
+        json.dumps(row._asdict(), default=_json_default, separators=(",", ":")) + "\n"
+        for row in rows
+    ).encode()
+
+
+def _encode(format: str, rows, first: bool) -> bytes:
+    if format == "csv":
+        return _csv_chunk(rows, header=first)
+    return _ndjson_chunk(rows)
+
+
+def export_products(
+    params: ProductSearchParams, format: str, session_factory=None
+) -> Iterator[bytes]:
+    # Built eagerly so bad parameters fail before the response starts.
+    statement = export_statement(params)
+
+    # The request's session is closed before the body is sent, so the export
+    # opens its own and drains a server-side cursor one batch at a time.
+    def chunks():
+        with (session_factory or database.SessionLocal)() as db:
+            result = db.execute(statement)
+            first = True
+            for partition in result.partitions():
+                yield _encode(format, partition, first)
+                first = False
+            if first and format == "csv":
+                yield _csv_chunk([], header=True)
+
+    return chunks()
+
+
+def export_products_async(
+    params: ProductSearchParams, format: str, session_factory=None
+) -> AsyncIterator[bytes]:
+    statement = export_statement(params)
+
+    async def chunks():
+        async with (session_factory or database.AsyncSessionLocal)() as db:
+            result = await db.stream(statement)
+            first = True
+            async for partition in result.partitions():
+                yield _encode(format, partition, first)
+                first = False
+            if first and format == "csv":
+                yield _csv_chunk([], header=True)
+
+    return chunks()
@@ -0,0 +1,131 @@
+import os
+from datetime import datetime
+from typing import Dict, List, Set, Tuple
+from uuid import UUID
+from pydantic import ValidationError
+from sqlalchemy.dialects.postgresql import insert
+from app.models import Product
+from app.schemas.product import (
+    ProductCreate,
+    ProductImportError,
+    ProductImportResponse,
+)
+
+PRODUCT_IMPORT_BATCH_SIZE = int(os.getenv("PRODUCT_IMPORT_BATCH_SIZE", 1000))
+
+
+def import_batches(rows: List[dict]):
+    for start in range(0, len(rows), PRODUCT_IMPORT_BATCH_SIZE):
+        yield start, rows[start:start + PRODUCT_IMPORT_BATCH_SIZE]
+
+
+def import_statement(on_conflict: str):
+    statement = insert(Product)
+    if on_conflict == "update":
+        statement = statement.on_conflict_do_update(
+            index_elements=[Product.name],
+            set_={
+                "description": statement.excluded.description,
+                "price": statement.excluded.price,
+                "stock": statement.excluded.stock,
+                "is_available": statement.excluded.is_available,
+                "updated_at": datetime.utcnow(),
+            },
+        )
+    else:
+        # Rows that lose a race with a concurrent insert simply do not come
+        # back from RETURNING and are reported like pre-existing names.
+        statement = statement.on_conflict_do_nothing(index_elements=[Product.name])
+    return statement.returning(Product.name, Product.id)
+
+
+class ProductImport:
+    def __init__(self, on_conflict: str):
+        self.on_conflict = on_conflict
+        self.created = 0
+        self.updated = 0
+        self.skipped = 0
+        self.errors: List[ProductImportError] = []
+        self._seen: Set[str] = set()
+
+    def validate(self, start: int, batch: List[dict]) -> List[Tuple[int, ProductCreate]]:
+        valid = []
+        for index, row in enumerate(batch, start):
+            try:
+                product = ProductCreate.model_validate(row)
+            except ValidationError as exc:
+                self.errors.append(
+                    ProductImportError(
+                        index=index,
+                        errors=[
+                            {"loc": error["loc"], "msg": error["msg"], "type": error["type"]}
+                            for error in exc.errors()
+                        ],
+                    )
+                )
+                continue
+            if product.name in self._seen:
+                self._reject(index, "Duplicate product name in this import.")
+                continue
+            self._seen.add(product.name)
+            valid.append((index, product))
+        return valid
+
+    def rows(
+        self, valid: List[Tuple[int, ProductCreate]], existing: Set[str]
+    ) -> List[Tuple[int, Dict]]:
+        rows = []
+        for index, product in valid:
+            if product.name in existing and self.on_conflict != "update":
+                self._conflict(index)
+                continue
+            rows.append(
+                (
+                    index,
+                    {
+                        "name": product.name,
+                        "description": product.description,
+                        "price": product.price,
+                        "stock": product.stock,
+                        "is_available": (
+                            True if product.is_available is None else product.is_available
+                        ),
+                    },
+                )
+            )
+        return rows
+
+    def record(
+        self, rows: List[Tuple[int, Dict]], written: Dict[str, UUID], existing: Set[str]
+    ) -> None:
+        for index, row in rows:
+            if row["name"] not in written:
+                self._conflict(index)
+            elif row["name"] in existing:
+                self.updated += 1
+            else:
+                self.created += 1
+
+    def response(self) -> ProductImportResponse:
+        errors = sorted(self.errors, key=lambda error: error.index)
+        return ProductImportResponse(
+            created=self.created,
+            updated=self.updated,
+            skipped=self.skipped,
+            failed=len(errors),
+            errors=errors,
+        )
+
+    def _conflict(self, index: int) -> None:
+        if self.on_conflict == "skip":
+            self.skipped += 1
+        else:
+            self._reject(index, "Product Already Exist.")
+
+    def _reject(self, index: int, message: str) -> None:
+        self.errors.append(
+            ProductImportError(
+                index=index,
+                errors=[{"loc": ["name"], "msg": message, "type": "conflict"}],
+            )
+        )
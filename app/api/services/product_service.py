@@ -1,111 +1,627 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_, asc, desc
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import (
+    Float,
+    Select,
+    or_,
+    asc,
+    cast,
+    delete,
+    desc,
+    func,
+    select,
+    text,
+    tuple_,
+    update,
+)
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import ClauseElement, Executable
+from sqlalchemy.orm import with_expression
+from sqlalchemy.dialects import postgresql
 from app.models import Product
 from app.schemas.product import (
     ProductCreate,
+    ProductImportRequest,
+    ProductImportResponse,
     ProductUpdate,
+    ProductSearchPage,
     ProductSearchParams,
     ProductResponse,
+    ProductResponseList,
 )
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from decimal import Decimal
 from uuid import UUID
-from typing import Any, Dict, List
+from typing import List, Optional
 from fastapi import HTTPException
 from app.api.exceptions.global_exceptions import (
     ProductAlreadyExistsException,
     ProductNotFoundException,
-    PriceValidationException,
+    InvalidCursorException,
     InvalidUUIDException,
-    StockValidationException,
-    InvalidPasswordException,
 )
-from pydantic import BaseModel, validator
+from app.api.services.cursors import decode_cursor, encode_cursor
+from app.db.errors import is_unique_violation
+from app.api.services.read_cache import product_read_cache
+from app.api.services.product_import import (
+    ProductImport,
+    import_batches,
+    import_statement,
+)
+from app.api.dependencies.product_validator import (
+    AsyncProductValidator,
+    ProductValidator,
+)
+
+
+SORT_FIELDS = {
+    "name": (Product.name, lambda product: product.name),
+    "price": (Product.price, lambda product: product.price),
+    "stock": (Product.stock, lambda product: product.stock),
+    "is_available": (
+        func.coalesce(Product.is_available, True),
+        lambda product: True if product.is_available is None else product.is_available,
+    ),
+    "created_at": (Product.created_at, lambda product: product.created_at),
+    "updated_at": (
+        func.coalesce(Product.updated_at, Product.created_at),
+        lambda product: product.updated_at or product.created_at,
+    ),
+}
+
+
+def _text_query(params: ProductSearchParams):
+    return func.websearch_to_tsquery("english", params.q)
+
+
+def _relevance(params: ProductSearchParams):
+    # Both functions return real; widened to double precision so the value a
+    # cursor carries (a Python float) compares equal to the row it came from.
+    return cast(
+        func.ts_rank_cd(Product.search_vector, _text_query(params), type_=Float)
+        + func.similarity(Product.name, params.q, type_=Float),
+        Float(precision=53),
+    )
+
+
+def _sort_field(params: ProductSearchParams):
+    if params.sort_by == "relevance":
+        if not params.q:
+            raise HTTPException(
+                status_code=400, detail="Sorting by relevance requires q."
+            )
+        return _relevance(params), lambda product: product.search_rank
+    if params.sort_by not in SORT_FIELDS:
+        raise HTTPException(status_code=400, detail="Invalid sort field.")
+    return SORT_FIELDS[params.sort_by]
+
+
+def apply_search_filters(query: Select, params: ProductSearchParams) -> Select:
+    if params.q:
+        # Full-text match on name + description, or a trigram match on the
+        # name for typos and partial words; both sides are GIN-indexed.
+        query = query.where(
+            or_(
+                Product.search_vector.op("@@")(_text_query(params)),
+                Product.name.op("%")(params.q),
+            )
+        )
+    if params.name:
+        query = query.where(Product.name.ilike(f"%{params.name}%"))
+    if params.min_price is not None:
+        query = query.where(Product.price >= params.min_price)
+    if params.max_price is not None:
+        query = query.where(Product.price <= params.max_price)
+    if params.isAvailable is not None:
+        query = query.where(Product.is_available == params.isAvailable)
+    return query
+
+
+def _search_statement(params: ProductSearchParams) -> Select:
+    query = apply_search_filters(select(Product), params)
+    if params.q:
+        query = query.options(with_expression(Product.search_rank, _relevance(params)))
+
+    sort_column, _ = _sort_field(params)
+    direction = asc if params.sort_order == "asc" else desc
+    return query.order_by(direction(sort_column), direction(Product.id))
+
+
+def _count_statement(query: Select) -> Select:
+    return select(func.count()).select_from(query.order_by(None).subquery())
+
+
+def _has_filters(params: ProductSearchParams) -> bool:
+    return any(
+        value is not None and value != ""
+        for value in (
+            params.q,
+            params.name,
+            params.min_price,
+            params.max_price,
+            params.isAvailable,
+        )
+    )
+
+
+class _Explain(Executable, ClauseElement):
+    # EXPLAIN around a select that keeps its bound parameters, so values the
+    # driver must type (the 'english' regconfig, LIKE patterns) are never
+    # rendered as literals.
+    inherit_cache = False
+
+    def __init__(self, statement: Select):
+        self.statement = statement
+
+
+@compiles(_Explain)
+def _compile_explain(element, compiler, **kw):
+    return "EXPLAIN (FORMAT JSON) " + compiler.process(element.statement, **kw)
+
+
+def _estimate_statement(query: Select, params: ProductSearchParams):
+    if not _has_filters(params):
+        return text(
+            "SELECT reltuples::bigint FROM pg_class "
+            "WHERE oid = to_regclass(:table_name)"
+        ).bindparams(table_name=Product.__tablename__)
+
+    return _Explain(query.order_by(None))
+
+
+def _parse_estimate(estimate) -> Optional[int]:
+    # reltuples is -1 (or 0) until the table has been vacuumed/analyzed.
+    if estimate is None:
+        return None
+    if isinstance(estimate, (int, float, Decimal)):
+        return int(estimate) if estimate > 0 else None
+    if isinstance(estimate, str):
+        estimate = json.loads(estimate)
+    return int(estimate[0]["Plan"]["Plan Rows"])
+
+
+def _count_cache_key(params: ProductSearchParams) -> tuple:
+    return (
+        params.q.strip().lower() if params.q else None,
+        params.name.strip().lower() if params.name else None,
+        str(params.min_price) if params.min_price is not None else None,
+        str(params.max_price) if params.max_price is not None else None,
+        params.isAvailable,
+    )
+
+
+class _CountCache:
+    def __init__(self, ttl: float, max_entries: int = 1024):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key) -> Optional[int]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            total, expires_at = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            return total
+
+    def set(self, key, total: int) -> None:
+        with self._lock:
+            self._entries[key] = (total, time.monotonic() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+product_count_cache = _CountCache(
+    ttl=float(os.getenv("PRODUCT_COUNT_CACHE_TTL", 30))
+)
+
+
+def _page_statement(query: Select, params: ProductSearchParams) -> Select:
+    # One extra row tells us whether another page exists without counting.
+    return query.offset((params.page - 1) * params.page_size).limit(
+        params.page_size + 1
+    )
+
+
+def _encode_cursor(params: ProductSearchParams, product: Product) -> str:
+    _, sort_value = _sort_field(params)
+    return encode_cursor(
+        {
+            "sort_by": params.sort_by,
+            "sort_order": params.sort_order,
+            "value": sort_value(product),
+            "id": str(product.id),
+        }
+    )
+
+
+def _decode_cursor(params: ProductSearchParams):
+    payload = decode_cursor(params.cursor)
+    try:
+        if (
+            payload["sort_by"] != params.sort_by
+            or payload["sort_order"] != params.sort_order
+        ):
+            raise InvalidCursorException()
+
+        sort_column, _ = _sort_field(params)
+        python_type = sort_column.type.python_type
+        value = payload["value"]
+        if value is not None and python_type is datetime:
+            value = datetime.fromisoformat(value)
+        elif value is not None and python_type is Decimal:
+            value = Decimal(value)
+        return value, UUID(payload["id"])
+    except (ValueError, KeyError, TypeError):
+        raise InvalidCursorException()
+
+
+def _seek_statement(query: Select, params: ProductSearchParams) -> Select:
+    sort_column, _ = _sort_field(params)
+    value, last_id = _decode_cursor(params)
+    if params.sort_order == "asc":
+        query = query.where(tuple_(sort_column, Product.id) > tuple_(value, last_id))
+    else:
+        query = query.where(tuple_(sort_column, Product.id) < tuple_(value, last_id))
+    return query.limit(params.page_size + 1)
+
+
+def _search_response(
+    params: ProductSearchParams, total_products: Optional[int], products: List[Product]
+) -> ProductSearchPage:
+    has_more = len(products) > params.page_size
+    products = products[: params.page_size]
+    total_pages = (
+        (total_products + params.page_size - 1) // params.page_size
+        if total_products is not None
+        else None
+    )
+    return ProductSearchPage(
+        page=params.page,
+        total_pages=total_pages,
+        products_per_page=params.page_size,
+        total_products=total_products,
+        has_more=has_more,
+        next_cursor=_encode_cursor(params, products[-1]) if has_more else None,
+        products=ProductResponseList.validate_python(products, from_attributes=True),
+    )
+
+
+def _cursor_response(
+    params: ProductSearchParams, total_products: Optional[int], products: List[Product]
+) -> ProductSearchPage:
+    has_more = len(products) > params.page_size
+    products = products[: params.page_size]
+    return ProductSearchPage(
+        products_per_page=params.page_size,
+        total_products=total_products,
+        has_more=has_more,
+        next_cursor=_encode_cursor(params, products[-1]) if has_more else None,
+        products=ProductResponseList.validate_python(products, from_attributes=True),
+    )
+
+
+def _parse_uuid(product_id) -> UUID:
+    try:
+        return UUID(str(product_id))
+    except ValueError:
+        raise InvalidUUIDException()
+
+
+def _search_cache_key(params: ProductSearchParams) -> tuple:
+    return _count_cache_key(params) + (
+        params.page,
+        params.page_size,
+        params.sort_by,
+        params.sort_order,
+        params.cursor,
+        params.count,
+    )
+
+
+def _create_statement(product: ProductCreate):
+    # The unique name index replaces the old existence pre-check: a
+    # conflicting insert returns no row instead of raising. Omitted optional
+    # fields fall back to the column defaults (is_available=True).
+    return (
+        postgresql.insert(Product)
+        .values(**product.model_dump(exclude_none=True))
+        .on_conflict_do_nothing(index_elements=[Product.name])
+        .returning(Product)
+    )
+
+
+def _update_statement(product_id: UUID, product_data: ProductUpdate):
+    return (
+        update(Product)
+        .where(Product.id == product_id)
+        .values(**product_data.model_dump(exclude_unset=True), updated_at=datetime.utcnow())
+        .returning(Product)
+    )
+
+
+def _delete_statement(product_id: UUID):
+    return delete(Product).where(Product.id == product_id).returning(Product.id)
 
 
 class ProductService:
-    def __init__(self, db: Session):
+    # fill_read_cache=False still serves cache hits but never stores what the
+    # session read, for sessions on a replica that may lag the last write.
+    def __init__(self, db: Session, fill_read_cache: bool = True):
         self.db = db
+        self.fill_read_cache = fill_read_cache
 
     def create_product(self, product: ProductCreate) -> ProductResponse:
-        self.validator.validate_unique_name(product.name)
-        new_product = Product(**product.dict())
-        self.db.add(new_product)
+        new_product = self.db.execute(_create_statement(product)).scalar_one_or_none()
+        if new_product is None:
+            raise ProductAlreadyExistsException()
         self.db.commit()
-        self.db.refresh(new_product)
-        return ProductResponse.from_orm(new_product)
+        product_read_cache.invalidate()
+        return ProductResponse.model_validate(new_product)
+
+    def import_products(self, request: ProductImportRequest) -> ProductImportResponse:
+        validator = ProductValidator(self.db)
+        product_import = ProductImport(request.on_conflict)
+        statement = import_statement(request.on_conflict)
+
+        for start, batch in import_batches(request.products):
+            valid = product_import.validate(start, batch)
+            if not valid:
+                continue
+            existing = validator.existing_names(product.name for _, product in valid)
+            rows = product_import.rows(valid, existing)
+            if not rows:
+                continue
+            written = dict(
+                self.db.execute(statement, [row for _, row in rows]).all()
+            )
+            self.db.commit()
+            product_import.record(rows, written, existing)
+            product_read_cache.invalidate(written.values())
+
+        return product_import.response()
 
     def get_product_by_id(self, product_id: UUID) -> ProductResponse:
+        generation, cached = product_read_cache.get_product(product_id)
+        if cached is not None:
+            return ProductResponse.model_validate_json(cached)
+
+        response = self._get_product_by_id(product_id)
+        if self.fill_read_cache:
+            product_read_cache.set_product(
+                product_id, response.model_dump_json(), generation
+            )
+        return response
+
+    def _get_product_by_id(self, product_id: UUID) -> ProductResponse:
         product = self.db.query(Product).filter(Product.id == product_id).first()
         if not product:
             raise ProductNotFoundException(product_id)
-        return ProductResponse.from_orm(product)
+        return ProductResponse.model_validate(product)
 
     def update_product(
         self, product_id: UUID, product_data: ProductUpdate
     ) -> ProductResponse:
-        product = self.db.query(Product).filter(Product.id == product_id).first()
+        try:
+            product = self.db.execute(
+                _update_statement(product_id, product_data)
+            ).scalar_one_or_none()
+        except IntegrityError as exc:
+            self.db.rollback()
+            if is_unique_violation(exc):
+                raise ProductAlreadyExistsException()
+            raise
         if not product:
             raise ProductNotFoundException(product_id)
 
-        for key, value in product_data.dict(exclude_unset=True).items():
-            setattr(product, key, value)
-
         self.db.commit()
-        self.db.refresh(product)
-        return ProductResponse.from_orm(product)
+        product_read_cache.invalidate([product_id])
+        return ProductResponse.model_validate(product)
 
     def delete_product(self, product_id: UUID) -> None:
-        try:
-            product_id = UUID(str(product_id))
-        except ValueError:
-            raise InvalidUUIDException(f"Invalid UUID: {product_id}")
+        product_id = _parse_uuid(product_id)
 
-        product = self.db.query(Product).filter(Product.id == product_id).first()
-        if not product:
+        if self.db.execute(_delete_statement(product_id)).first() is None:
             raise ProductNotFoundException(product_id)
-
-        self.db.delete(product)
         self.db.commit()
+        product_read_cache.invalidate([product_id])
 
-    def _is_product_existing(self, **filters: Dict[str, Any]) -> bool:
-        return self.db.query(Product).filter_by(**filters).first() is not None
-
-    def search_products(self, params: ProductSearchParams) -> Dict:
-        query = self.db.query(Product)
-
-        if params.name:
-            query = query.filter(Product.name.ilike(f"%{params.name}%"))
-        if params.min_price is not None:
-            query = query.filter(Product.price >= params.min_price)
-        if params.max_price is not None:
-            query = query.filter(Product.price <= params.max_price)
-        if params.isAvailable is not None:
-            query = query.filter(Product.is_available == params.isAvailable)
-
-        sort_column = getattr(Product, params.sort_by, None)
-        if not sort_column:
-            raise HTTPException(status_code=400, detail="Invalid sort field.")
-        query = query.order_by(
-            asc(sort_column) if params.sort_order == "asc" else desc(sort_column)
+    def search_products(self, params: ProductSearchParams) -> ProductSearchPage:
+        generation, key, cached = product_read_cache.get_search(
+            _search_cache_key(params)
         )
+        if cached is not None:
+            return ProductSearchPage.model_validate_json(cached)
 
-        total_products = query.count()
-        total_pages = (total_products + params.page_size - 1) // params.page_size
-        products = (
-            query.offset((params.page - 1) * params.page_size)
-            .limit(params.page_size)
-            .all()
-        )
+        result = self._search_products(params)
+        if self.fill_read_cache:
+            product_read_cache.set_search(key, result.model_dump_json(), generation)
+        return result
 
-        return {
-            "page": params.page,
-            "total_pages ": total_pages,
-            "products_per_page": params.page_size,
-            "total_products": total_products,
-            "products": [ProductResponse.from_orm(product) for product in products],
-        }
+    def _search_products(self, params: ProductSearchParams) -> ProductSearchPage:
+        query = _search_statement(params)
+
+        total_products = self._count_products(query, params)
+        if params.cursor:
+            products = self.db.execute(_seek_statement(query, params)).scalars().all()
+            return _cursor_response(params, total_products, products)
+
+        products = self.db.execute(_page_statement(query, params)).scalars().all()
+        return _search_response(params, total_products, products)
+
+    def _count_products(self, query: Select, params: ProductSearchParams) -> Optional[int]:
+        if params.count == "none":
+            return None
+
+        if params.count == "estimated":
+            estimate = _parse_estimate(
+                self.db.execute(_estimate_statement(query, params)).scalar()
+            )
+            if estimate is not None:
+                return estimate
+
+        if params.count == "cached":
+            key = _count_cache_key(params)
+            total_products = product_count_cache.get(key)
+            if total_products is None:
+                total_products = self.db.execute(_count_statement(query)).scalar_one()
+                product_count_cache.set(key, total_products)
+            return total_products
+
+        return self.db.execute(_count_statement(query)).scalar_one()
 
     def _validate_uuid(self, product_id: str) -> None:
         try:
             UUID(product_id)
         except (ValueError, TypeError):
             raise InvalidUUIDException()
+
+
+class AsyncProductService:
+    def __init__(self, db: AsyncSession, fill_read_cache: bool = True):
+        self.db = db
+        self.fill_read_cache = fill_read_cache
+
+    async def create_product(self, product: ProductCreate) -> ProductResponse:
+        result = await self.db.execute(_create_statement(product))
+        new_product = result.scalar_one_or_none()
+        if new_product is None:
+            raise ProductAlreadyExistsException()
+        await self.db.commit()
+        await product_read_cache.ainvalidate()
+        return ProductResponse.model_validate(new_product)
+
+    async def import_products(
+        self, request: ProductImportRequest
+    ) -> ProductImportResponse:
+        validator = AsyncProductValidator(self.db)
+        product_import = ProductImport(request.on_conflict)
+        statement = import_statement(request.on_conflict)
+
+        for start, batch in import_batches(request.products):
+            valid = product_import.validate(start, batch)
+            if not valid:
+                continue
+            existing = await validator.existing_names(
+                product.name for _, product in valid
+            )
+            rows = product_import.rows(valid, existing)
+            if not rows:
+                continue
+            result = await self.db.execute(statement, [row for _, row in rows])
+            written = dict(result.all())
+            await self.db.commit()
+            product_import.record(rows, written, existing)
+            await product_read_cache.ainvalidate(written.values())
+
+        return product_import.response()
+
+    async def get_product_by_id(self, product_id: UUID) -> ProductResponse:
+        generation, cached = await product_read_cache.aget_product(product_id)
+        if cached is not None:
+            return ProductResponse.model_validate_json(cached)
+
+        response = await self._get_product_by_id(product_id)
+        if self.fill_read_cache:
+            await product_read_cache.aset_product(
+                product_id, response.model_dump_json(), generation
+            )
+        return response
+
+    async def _get_product_by_id(self, product_id: UUID) -> ProductResponse:
+        product = await self.db.get(Product, product_id)
+        if not product:
+            raise ProductNotFoundException(product_id)
+        return ProductResponse.model_validate(product)
+
+    async def update_product(
+        self, product_id: UUID, product_data: ProductUpdate
+    ) -> ProductResponse:
+        try:
+            result = await self.db.execute(_update_statement(product_id, product_data))
+        except IntegrityError as exc:
+            await self.db.rollback()
+            if is_unique_violation(exc):
+                raise ProductAlreadyExistsException()
+            raise
+        product = result.scalar_one_or_none()
+        if not product:
+            raise ProductNotFoundException(product_id)
+
+        await self.db.commit()
+        await product_read_cache.ainvalidate([product_id])
+        return ProductResponse.model_validate(product)
+
+    async def delete_product(self, product_id: UUID) -> None:
+        product_id = _parse_uuid(product_id)
+
+        result = await self.db.execute(_delete_statement(product_id))
+        if result.first() is None:
+            raise ProductNotFoundException(product_id)
+        await self.db.commit()
+        await product_read_cache.ainvalidate([product_id])
+
+    async def search_products(self, params: ProductSearchParams) -> ProductSearchPage:
+        generation, key, cached = await product_read_cache.aget_search(
+            _search_cache_key(params)
+        )
+        if cached is not None:
+            return ProductSearchPage.model_validate_json(cached)
+
+        result = await self._search_products(params)
+        if self.fill_read_cache:
+            await product_read_cache.aset_search(
+                key, result.model_dump_json(), generation
+            )
+        return result
+
+    async def _search_products(self, params: ProductSearchParams) -> ProductSearchPage:
+        query = _search_statement(params)
+
+        total_products = await self._count_products(query, params)
+        if params.cursor:
+            products = (
+                (await self.db.execute(_seek_statement(query, params))).scalars().all()
+            )
+            return _cursor_response(params, total_products, products)
+
+        products = (
+            (await self.db.execute(_page_statement(query, params))).scalars().all()
+        )
+        return _search_response(params, total_products, products)
+
+    async def _count_products(
+        self, query: Select, params: ProductSearchParams
+    ) -> Optional[int]:
+        if params.count == "none":
+            return None
+
+        if params.count == "estimated":
+            estimate = _parse_estimate(
+                (await self.db.execute(_estimate_statement(query, params))).scalar()
+            )
+            if estimate is not None:
+                return estimate
+
+        if params.count == "cached":
+            key = _count_cache_key(params)
+            total_products = product_count_cache.get(key)
+            if total_products is None:
+                total_products = (
+                    await self.db.execute(_count_statement(query))
+                ).scalar_one()
+                product_count_cache.set(key, total_products)
+            return total_products
+
+        return (await self.db.execute(_count_statement(query))).scalar_one()
@@ -0,0 +1,340 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Iterable, Optional
+from uuid import UUID
+
+READ_CACHE_BACKEND = os.getenv("READ_CACHE_BACKEND", "memory").lower()
+READ_CACHE_TTL = float(os.getenv("READ_CACHE_TTL", 30))
+READ_CACHE_SIZE = int(os.getenv("READ_CACHE_SIZE", 10000))
+READ_CACHE_REDIS_URL = os.getenv("READ_CACHE_REDIS_URL", "redis://localhost:6379/0")
+
+
+class NullBackend:
+    def get(self, key: str) -> Optional[str]:
+        return None
+
+    def set(self, key: str, value: str, ttl: float) -> None:
+        pass
+
+    def set_if(self, key: str, value: str, ttl: float, guard_key: str, expected) -> None:
+        pass
+
+    def delete(self, keys: Iterable[str]) -> None:
+        pass
+
+    def incr(self, key: str) -> int:
+        return 0
+
+    async def aget(self, key: str) -> Optional[str]:
+        return None
+
+    async def aset(self, key: str, value: str, ttl: float) -> None:
+        pass
+
+    async def aset_if(
+        self, key: str, value: str, ttl: float, guard_key: str, expected
+    ) -> None:
+        pass
+
+    async def adelete(self, keys: Iterable[str]) -> None:
+        pass
+
+    async def aincr(self, key: str) -> int:
+        return 0
+
+
+class MemoryBackend:
+    # Per-process LRU: invalidations are only seen by the worker that made
+    # the write, others keep serving their copies for up to the TTL. Use the
+    # redis backend when running more than one worker.
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        # Counters live outside the LRU so a generation is never evicted.
+        self._counters = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            if key in self._counters:
+                return str(self._counters[key])
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at is not None and expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: str, ttl: Optional[float]) -> None:
+        with self._lock:
+            self._store(key, value, ttl)
+
+    def set_if(
+        self, key: str, value: str, ttl: Optional[float], guard_key: str, expected
+    ) -> None:
+        with self._lock:
+            current = self._counters.get(guard_key)
+            if (None if current is None else str(current)) == expected:
+                self._store(key, value, ttl)
+
+    def _store(self, key: str, value: str, ttl: Optional[float]) -> None:
+        expires_at = time.monotonic() + ttl if ttl else None
+        self._entries[key] = (value, expires_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def delete(self, keys: Iterable[str]) -> None:
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def incr(self, key: str) -> int:
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + 1
+            return self._counters[key]
+
+    async def aget(self, key: str) -> Optional[str]:
+        return self.get(key)
+
+    async def aset(self, key: str, value: str, ttl: Optional[float]) -> None:
+        self.set(key, value, ttl)
+
+    async def aset_if(
+        self, key: str, value: str, ttl: Optional[float], guard_key: str, expected
+    ) -> None:
+        self.set_if(key, value, ttl, guard_key, expected)
+
+    async def adelete(self, keys: Iterable[str]) -> None:
+        self.delete(keys)
+
+    async def aincr(self, key: str) -> int:
+        return self.incr(key)
+
+
+class RedisBackend:
+    # Speaks the Redis protocol through redis-py, so it also works against
+    # Redis-compatible servers (Valkey, KeyDB, a local stand-in in tests).
+    def __init__(self, url: str):
+        import redis
+        import redis.asyncio
+
+        self._errors = (redis.RedisError, OSError)
+        self._watch_error = redis.WatchError
+        self._client = redis.Redis.from_url(url, decode_responses=True)
+        self._async_client = redis.asyncio.Redis.from_url(url, decode_responses=True)
+        self.errors = 0
+
+    def get(self, key: str) -> Optional[str]:
+        try:
+            return self._client.get(key)
+        except self._errors:
+            self.errors += 1
+            return None
+
+    def set(self, key: str, value: str, ttl: Optional[float]) -> None:
+        try:
+            self._client.set(key, value, px=int(ttl * 1000) if ttl else None)
+        except self._errors:
+            self.errors += 1
+
+    def set_if(
+        self, key: str, value: str, ttl: Optional[float], guard_key: str, expected
+    ) -> None:
+        # WATCH makes the SET fail if guard_key changes before EXEC.
+        try:
+            with self._client.pipeline() as pipe:
+                pipe.watch(guard_key)
+                if pipe.get(guard_key) != expected:
+                    return
+                pipe.multi()
+                pipe.set(key, value, px=int(ttl * 1000) if ttl else None)
+                pipe.execute()
+        except self._watch_error:
+            pass
+        except self._errors:
+            self.errors += 1
+
+    def delete(self, keys: Iterable[str]) -> None:
+        keys = list(keys)
+        if not keys:
+            return
+        try:
+            self._client.delete(*keys)
+        except self._errors:
+            self.errors += 1
+
+    def incr(self, key: str) -> int:
+        try:
+            return self._client.incr(key)
+        except self._errors:
+            self.errors += 1
+            return 0
+
+    async def aget(self, key: str) -> Optional[str]:
+        try:
+            return await self._async_client.get(key)
+        except self._errors:
+            self.errors += 1
+            return None
+
+    async def aset(self, key: str, value: str, ttl: Optional[float]) -> None:
+        try:
+            await self._async_client.set(
+                key, value, px=int(ttl * 1000) if ttl else None
+            )
+        except self._errors:
+            self.errors += 1
+
+    async def aset_if(
+        self, key: str, value: str, ttl: Optional[float], guard_key: str, expected
+    ) -> None:
+        try:
+            async with self._async_client.pipeline() as pipe:
+                await pipe.watch(guard_key)
+                if await pipe.get(guard_key) != expected:
+                    return
+                pipe.multi()
+                pipe.set(key, value, px=int(ttl * 1000) if ttl else None)
+                await pipe.execute()
+        except self._watch_error:
+            pass
+        except self._errors:
+            self.errors += 1
+
+    async def adelete(self, keys: Iterable[str]) -> None:
+        keys = list(keys)
+        if not keys:
+            return
+        try:
+            await self._async_client.delete(*keys)
+        except self._errors:
+            self.errors += 1
+
+    async def aincr(self, key: str) -> int:
+        try:
+            return await self._async_client.incr(key)
+        except self._errors:
+            self.errors += 1
+            return 0
+
+
+def create_backend(name: str):
+    if name == "memory":
+        return MemoryBackend(READ_CACHE_SIZE)
+    if name == "redis":
+        return RedisBackend(READ_CACHE_REDIS_URL)
+    if name == "none":
+        return NullBackend()
+    raise ValueError(f"Unknown READ_CACHE_BACKEND: {name}")
+
+
+class ProductReadCache:
+    # Product details are keyed by id. Search pages are keyed by a hash of
+    # the normalized parameters under a generation number, so one INCR
+    # drops every cached search after a catalog write.
+    #
+    # Every write bumps the generation before deleting product keys, and a
+    # read only stores its result if the generation it saw before querying
+    # is still current. A query that raced a write therefore cannot put the
+    # pre-write row back after the write's invalidation.
+    GENERATION_KEY = "products:search:generation"
+
+    def __init__(self, backend, ttl: float):
+        self.backend = backend
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self.hits = {"product": 0, "search": 0}
+        self.misses = {"product": 0, "search": 0}
+
+    @staticmethod
+    def product_key(product_id: UUID) -> str:
+        return f"products:id:{product_id}"
+
+    @staticmethod
+    def search_key(generation, params_key: tuple) -> str:
+        digest = hashlib.sha1(
+            json.dumps(params_key, default=str).encode()
+        ).hexdigest()
+        return f"products:search:{generation or 0}:{digest}"
+
+    def _record(self, kind: str, value: Optional[str]) -> Optional[str]:
+        with self._lock:
+            if value is None:
+                self.misses[kind] += 1
+            else:
+                self.hits[kind] += 1
+        return value
+
+    def get_product(self, product_id: UUID) -> tuple:
+        generation = self.backend.get(self.GENERATION_KEY)
+        value = self.backend.get(self.product_key(product_id))
+        return generation, self._record("product", value)
+
+    def set_product(self, product_id: UUID, value: str, generation) -> None:
+        self.backend.set_if(
+            self.product_key(product_id), value, self.ttl,
+            self.GENERATION_KEY, generation,
+        )
+
+    def get_search(self, params_key: tuple) -> tuple:
+        generation = self.backend.get(self.GENERATION_KEY)
+        key = self.search_key(generation, params_key)
+        return generation, key, self._record("search", self.backend.get(key))
+
+    def set_search(self, key: str, value: str, generation) -> None:
+        self.backend.set_if(key, value, self.ttl, self.GENERATION_KEY, generation)
+
+    def invalidate(self, product_ids: Iterable[UUID] = ()) -> None:
+        self.backend.incr(self.GENERATION_KEY)
+        self.backend.delete(self.product_key(product_id) for product_id in product_ids)
+
+    async def aget_product(self, product_id: UUID) -> tuple:
+        generation = await self.backend.aget(self.GENERATION_KEY)
+        value = await self.backend.aget(self.product_key(product_id))
+        return generation, self._record("product", value)
+
+    async def aset_product(self, product_id: UUID, value: str, generation) -> None:
+        await self.backend.aset_if(
+            self.product_key(product_id), value, self.ttl,
+            self.GENERATION_KEY, generation,
+        )
+
+    async def aget_search(self, params_key: tuple) -> tuple:
+        generation = await self.backend.aget(self.GENERATION_KEY)
+        key = self.search_key(generation, params_key)
+        return generation, key, self._record("search", await self.backend.aget(key))
+
+    async def aset_search(self, key: str, value: str, generation) -> None:
+        await self.backend.aset_if(
+            key, value, self.ttl, self.GENERATION_KEY, generation
+        )
+
+    async def ainvalidate(self, product_ids: Iterable[UUID] = ()) -> None:
+        await self.backend.aincr(self.GENERATION_KEY)
+        await self.backend.adelete(
+            self.product_key(product_id) for product_id in product_ids
+        )
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = {"backend": type(self.backend).__name__, "ttl": self.ttl}
+            for kind in self.hits:
+                hits, misses = self.hits[kind], self.misses[kind]
+                stats[kind] = {
+                    "hits": hits,
+                    "misses": misses,
+                    "hit_rate": round(hits / (hits + misses), 4) if hits + misses else None,
+                }
+            stats["errors"] = getattr(self.backend, "errors", 0)
+            return stats
+
+
+product_read_cache = ProductReadCache(create_backend(READ_CACHE_BACKEND), READ_CACHE_TTL)
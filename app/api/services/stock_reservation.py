@@ -0,0 +1,128 @@
+from collections import defaultdict
+from datetime import datetime
+from decimal import Decimal
+from typing import Dict, List, Tuple
+from uuid import UUID
+from sqlalchemy import Integer, column, select, update, values
+from sqlalchemy.dialects.postgresql import UUID as PGUUID
+from app.models import Product
+from app.schemas.order import OrderItem
+
+
+def requested_quantities(order_items: List[OrderItem]) -> Dict[UUID, int]:
+    quantities = defaultdict(int)
+    for item in order_items:
+        quantities[item.product_id] += item.quantity
+    return dict(quantities)
+
+
+def reserve_stock_statement(quantities: Dict[UUID, int]):
+    # A single conditional UPDATE both checks and decrements stock, so the
+    # database serialises hot rows instead of a Python read-modify-write.
+    # Rows are locked in id order first to avoid deadlocks between carts.
+    requested = values(
+        column("product_id", PGUUID(as_uuid=True)),
+        column("quantity", Integer),
+        name="requested",
+    ).data(sorted(quantities.items()))
+    locked = (
+        select(Product.id)
+        .where(Product.id.in_(sorted(quantities)))
+        .order_by(Product.id)
+        .with_for_update()
+        .cte("locked")
+    )
+    return (
+        update(Product)
+        .where(Product.id == requested.c.product_id)
+        .where(Product.id.in_(select(locked.c.id)))
+        .where(Product.stock >= requested.c.quantity)
+        .where(Product.is_available.is_(True))
+        # Stock is part of the response, so the product's ETag and
+        # Last-Modified (derived from updated_at) must move with it.
+        .values(
+            stock=Product.stock - requested.c.quantity,
+            updated_at=datetime.utcnow(),
+        )
+        .returning(Product.id, Product.price)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def failed_products_statement(product_ids: List[UUID]):
+    return select(Product.id, Product.is_available).where(Product.id.in_(product_ids))
+
+
+def reservation_failures(
+    order_items: List[OrderItem], reserved: Dict[UUID, Decimal], found_products
+) -> List[dict]:
+    availability = {row.id: row.is_available for row in found_products}
+    failures = []
+    for index, item in enumerate(order_items):
+        if item.product_id in reserved:
+            continue
+        if item.product_id not in availability:
+            reason = "Product does not exist."
+        elif not availability[item.product_id]:
+            reason = "The product is not currently available."
+        else:
+            reason = "Quantity for the product is higher than the stock."
+        failures.append(
+            {"item": index + 1, "product_id": str(item.product_id), "reason": reason}
+        )
+    return failures
+
+
+def order_lines(
+    order_id: UUID, order_items: List[OrderItem], reserved: Dict[UUID, Decimal]
+) -> Tuple[Decimal, List[dict]]:
+    total_price = Decimal(0)
+    lines = []
+    for item in order_items:
+        total_price += reserved[item.product_id] * item.quantity
+        lines.append(
+            {"order_id": order_id, "product_id": item.product_id, "quantity": item.quantity}
+        )
+    return total_price, lines
+
+
+def lock_products_statement(product_ids: List[UUID]):
+    return (
+        select(Product.id, Product.stock, Product.price, Product.is_available)
+        .where(Product.id.in_(sorted(product_ids)))
+        .order_by(Product.id)
+        .with_for_update()
+    )
+
+
+def allocate_orders(carts: List[List[OrderItem]], locked_products):
+    # Carts are served in submission order against the locked stock; a cart
+    # either gets every line or is rejected as a whole.
+    products = {row.id: row for row in locked_products}
+    prices = {row.id: row.price for row in locked_products}
+    allocated = defaultdict(int)
+    accepted = []
+    failures = {}
+
+    for index, order_items in enumerate(carts):
+        quantities = requested_quantities(order_items)
+        unavailable = {
+            product_id
+            for product_id, quantity in quantities.items()
+            if product_id not in products
+            or not products[product_id].is_available
+            or products[product_id].stock - allocated[product_id] < quantity
+        }
+        if unavailable:
+            failures[index] = reservation_failures(
+                order_items,
+                {product_id: None for product_id in quantities if product_id not in unavailable},
+                locked_products,
+            )
+            continue
+
+        for product_id, quantity in quantities.items():
+            allocated[product_id] += quantity
+        accepted.append(index)
+
+    return accepted, failures, dict(allocated), prices
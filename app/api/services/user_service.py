@@ -1,18 +1,168 @@
+import os
+from typing import AsyncIterator, Iterator
+from sqlalchemy import delete, select, tuple_, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.models import User
-from app.schemas.user import UserCreateRequest, UserResponse, UserUpdateRequest
-from passlib.context import CryptContext
+from app.schemas.user import (
+    UserCreateRequest,
+    UserListParams,
+    UserPage,
+    UserResponse,
+    UserResponseList,
+    UserUpdateRequest,
+)
 from app.db import database
-from app.api.dependencies.password_utils import validate_password
+from app.db.errors import is_unique_violation
+from app.api.services.cursors import decode_cursor, encode_cursor
+from app.api.dependencies.password_utils import (
+    get_password_hash,
+    get_password_hash_async,
+    validate_password,
+)
+from app.api.dependencies.principal_cache import principal_cache
 from app.api.exceptions.global_exceptions import (
     EmailAlreadyExistsException,
+    InvalidCursorException,
     UserNotFoundException,
 )
 from uuid import UUID
 from datetime import datetime
 from fastapi import HTTPException, status
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+USER_STREAM_BATCH_SIZE = int(os.getenv("USER_STREAM_BATCH_SIZE", 1000))
+
+USER_COLUMNS = (
+    User.id,
+    User.username,
+    User.email,
+    User.is_admin,
+    User.is_active,
+    User.created_at,
+    User.updated_at,
+)
+
+
+def _users_statement(params: UserListParams):
+    query = select(*USER_COLUMNS)
+
+    if params.email_prefix:
+        query = query.where(User.email.startswith(params.email_prefix, autoescape=True))
+    if params.username_prefix:
+        query = query.where(
+            User.username.startswith(params.username_prefix, autoescape=True)
+        )
+    if params.is_active is not None:
+        query = query.where(User.is_active == params.is_active)
+    if params.is_admin is not None:
+        query = query.where(User.is_admin == params.is_admin)
+    if params.created_from is not None:
+        query = query.where(User.created_at >= params.created_from)
+    if params.created_to is not None:
+        query = query.where(User.created_at < params.created_to)
+    if params.cursor:
+        payload = decode_cursor(params.cursor)
+        try:
+            created_at = datetime.fromisoformat(payload["created_at"])
+            last_id = UUID(payload["id"])
+        except (KeyError, TypeError, ValueError):
+            raise InvalidCursorException()
+        query = query.where(tuple_(User.created_at, User.id) > tuple_(created_at, last_id))
+
+    return query.order_by(User.created_at, User.id)
+
+
+def _users_page(params: UserListParams, rows) -> UserPage:
+    has_more = len(rows) > params.limit
+    rows = rows[: params.limit]
+    next_cursor = None
+    if has_more:
+        last = rows[-1]
+        next_cursor = encode_cursor({"created_at": last.created_at, "id": last.id})
+    return UserPage(
+        users=UserResponseList.validate_python(rows, from_attributes=True),
+        has_more=has_more,
+        next_cursor=next_cursor,
+    )
+
+
+def _ndjson_line(row) -> bytes:
+    user = UserResponse.model_validate(row, from_attributes=True)
+    return user.model_dump_json().encode() + b"\n"
+
+
+def stream_users(
+    params: UserListParams, session_factory=None
+) -> Iterator[bytes]:
+    # Built eagerly so a bad cursor is a 400 before the response starts.
+    statement = _users_statement(params).execution_options(
+        yield_per=USER_STREAM_BATCH_SIZE
+    )
+
+    # Runs after the request's session is closed, so it opens its own; rows
+    # come from a server-side cursor in USER_STREAM_BATCH_SIZE batches.
+    def rows():
+        with (session_factory or database.SessionLocal)() as db:
+            for row in db.execute(statement):
+                yield _ndjson_line(row)
+
+    return rows()
+
+
+def stream_users_async(
+    params: UserListParams, session_factory=None
+) -> AsyncIterator[bytes]:
+    statement = _users_statement(params).execution_options(
+        yield_per=USER_STREAM_BATCH_SIZE
+    )
+
+    async def rows():
+        async with (session_factory or database.AsyncSessionLocal)() as db:
+            result = await db.stream(statement)
+            async for row in result:
+                yield _ndjson_line(row)
+
+    return rows()
+
+
+def _create_user_statement(user: UserCreateRequest, hashed_password: str):
+    # The unique email constraint replaces the old existence pre-check.
+    return (
+        insert(User)
+        .values(username=user.username, email=user.email, hashed_password=hashed_password)
+        .on_conflict_do_nothing(index_elements=[User.email])
+        .returning(User)
+    )
+
+
+def _update_values(user_data: UserUpdateRequest, hashed_password: str | None) -> dict:
+    values = {"updated_at": datetime.utcnow()}
+    if user_data.username is not None:
+        values["username"] = user_data.username
+    if hashed_password:
+        values["hashed_password"] = hashed_password
+    if user_data.email is not None:
+        values["email"] = user_data.email
+    return values
+
+
+def _update_user_statement(user_id: UUID, values: dict):
+    return update(User).where(User.id == user_id).values(**values).returning(User)
+
+
+def _delete_user_statement(user_id: UUID):
+    return delete(User).where(User.id == user_id).returning(User.id)
+
+
+def _change_role_statement(user_id: UUID, is_admin: bool):
+    return (
+        update(User)
+        .where(User.id == user_id)
+        .values(is_admin=is_admin, updated_at=datetime.utcnow())
+        .returning(User.id)
+    )
 
 
 #
@@ -22,22 +172,16 @@ class UserService:
         self.db = db
 
     def create_user(self, user: UserCreateRequest):
-        if self.db.query(User).filter(User.email == user.email).first():
-            raise EmailAlreadyExistsException()
-
         validate_password(user.password)
 
-        hashed_password = pwd_context.hash(user.password)
-
-        new_user = User(
-            username=user.username,
-            email=user.email,
-            hashed_password=hashed_password,
-        )
+        hashed_password = get_password_hash(user.password)
 
-        self.db.add(new_user)
+        new_user = self.db.execute(
+            _create_user_statement(user, hashed_password)
+        ).scalar_one_or_none()
+        if new_user is None:
+            raise EmailAlreadyExistsException()
         self.db.commit()
-        self.db.refresh(new_user)
 
         return new_user
 
@@ -48,45 +192,104 @@ class UserService:
         return user
 
     def update_user(self, user_id: UUID, user_data: UserUpdateRequest):
-        user = self.get_user(user_id)
+        hashed_password = None
+        if user_data.password:
+            validate_password(user_data.password)
+            hashed_password = get_password_hash(user_data.password)
+
+        try:
+            user = self.db.execute(
+                _update_user_statement(user_id, _update_values(user_data, hashed_password))
+            ).scalar_one_or_none()
+        except IntegrityError as exc:
+            self.db.rollback()
+            if is_unique_violation(exc):
+                raise EmailAlreadyExistsException()
+            raise
+        if not user:
+            raise UserNotFoundException()
+
+        self.db.commit()
+        principal_cache.invalidate(user_id)
+        return UserResponse.model_validate(user)
+
+    def delete_user(self, user_id: UUID):
+        if self.db.execute(_delete_user_statement(user_id)).first() is None:
+            raise UserNotFoundException()
+        self.db.commit()
+        principal_cache.invalidate(user_id)
+
+    def list_users(self, params: UserListParams) -> UserPage:
+        rows = self.db.execute(_users_statement(params).limit(params.limit + 1)).all()
+        return _users_page(params, rows)
+
+    def change_user_role(self, user_id: UUID, is_admin: bool):
+        if self.db.execute(_change_role_statement(user_id, is_admin)).first() is None:
+            raise UserNotFoundException()
+        self.db.commit()
+        principal_cache.invalidate(user_id)
+
+
+class AsyncUserService:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def create_user(self, user: UserCreateRequest):
+        validate_password(user.password)
 
-        if user_data.username is not None:
-            user.username = user_data.username
+        hashed_password = await get_password_hash_async(user.password)
+
+        result = await self.db.execute(_create_user_statement(user, hashed_password))
+        new_user = result.scalar_one_or_none()
+        if new_user is None:
+            raise EmailAlreadyExistsException()
+        await self.db.commit()
+
+        return new_user
+
+    async def get_user(self, user_id: UUID):
+        user = await self.db.get(User, user_id)
+        if not user:
+            raise UserNotFoundException()
+        return user
 
+    async def update_user(self, user_id: UUID, user_data: UserUpdateRequest):
+        hashed_password = None
         if user_data.password:
             validate_password(user_data.password)
-            user.hashed_password = pwd_context.hash(user_data.password)
+            hashed_password = await get_password_hash_async(user_data.password)
 
-        if user_data.email is not None:
-            existing_user = (
-                self.db.query(User).filter(User.email == user_data.email).first()
+        try:
+            result = await self.db.execute(
+                _update_user_statement(user_id, _update_values(user_data, hashed_password))
             )
-            if existing_user and existing_user.id != user.id:
+        except IntegrityError as exc:
+            await self.db.rollback()
+            if is_unique_violation(exc):
                 raise EmailAlreadyExistsException()
+            raise
+        user = result.scalar_one_or_none()
+        if not user:
+            raise UserNotFoundException()
 
-            user.email = user_data.email
+        await self.db.commit()
+        principal_cache.invalidate(user_id)
+        return UserResponse.model_validate(user)
 
-        user.updated_at = datetime.utcnow()
-        self.db.commit()
-        return UserResponse.from_orm(user)
+    async def delete_user(self, user_id: UUID):
+        result = await self.db.execute(_delete_user_statement(user_id))
+        if result.first() is None:
+            raise UserNotFoundException()
+        await self.db.commit()
+        principal_cache.invalidate(user_id)
 
-    def delete_user(self, user_id: UUID):
-        user = self.get_user(user_id)
-        if user:
-            self.db.delete(user)
-            self.db.commit()
-            return user
-        raise UserNotFoundException()
-
-    def get_all_users(self):
-        return self.db.query(User).all()
-    
-    
-    def change_user_role(self, user_id: str, is_admin: bool, db: Session):
-        user = self.get_user_by_id(user_id)
-        if not user:
-            raise HTTPException(status_code=404, detail="User not found.")
+    async def list_users(self, params: UserListParams) -> UserPage:
+        result = await self.db.execute(_users_statement(params).limit(params.limit + 1))
+        return _users_page(params, result.all())
 
-        user.is_admin = is_admin
-        db.commit()
-        db.refresh(user)
+    async def change_user_role(self, user_id: UUID, is_admin: bool):
+        result = await self.db.execute(_change_role_statement(user_id, is_admin))
+        if result.first() is None:
+            raise UserNotFoundException()
+        await self.db.commit()
+        principal_cache.invalidate(user_id)
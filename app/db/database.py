@@ -1,8 +1,17 @@
-from sqlalchemy import create_engine
+from fastapi import Request
+from sqlalchemy import create_engine, text
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 import os
 from config import settings
+from app.db.pool import (
+    InstrumentedAsyncQueuePool,
+    InstrumentedQueuePool,
+    instrument_pool,
+    pool_options,
+)
+from app.db.read_your_writes import reads_from_primary
 
 #
 
@@ -10,10 +19,61 @@ DATABASE_URL = (
     f"postgresql://{settings.POSTGRES_USER}:{settings.POSTGRES_PASSWORD}"
     f"@{settings.POSTGRES_HOST}:{settings.POSTGRES_PORT}/{settings.POSTGRES_DB}"
 )
+ASYNC_DATABASE_URL = DATABASE_URL.replace("postgresql://", "postgresql+asyncpg://", 1)
+
+# A streaming replica of the same database; unset sends reads to the primary.
+POSTGRES_REPLICA_HOST = os.getenv("POSTGRES_REPLICA_HOST")
+POSTGRES_REPLICA_PORT = os.getenv("POSTGRES_REPLICA_PORT", settings.POSTGRES_PORT)
+REPLICA_ENABLED = bool(POSTGRES_REPLICA_HOST)
+REPLICA_DATABASE_URL = (
+    f"postgresql://{settings.POSTGRES_USER}:{settings.POSTGRES_PASSWORD}"
+    f"@{POSTGRES_REPLICA_HOST}:{POSTGRES_REPLICA_PORT}/{settings.POSTGRES_DB}"
+)
+ASYNC_REPLICA_DATABASE_URL = REPLICA_DATABASE_URL.replace(
+    "postgresql://", "postgresql+asyncpg://", 1
+)
 
-engine = create_engine(DATABASE_URL)
+DB_ASYNC_ENABLED = os.getenv("DB_ASYNC_ENABLED", "false").lower() == "true"
+# Connections opened by the lifespan before the first request; capped at the pool size.
+DB_POOL_WARM = int(os.getenv("DB_POOL_WARM", 1))
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+engine = create_engine(
+    DATABASE_URL, poolclass=InstrumentedQueuePool, **pool_options()
+)
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL, poolclass=InstrumentedAsyncQueuePool, **pool_options()
+)
+instrument_pool(engine)
+instrument_pool(async_engine.sync_engine)
+
+if REPLICA_ENABLED:
+    replica_engine = create_engine(
+        REPLICA_DATABASE_URL,
+        poolclass=InstrumentedQueuePool,
+        **pool_options("DB_REPLICA"),
+    )
+    async_replica_engine = create_async_engine(
+        ASYNC_REPLICA_DATABASE_URL,
+        poolclass=InstrumentedAsyncQueuePool,
+        **pool_options("DB_REPLICA"),
+    )
+    instrument_pool(replica_engine)
+    instrument_pool(async_replica_engine.sync_engine)
+else:
+    replica_engine, async_replica_engine = engine, async_engine
+
+SessionLocal = sessionmaker(
+    autocommit=False, autoflush=False, expire_on_commit=False, bind=engine
+)
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine, autoflush=False, expire_on_commit=False
+)
+ReplicaSessionLocal = sessionmaker(
+    autocommit=False, autoflush=False, expire_on_commit=False, bind=replica_engine
+)
+AsyncReplicaSessionLocal = async_sessionmaker(
+    bind=async_replica_engine, autoflush=False, expire_on_commit=False
+)
 
 Base = declarative_base()
 
@@ -24,3 +84,74 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+get_session = get_async_db if DB_ASYNC_ENABLED else get_db
+
+
+def read_session_factory(request: Request):
+    # Clients that wrote recently read from the primary, so they see their
+    # own changes even while the replica is behind.
+    if DB_ASYNC_ENABLED:
+        if reads_from_primary(request):
+            return AsyncSessionLocal
+        return AsyncReplicaSessionLocal
+    if reads_from_primary(request):
+        return SessionLocal
+    return ReplicaSessionLocal
+
+
+def get_read_db(request: Request):
+    db = read_session_factory(request)()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+async def get_async_read_db(request: Request):
+    async with read_session_factory(request)() as db:
+        yield db
+
+
+get_read_session = get_async_read_db if DB_ASYNC_ENABLED else get_read_db
+
+
+def get_pool_stats() -> dict:
+    active_engine = async_engine.sync_engine if DB_ASYNC_ENABLED else engine
+    return active_engine.pool.stats.snapshot(active_engine.pool)
+
+
+def get_replica_pool_stats() -> dict:
+    active_engine = async_replica_engine.sync_engine if DB_ASYNC_ENABLED else replica_engine
+    return active_engine.pool.stats.snapshot(active_engine.pool)
+
+
+def warm_pool(count: int = DB_POOL_WARM) -> None:
+    # Held open together so the pool keeps `count` distinct connections.
+    connections = []
+    try:
+        for _ in range(min(count, engine.pool.size())):
+            connection = engine.connect()
+            connections.append(connection)
+            connection.execute(text("SELECT 1"))
+    finally:
+        for connection in connections:
+            connection.close()
+
+
+async def warm_pool_async(count: int = DB_POOL_WARM) -> None:
+    connections = []
+    try:
+        for _ in range(min(count, async_engine.sync_engine.pool.size())):
+            connection = await async_engine.connect()
+            connections.append(connection)
+            await connection.execute(text("SELECT 1"))
+    finally:
+        for connection in connections:
+            await connection.close()
@@ -0,0 +1,11 @@
+from sqlalchemy.exc import IntegrityError
+
+UNIQUE_VIOLATION = "23505"
+
+
+def is_unique_violation(exc: IntegrityError) -> bool:
+    # psycopg2 exposes the SQLSTATE as pgcode, asyncpg (through SQLAlchemy's
+    # adapter) as sqlstate.
+    orig = exc.orig
+    code = getattr(orig, "pgcode", None) or getattr(orig, "sqlstate", None)
+    return code == UNIQUE_VIOLATION
@@ -0,0 +1,123 @@
+import os
+import threading
+import time
+from sqlalchemy import event, exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+# Upper bounds in milliseconds for the checkout wait histogram.
+WAIT_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, float("inf"))
+
+
+class PoolStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.connections_created = 0
+        self.checkouts = 0
+        self.checkins = 0
+        self.invalidated = 0
+        self.timeouts = 0
+        self.wait_count = 0
+        self.wait_total_ms = 0.0
+        self.wait_max_ms = 0.0
+        self.wait_buckets = [0] * len(WAIT_BUCKETS_MS)
+
+    def record_wait(self, seconds: float):
+        wait_ms = seconds * 1000
+        with self._lock:
+            self.wait_count += 1
+            self.wait_total_ms += wait_ms
+            self.wait_max_ms = max(self.wait_max_ms, wait_ms)
+            for index, bound in enumerate(WAIT_BUCKETS_MS):
+                if wait_ms <= bound:
+                    self.wait_buckets[index] += 1
+                    break
+
+    def record_timeout(self):
+        with self._lock:
+            self.timeouts += 1
+
+    def increment(self, counter: str):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def snapshot(self, pool) -> dict:
+        with self._lock:
+            return {
+                "pool_size": pool.size(),
+                "checked_out": pool.checkedout(),
+                "checked_in": pool.checkedin(),
+                "overflow": max(pool.overflow(), 0),
+                "connections_created": self.connections_created,
+                "checkouts": self.checkouts,
+                "checkins": self.checkins,
+                "invalidated": self.invalidated,
+                "timeouts": self.timeouts,
+                "wait_ms": {
+                    "count": self.wait_count,
+                    "total": round(self.wait_total_ms, 3),
+                    "max": round(self.wait_max_ms, 3),
+                    "buckets": {
+                        ("+Inf" if bound == float("inf") else str(bound)): count
+                        for bound, count in zip(WAIT_BUCKETS_MS, self.wait_buckets)
+                    },
+                },
+            }
+
+
+class _InstrumentedPoolMixin:
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stats = PoolStats()
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            self.stats.record_timeout()
+            raise
+        self.stats.record_wait(time.perf_counter() - start)
+        return connection
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.stats = self.stats
+        return pool
+
+
+class InstrumentedQueuePool(_InstrumentedPoolMixin, QueuePool):
+    pass
+
+
+class InstrumentedAsyncQueuePool(_InstrumentedPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def instrument_pool(engine) -> None:
+    # Listeners are attached to the engine so they survive pool recreation.
+    def on_connect(dbapi_connection, connection_record):
+        engine.pool.stats.increment("connections_created")
+
+    def on_checkout(dbapi_connection, connection_record, connection_proxy):
+        engine.pool.stats.increment("checkouts")
+
+    def on_checkin(dbapi_connection, connection_record):
+        engine.pool.stats.increment("checkins")
+
+    def on_invalidate(dbapi_connection, connection_record, exception):
+        engine.pool.stats.increment("invalidated")
+
+    event.listen(engine, "connect", on_connect)
+    event.listen(engine, "checkout", on_checkout)
+    event.listen(engine, "checkin", on_checkin)
+    event.listen(engine, "invalidate", on_invalidate)
+
+
+def pool_options(prefix: str = "DB") -> dict:
+    return {
+        "pool_size": int(os.getenv(f"{prefix}_POOL_SIZE", 5)),
+        "max_overflow": int(os.getenv(f"{prefix}_MAX_OVERFLOW", 10)),
+        "pool_timeout": float(os.getenv(f"{prefix}_POOL_TIMEOUT", 30)),
+        "pool_recycle": int(os.getenv(f"{prefix}_POOL_RECYCLE", 1800)),
+        "pool_pre_ping": os.getenv(f"{prefix}_POOL_PRE_PING", "true").lower() == "true",
+    }
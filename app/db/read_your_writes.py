@@ -0,0 +1,46 @@
+import os
+import time
+
+# How long a client's reads stay on the primary after it writes; should
+# comfortably exceed the replica's usual replay lag.
+READ_YOUR_WRITES_SECONDS = float(os.getenv("READ_YOUR_WRITES_SECONDS", 5))
+READ_YOUR_WRITES_COOKIE = "read_primary_until"
+
+WRITE_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
+
+
+def reads_from_primary(request) -> bool:
+    try:
+        until = float(request.cookies.get(READ_YOUR_WRITES_COOKIE, 0))
+    except ValueError:
+        return False
+    return time.time() < until
+
+
+class ReadYourWritesMiddleware:
+    # Marks the client after every successful write, so its reads skip the
+    # replica until the write has had time to replicate. A cookie rather than
+    # per-process state, so the mark holds whichever worker serves the read;
+    # clients that drop cookies get no read-your-writes guarantee.
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] not in WRITE_METHODS:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                until = time.time() + READ_YOUR_WRITES_SECONDS
+                cookie = (
+                    f"{READ_YOUR_WRITES_COOKIE}={until:.3f}; "
+                    f"Max-Age={int(READ_YOUR_WRITES_SECONDS) + 1}; Path=/; "
+                    "HttpOnly; SameSite=Lax"
+                )
+                message["headers"] = list(message.get("headers", [])) + [
+                    (b"set-cookie", cookie.encode())
+                ]
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
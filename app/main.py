@@ -1,17 +1,165 @@
-from fastapi import FastAPI
-from app.db.database import Base, engine
+import asyncio
+import hmac
+import logging
+import os
+from contextlib import asynccontextmanager
+from fastapi import APIRouter, Depends, FastAPI, HTTPException, Request, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import ORJSONResponse, PlainTextResponse
+from app.db.database import (
+    AsyncSessionLocal,
+    DB_ASYNC_ENABLED,
+    REPLICA_ENABLED,
+    SessionLocal,
+    async_engine,
+    async_replica_engine,
+    engine,
+    get_pool_stats,
+    get_replica_pool_stats,
+    replica_engine,
+    warm_pool,
+    warm_pool_async,
+)
+from app.api.services.order_status_service import (
+    AsyncOrderStatusService,
+    OrderStatusService,
+)
 from app.api.main import api_router
 from app.api.exceptions.global_exceptions import global_exception_handler
+from app.api.dependencies.auth import get_current_active_admin
+from app.api.dependencies.password_hasher import password_hasher
+from app.api.services.read_cache import product_read_cache
+from app.api.dependencies.token_cache import verified_token_cache
+from app.api.dependencies.principal_cache import principal_cache
+from app.db.read_your_writes import ReadYourWritesMiddleware
+from app.metrics import (
+    MetricsMiddleware,
+    instrument_queries,
+    render_stats,
+    request_metrics,
+)
+from app.query_budget import (
+    QUERY_BUDGET_ENABLED,
+    QueryBudgetMiddleware,
+    instrument_query_budget,
+)
 
-Base.metadata.create_all(bind=engine)
+logger = logging.getLogger(__name__)
 
-app = FastAPI()
+
+def _warm_up_sync():
+    warm_pool()
+    with SessionLocal() as db:
+        OrderStatusService(db).refresh_registry()
+
+
+async def warm_up():
+    # Best effort: the status registry also loads on first use, so a database
+    # that is not reachable yet only costs the first requests a round trip.
+    try:
+        if DB_ASYNC_ENABLED:
+            await warm_pool_async()
+            async with AsyncSessionLocal() as db:
+                await AsyncOrderStatusService(db).refresh_registry()
+        else:
+            await run_in_threadpool(_warm_up_sync)
+    except Exception:
+        logger.warning("startup warm-up failed", exc_info=True)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # The schema is owned by Alembic migrations; nothing here touches the
+    # database at import time, and warm-up runs alongside the first requests
+    # instead of delaying readiness.
+    warm_up_task = asyncio.create_task(warm_up())
+    try:
+        yield
+    finally:
+        warm_up_task.cancel()
+        password_hasher.shutdown()
+        engine.dispose()
+        await async_engine.dispose()
+        if REPLICA_ENABLED:
+            replica_engine.dispose()
+            await async_replica_engine.dispose()
+
+
+app = FastAPI(default_response_class=ORJSONResponse, lifespan=lifespan)
 app.add_exception_handler(Exception, global_exception_handler)
+app.add_middleware(MetricsMiddleware)
+engines = [engine, async_engine.sync_engine]
+if REPLICA_ENABLED:
+    app.add_middleware(ReadYourWritesMiddleware)
+    engines += [replica_engine, async_replica_engine.sync_engine]
+for instrumented_engine in engines:
+    instrument_queries(instrumented_engine)
+if QUERY_BUDGET_ENABLED:
+    app.add_middleware(QueryBudgetMiddleware)
+    for instrumented_engine in engines:
+        instrument_query_budget(instrumented_engine)
 
 
 app.include_router(api_router, prefix="/api/v1")
 
+# Pool, queue, cache and traffic internals are for operators only.
+OPS_ENDPOINTS_ENABLED = os.getenv("OPS_ENDPOINTS_ENABLED", "true").lower() == "true"
+ops_router = APIRouter(dependencies=[Depends(get_current_active_admin)])
+# Scrapers cannot hold a short-lived user JWT, so /metrics takes a static
+# bearer token instead; unset leaves it open for a private network.
+METRICS_SCRAPE_TOKEN = os.getenv("METRICS_SCRAPE_TOKEN")
+
+
+def require_scrape_token(request: Request):
+    if METRICS_SCRAPE_TOKEN is None:
+        return
+    expected = f"Bearer {METRICS_SCRAPE_TOKEN}"
+    if not hmac.compare_digest(request.headers.get("authorization", ""), expected):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid scrape token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
 
 @app.get("/hello")
 def read_hello():
     return {"message": "Hello, World!"}
+
+
+@ops_router.get("/db/pool")
+def read_pool_stats():
+    return get_pool_stats()
+
+
+@ops_router.get("/hashing/stats")
+def read_hashing_stats():
+    return password_hasher.stats()
+
+
+@ops_router.get("/cache/stats")
+def read_cache_stats():
+    return product_read_cache.stats()
+
+
+@app.get(
+    "/metrics",
+    response_class=PlainTextResponse,
+    dependencies=[Depends(require_scrape_token)],
+)
+def read_metrics():
+    lines = request_metrics.render()
+    lines += render_stats("db_pool", get_pool_stats())
+    if REPLICA_ENABLED:
+        lines += render_stats("db_replica_pool", get_replica_pool_stats())
+    lines += render_stats("password_hash", password_hasher.stats())
+    lines += render_stats("token_cache", verified_token_cache.stats())
+    lines += render_stats("principal_cache", principal_cache.stats())
+    lines += render_stats("read_cache", product_read_cache.stats())
+    return PlainTextResponse(
+        "\n".join(lines) + "\n", media_type="text/plain; version=0.0.4"
+    )
+
+
+if OPS_ENDPOINTS_ENABLED:
+    app.include_router(ops_router)
@@ -0,0 +1,229 @@
+import contextvars
+import threading
+import time
+from collections import defaultdict
+from sqlalchemy import event
+
+INF = float("inf")
+# Upper bounds for request latency and per-request DB time, in seconds.
+LATENCY_BUCKETS_S = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, INF)
+# Upper bounds for SQL statements issued by one request.
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, INF)
+
+# [statements, seconds] for the request being handled; sync services run in
+# the threadpool with a copy of this context, so they add to the same list.
+_request_queries = contextvars.ContextVar("request_queries", default=None)
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.sum += value
+        self.count += 1
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[index] += 1
+                break
+
+
+class RequestMetrics:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.responses = defaultdict(int)
+        self.latency = defaultdict(lambda: Histogram(LATENCY_BUCKETS_S))
+        self.query_counts = defaultdict(lambda: Histogram(QUERY_COUNT_BUCKETS))
+        self.query_time = defaultdict(lambda: Histogram(LATENCY_BUCKETS_S))
+        self.queries_total = 0
+        self.query_seconds_total = 0.0
+
+    def started(self):
+        with self._lock:
+            self.in_flight += 1
+
+    def finished(self, method, route, status, seconds, queries):
+        labels = (method, route)
+        with self._lock:
+            self.in_flight -= 1
+            self.responses[(method, route, status)] += 1
+            self.latency[labels].observe(seconds)
+            self.query_counts[labels].observe(queries[0])
+            self.query_time[labels].observe(queries[1])
+
+    def record_query(self, seconds: float):
+        stats = _request_queries.get()
+        if stats is not None:
+            stats[0] += 1
+            stats[1] += seconds
+        with self._lock:
+            self.queries_total += 1
+            self.query_seconds_total += seconds
+
+    def render(self) -> list:
+        with self._lock:
+            lines = [
+                "# HELP http_requests_in_flight Requests currently being handled.",
+                "# TYPE http_requests_in_flight gauge",
+                f"http_requests_in_flight {self.in_flight}",
+                "# HELP http_requests_total Responses by route and status code.",
+                "# TYPE http_requests_total counter",
+            ]
+            for (method, route, status), count in sorted(self.responses.items()):
+                lines.append(
+                    f'http_requests_total{{method="{method}",route="{route}",'
+                    f'status="{status}"}} {count}'
+                )
+            _render_histograms(
+                lines,
+                "http_request_duration_seconds",
+                "Request latency by route.",
+                self.latency,
+            )
+            _render_histograms(
+                lines,
+                "db_queries_per_request",
+                "SQL statements issued per request, by route.",
+                self.query_counts,
+            )
+            _render_histograms(
+                lines,
+                "db_time_per_request_seconds",
+                "Time spent executing SQL per request, by route.",
+                self.query_time,
+            )
+            lines += [
+                "# HELP db_queries_total SQL statements executed.",
+                "# TYPE db_queries_total counter",
+                f"db_queries_total {self.queries_total}",
+                "# HELP db_query_seconds_total Time spent executing SQL.",
+                "# TYPE db_query_seconds_total counter",
+                f"db_query_seconds_total {_format(self.query_seconds_total)}",
+            ]
+            return lines
+
+
+def _format(value) -> str:
+    if value == INF:
+        return "+Inf"
+    if isinstance(value, float):
+        return repr(round(value, 6))
+    return str(value)
+
+
+def _render_histogram(lines, name, labels, buckets, counts, total, count):
+    cumulative = 0
+    for bound, bucket_count in zip(buckets, counts):
+        cumulative += bucket_count
+        le = f'le="{_format(bound)}"'
+        lines.append(f"{name}_bucket{{{labels + ',' if labels else ''}{le}}} {cumulative}")
+    suffix = f"{{{labels}}}" if labels else ""
+    lines.append(f"{name}_sum{suffix} {_format(total)}")
+    lines.append(f"{name}_count{suffix} {count}")
+
+
+def _render_histograms(lines, name, help_text, histograms):
+    lines.append(f"# HELP {name} {help_text}")
+    lines.append(f"# TYPE {name} histogram")
+    for (method, route), histogram in sorted(histograms.items()):
+        _render_histogram(
+            lines,
+            name,
+            f'method="{method}",route="{route}"',
+            histogram.buckets,
+            histogram.counts,
+            histogram.sum,
+            histogram.count,
+        )
+
+
+def render_stats(prefix: str, stats: dict) -> list:
+    # Exposes the existing JSON stats dicts (pool, hasher, caches) as gauges.
+    # A nested {"count", "total", "buckets"} dict becomes a histogram.
+    lines = []
+    for key, value in stats.items():
+        name = f"{prefix}_{key}"
+        if isinstance(value, dict) and "buckets" in value:
+            bounds = [INF if bound == "+Inf" else float(bound) for bound in value["buckets"]]
+            lines.append(f"# TYPE {name} histogram")
+            _render_histogram(
+                lines,
+                name,
+                "",
+                bounds,
+                list(value["buckets"].values()),
+                value["total"],
+                value.get("count", sum(value["buckets"].values())),
+            )
+        elif isinstance(value, dict):
+            lines += render_stats(name, value)
+        elif isinstance(value, bool) or value is None:
+            continue
+        elif isinstance(value, (int, float)):
+            lines.append(f"# TYPE {name} gauge")
+            lines.append(f"{name} {_format(value)}")
+    return lines
+
+
+request_metrics = RequestMetrics()
+
+
+def instrument_queries(engine):
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        started_at = conn.info["query_start"].pop()
+        request_metrics.record_query(time.perf_counter() - started_at)
+
+    @event.listens_for(engine, "handle_error")
+    def handle_error(exception_context):
+        connection = exception_context.connection
+        if connection is not None and connection.info.get("query_start"):
+            started_at = connection.info["query_start"].pop()
+            request_metrics.record_query(time.perf_counter() - started_at)
+
+
+class MetricsMiddleware:
+    # Plain ASGI rather than BaseHTTPMiddleware: no extra task per request,
+    # and streaming responses are timed until their last chunk.
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        queries = [0, 0.0]
+        token = _request_queries.set(queries)
+        request_metrics.started()
+        started_at = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _request_queries.reset(token)
+            # The route template, not the raw path, keeps label cardinality
+            # bounded; FastAPI records the matched route in the scope.
+            route = scope.get("route")
+            request_metrics.finished(
+                scope["method"],
+                route.path if route is not None else "unmatched",
+                status_code,
+                time.perf_counter() - started_at,
+                queries,
+            )
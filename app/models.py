@@ -1,8 +1,7 @@
-from dataclasses import Field
 from typing import List, Optional
-from sqlalchemy import Column, ForeignKey, DECIMAL, DateTime, Integer, String, Boolean
-from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy.orm import relationship, Mapped, mapped_column
+from sqlalchemy import BigInteger, Column, Computed, DDL, ForeignKey, DECIMAL, DateTime, Index, Integer, String, Boolean, event, func
+from sqlalchemy.dialects.postgresql import TSVECTOR, UUID
+from sqlalchemy.orm import relationship, Mapped, mapped_column, query_expression
 from datetime import datetime
 import uuid
 from app.db.database import Base
@@ -11,7 +10,7 @@ from datetime import datetime
 
 
 class TokenData(BaseModel):
-    username: UUID | None = None
+    username: str | None = None
 
 
 class Token(BaseModel):
@@ -19,12 +18,31 @@ class Token(BaseModel):
     token_type: str
 
 
-class UserInDB(User):
+class UserInDB(BaseModel):
+    username: str
+    full_name: Optional[str] = None
+    email: Optional[str] = None
     hashed_password: str
+    active: bool = True
 
 
 class User(Base):
     __tablename__ = "users"
+    __table_args__ = (
+        # Backs the (created_at, id) keyset used by the admin user listing.
+        Index("ix_users_created_at_id", "created_at", "id"),
+        # Pattern ops let LIKE 'prefix%' use a btree regardless of collation.
+        Index(
+            "ix_users_email_prefix",
+            "email",
+            postgresql_ops={"email": "varchar_pattern_ops"},
+        ),
+        Index(
+            "ix_users_username_prefix",
+            "username",
+            postgresql_ops={"username": "varchar_pattern_ops"},
+        ),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
@@ -34,9 +52,11 @@ class User(Base):
     hashed_password: Mapped[str] = mapped_column(String, nullable=False)
     is_admin: Mapped[bool] = mapped_column(Boolean, default=False)
     is_active: Mapped[bool] = mapped_column(Boolean, default=True)
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.now)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
     updated_at: Mapped[datetime] = mapped_column(DateTime, nullable=True)
-    
+
+    orders: Mapped[List["Order"]] = relationship("Order", back_populates="user")
+
 class Order(Base):
     __tablename__ = "orders"
 
@@ -63,6 +83,19 @@ class Order(Base):
 class OrderProduct(Base):
     __tablename__ = "order_products"
 
+    id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
+    )
+    order_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("orders.id", ondelete="CASCADE"), nullable=False, index=True
+    )
+    product_id: Mapped[Optional[uuid.UUID]] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("products.id", ondelete="SET NULL"), nullable=True, index=True
+    )
+    quantity: Mapped[int] = mapped_column(Integer, nullable=False)
+
+    order: Mapped["Order"] = relationship("Order", back_populates="products")
+
 
 class OrderStatus(Base):
     __tablename__ = "order_status"
@@ -74,8 +107,33 @@ class OrderStatus(Base):
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.now)
     updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), onupdate=datetime.now)
 
+    orders: Mapped[List["Order"]] = relationship("Order", back_populates="status")
+
+class CacheVersion(Base):
+    __tablename__ = "cache_versions"
+
+    name: Mapped[str] = mapped_column(String, primary_key=True)
+    version: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+
 class Product(Base):
     __tablename__ = "products"
+    __table_args__ = (
+        # (sort column, id) pairs back the keyset pagination in search_products.
+        Index("ix_products_name_id", "name", "id"),
+        # Names are unique; bulk import upserts on this index.
+        Index("ix_products_name_unique", "name", unique=True),
+        Index("ix_products_price_id", "price", "id"),
+        Index("ix_products_stock_id", "stock", "id"),
+        Index("ix_products_created_at_id", "created_at", "id"),
+        # pg_trgm lets ILIKE '%term%' and similarity search use an index.
+        Index(
+            "ix_products_name_trgm",
+            "name",
+            postgresql_using="gin",
+            postgresql_ops={"name": "gin_trgm_ops"},
+        ),
+        Index("ix_products_search_vector", "search_vector", postgresql_using="gin"),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
@@ -87,19 +145,32 @@ class Product(Base):
     is_available: Mapped[bool] = mapped_column(Boolean, default=True)
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
     updated_at: Mapped[datetime] = mapped_column(DateTime, nullable=True)
+    search_vector = mapped_column(
+        TSVECTOR,
+        Computed(
+            "to_tsvector('english', coalesce(name, '') || ' ' || coalesce(description, ''))",
+            persisted=True,
+        ),
+        deferred=True,
+    )
 
+    search_rank: Mapped[Optional[float]] = query_expression()
 
-class OrderStatus(BaseModel):
-    id: UUID = Field(default_factory=lambda: uuid.uuid4(), description="order_status ID.")
-    name: str = Field("pending", description="Name of the order_status.", unique=True)
-    created_at: datetime = Field(datetime.now, description="Time the order_status is created at.")
-    updated_at: datetime = Field(None, description="Time of the last update for the order_status.")
 
+event.listen(
+    Product.__table__,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql"),
+)
+
+Index(
+    "ix_products_is_available_id",
+    func.coalesce(Product.is_available, True),
+    Product.id,
+)
+Index(
+    "ix_products_updated_at_id",
+    func.coalesce(Product.updated_at, Product.created_at),
+    Product.id,
+)
 
-    name: Mapped[str] = mapped_column(String, nullable=False)
-    description: Mapped[str] = mapped_column(String, nullable=True)
-    price: Mapped[float] = mapped_column(DECIMAL(10, 2), nullable=False)
-    stock: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
-    is_available: Mapped[bool] = mapped_column(Boolean, default=True)
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
-    updated_at: Mapped[datetime] = mapped_column(DateTime, nullable=True)
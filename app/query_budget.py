@@ -0,0 +1,158 @@
+import contextvars
+import logging
+import os
+import re
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Tuple
+from sqlalchemy import event
+
+# Off by default: the listeners and middleware are only installed in dev/test.
+QUERY_BUDGET_ENABLED = os.getenv("QUERY_BUDGET_ENABLED", "false").lower() == "true"
+# Raise instead of logging when a budget is exceeded or an N+1 is detected.
+QUERY_BUDGET_STRICT = os.getenv("QUERY_BUDGET_STRICT", "false").lower() == "true"
+# Identical statement shapes seen this many times in one request are flagged.
+QUERY_BUDGET_REPEAT_THRESHOLD = int(os.getenv("QUERY_BUDGET_REPEAT_THRESHOLD", 3))
+
+logger = logging.getLogger(__name__)
+
+_tracker = contextvars.ContextVar("query_tracker", default=None)
+
+_PLACEHOLDER_LIST = re.compile(r"(\$\d+|%\(\w+\)s|\?)(\s*,\s*(\$\d+|%\(\w+\)s|\?))+")
+_WHITESPACE = re.compile(r"\s+")
+_SAVEPOINT_COMMANDS = ("SAVEPOINT", "RELEASE SAVEPOINT", "ROLLBACK TO SAVEPOINT")
+
+
+def statement_shape(statement: str) -> str:
+    # Expanded IN lists differ only in their number of placeholders.
+    statement = _PLACEHOLDER_LIST.sub("?, ...", statement)
+    return _WHITESPACE.sub(" ", statement).strip()
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+@dataclass
+class QueryReport:
+    label: str
+    count: int = 0
+    shapes: Counter = field(default_factory=Counter)
+
+    def record(self, statement: str):
+        self.count += 1
+        self.shapes[statement_shape(statement)] += 1
+
+    def repeated(self, threshold: int = QUERY_BUDGET_REPEAT_THRESHOLD) -> Dict[str, int]:
+        return {shape: count for shape, count in self.shapes.items() if count >= threshold}
+
+    def check(self, budget: Optional[int] = None) -> None:
+        problems = []
+        if budget is not None and self.count > budget:
+            problems.append(f"{self.count} statements, budget is {budget}")
+        for shape, count in self.repeated().items():
+            problems.append(f"possible N+1, {count}x: {shape}")
+        if not problems:
+            return
+        message = f"{self.label}: " + "; ".join(problems)
+        if QUERY_BUDGET_STRICT:
+            raise QueryBudgetExceeded(message)
+        logger.warning(message)
+
+
+class QueryBudgets:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._budgets: Dict[Tuple[str, str], int] = {}
+        self._last: Dict[Tuple[str, str], QueryReport] = {}
+
+    def set(self, method: str, route: str, budget: int) -> None:
+        with self._lock:
+            self._budgets[(method.upper(), route)] = budget
+
+    def get(self, method: str, route: str) -> Optional[int]:
+        with self._lock:
+            return self._budgets.get((method.upper(), route))
+
+    def record(self, method: str, route: str, report: QueryReport) -> None:
+        with self._lock:
+            self._last[(method.upper(), route)] = report
+
+    def last_report(self, method: str, route: str) -> Optional[QueryReport]:
+        with self._lock:
+            return self._last.get((method.upper(), route))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._budgets.clear()
+            self._last.clear()
+
+
+query_budgets = QueryBudgets()
+
+
+@contextmanager
+def expect_queries(budget: int, label: str = "block"):
+    # For tests that call services directly in this thread:
+    #     with expect_queries(1):
+    #         ProductService(db).create_product(product)
+    report = QueryReport(label)
+    token = _tracker.set(report)
+    try:
+        yield report
+    finally:
+        _tracker.reset(token)
+    if report.count > budget:
+        raise QueryBudgetExceeded(
+            f"{label}: {report.count} statements, budget is {budget}"
+        )
+
+
+def instrument_query_budget(engine):
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        report = _tracker.get()
+        # Savepoints are transaction bookkeeping (and how tests isolate
+        # committing services), not queries the code under test chose to run.
+        if report is not None and not statement.startswith(_SAVEPOINT_COMMANDS):
+            report.record(statement)
+
+
+class QueryBudgetMiddleware:
+    # Flags the route of every request that exceeds its budget or repeats a
+    # statement shape, and records the report so tests can assert on it:
+    #     query_budgets.set("GET", "/api/v1/orders/{order_id}", 2)
+    #     client.get(f"/api/v1/orders/{order_id}")
+    #     assert query_budgets.last_report("GET", "/api/v1/orders/{order_id}").count <= 2
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        report = QueryReport(f"{scope['method']} {scope['path']}")
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                message.setdefault("headers", [])
+                message["headers"] = list(message["headers"]) + [
+                    (b"x-query-count", str(report.count).encode())
+                ]
+            await send(message)
+
+        token = _tracker.set(report)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _tracker.reset(token)
+
+        route = scope.get("route")
+        if route is None:
+            return
+        report.label = f"{scope['method']} {route.path}"
+        query_budgets.record(scope["method"], route.path, report)
+        report.check(query_budgets.get(scope["method"], route.path))
@@ -6,7 +6,7 @@ from decimal import Decimal
 
 class OrderItem(BaseModel):
     product_id: UUID = Field(..., description="Product ID connected to the order.")
-    quantity: int = Field(..., description="Quantity of the product in the order.")
+    quantity: int = Field(..., gt=0, description="Quantity of the product in the order.")
 
 class OrderResponse(BaseModel):
     id: UUID = Field(..., description="Order ID.")
@@ -15,7 +15,7 @@ class OrderResponse(BaseModel):
     total_price: Decimal = Field(..., description="Total price of the order.", gt=0, max_digits=10, decimal_places=2)
     created_at: datetime = Field(..., description="Time the order was created.")
     updated_at: Optional[datetime] = Field(None, description="Time of the last update for the order.")
-    products: List[OrderProductResponse] = Field(..., description="List of products in the order.")
+    products: List[OrderItem] = Field(..., description="List of products in the order.")
 
 class OrderCreationResponse(BaseModel):
     id: UUID = Field(..., description="Order ID.")
@@ -23,3 +23,21 @@ class OrderCreationResponse(BaseModel):
     status: str = Field(..., description="Status of the order.")  
     total_price: Decimal = Field(..., description="Total price of the order.", gt=0, max_digits=10, decimal_places=2)
     created_at: datetime = Field(..., description="Time the order was created.")
+
+class BatchOrder(BaseModel):
+    items: List[OrderItem] = Field(..., min_length=1, description="Products in this order.")
+
+class BatchOrderRequest(BaseModel):
+    orders: List[BatchOrder] = Field(..., min_length=1, max_length=1000, description="Orders to create.")
+
+class BatchOrderResult(BaseModel):
+    index: int = Field(..., description="Position of the order in the request.")
+    status: str = Field(..., description="created or failed.")
+    order_id: Optional[UUID] = Field(None, description="ID of the created order.")
+    total_price: Optional[Decimal] = Field(None, description="Total price of the created order.")
+    failed_items: Optional[List[dict]] = Field(None, description="Lines that could not be reserved.")
+
+class BatchOrderResponse(BaseModel):
+    created: int = Field(..., description="Number of orders created.")
+    failed: int = Field(..., description="Number of orders rejected.")
+    results: List[BatchOrderResult] = Field(..., description="Per-order outcome, in request order.")
@@ -1,7 +1,7 @@
-from pydantic import BaseModel, Field, condecimal, constr, validator
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter, field_validator
 from uuid import UUID
 from datetime import datetime
-from typing import Optional
+from typing import List, Literal, Optional
 from decimal import Decimal
 from sqlalchemy.dialects.postgresql import UUID
 import uuid
@@ -14,18 +14,15 @@ class ProductCreate(BaseModel):
     stock: int = Field(..., ge=0)
     is_available: bool = Field(None)
 
-    @validator("name")
+    model_config = ConfigDict(from_attributes=True, populate_by_name=True)
+
+    @field_validator("name")
+    @classmethod
     def validate_name(cls, v):
         if not v or len(v.strip()) == 0:
             raise ValueError("Product name cannot be empty")
         return v
 
-    class Config:
-        from_attributes = True
-        allow_population_by_field_name = True
-        orm_mode = True
-        arbitrary_types_allowed = True
-
 
 class ProductResponse(BaseModel):
     id: uuid.UUID
@@ -37,10 +34,11 @@ class ProductResponse(BaseModel):
     created_at: datetime
     updated_at: Optional[datetime] = Field(default=None)
 
-    class Config:
-        from_attributes = True
-        orm_mode = True
-        arbitrary_types_allowed = True
+    model_config = ConfigDict(from_attributes=True)
+
+
+# Validates a whole page of ORM rows in one pydantic-core call.
+ProductResponseList = TypeAdapter(List[ProductResponse])
 
 
 class ProductUpdate(BaseModel):
@@ -50,13 +48,13 @@ class ProductUpdate(BaseModel):
     stock: int = Field(None)
     is_available: bool = Field(None)
 
-    class Config:
-        from_attributes = True
-        orm_mode = True
-        arbitrary_types_allowed = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class ProductSearchParams(BaseModel):
+    q: Optional[str] = Field(
+        default=None, description="Full-text search over name and description"
+    )
     name: Optional[str] = Field(
         default=None, description="Partial or full product name"
     )
@@ -71,3 +69,42 @@ class ProductSearchParams(BaseModel):
     )
     sort_by: str = Field(default="name", description="Sort by field")
     sort_order: str = Field(default="asc", description="Sort order: asc or desc")
+    cursor: Optional[str] = Field(
+        default=None, description="Opaque keyset cursor returned as next_cursor"
+    )
+    count: Literal["exact", "estimated", "cached", "none"] = Field(
+        default="exact", description="How total_products is computed"
+    )
+
+
+class ProductSearchPage(BaseModel):
+    page: Optional[int] = Field(None, description="Page number; absent for cursor pages")
+    total_pages: Optional[int] = Field(None, description="Absent when count=none")
+    products_per_page: int
+    total_products: Optional[int] = Field(None, description="Absent when count=none")
+    has_more: bool
+    next_cursor: Optional[str] = None
+    products: List[ProductResponse]
+
+
+class ProductImportRequest(BaseModel):
+    products: list[dict] = Field(
+        ..., min_length=1, max_length=100000, description="Rows shaped like ProductCreate"
+    )
+    on_conflict: Literal["error", "skip", "update"] = Field(
+        default="error",
+        description="What to do with rows whose name already exists",
+    )
+
+
+class ProductImportError(BaseModel):
+    index: int = Field(..., description="Position of the row in the request.")
+    errors: list = Field(..., description="Why the row was rejected.")
+
+
+class ProductImportResponse(BaseModel):
+    created: int = Field(..., description="Number of products inserted.")
+    updated: int = Field(..., description="Number of existing products overwritten.")
+    skipped: int = Field(..., description="Number of rows left out as duplicates.")
+    failed: int = Field(..., description="Number of rows rejected.")
+    errors: list[ProductImportError] = Field(..., description="Per-row errors, in request order.")
@@ -1,4 +1,4 @@
-from pydantic import BaseModel, EmailStr, Field
+from pydantic import BaseModel, ConfigDict, EmailStr, Field, TypeAdapter
 from uuid import UUID
 from datetime import datetime
 from typing import Optional
@@ -19,10 +19,7 @@ class UserResponse(BaseModel):
     created_at: datetime
     updated_at: Optional[datetime] = Field(default=None)
 
-    class Config:
-        from_attributes = True
-        orm_mode = True
-        arbitrary_types_allowed = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 #
@@ -31,12 +28,29 @@ class UserUpdateRequest(BaseModel):
     password: Optional[str] = Field(None)
     email: Optional[EmailStr] = Field(None)
 
-    class Config:
-        from_attributes = True
-        orm_mode = True
-        arbitrary_types_allowed = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class ChangeRoleRequest(BaseModel):
     user_id: UUID
     is_admin: bool
+
+
+class UserListParams(BaseModel):
+    email_prefix: Optional[str] = Field(None, description="Email starts with")
+    username_prefix: Optional[str] = Field(None, description="Username starts with")
+    is_active: Optional[bool] = Field(None)
+    is_admin: Optional[bool] = Field(None)
+    created_from: Optional[datetime] = Field(None, description="Created at or after")
+    created_to: Optional[datetime] = Field(None, description="Created before")
+    limit: int = Field(100, ge=1, le=1000)
+    cursor: Optional[str] = Field(None, description="next_cursor of the previous page")
+
+
+UserResponseList = TypeAdapter(list[UserResponse])
+
+
+class UserPage(BaseModel):
+    users: list[UserResponse]
+    has_more: bool
+    next_cursor: Optional[str] = None
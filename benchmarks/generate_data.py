@@ -0,0 +1,267 @@
+"""Generate and bulk-load synthetic users, products and orders.
+
+Every row is derived from --seed and its index, so two runs with the same
+arguments produce identical data, and order lines can reference users and
+products without any worker holding their ids. Tables are loaded with
+COPY FROM STDIN in --chunk-size chunks spread over --workers processes:
+
+    python -m benchmarks.generate_data --users 1000000 --products 2000000 \\
+        --orders 5000000 --workers 8
+
+Run it against a disposable database at the current migration head. All
+generated users share the password "Password-123!".
+"""
+import argparse
+import csv
+import hashlib
+import io
+import multiprocessing
+import random
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+PASSWORD = "Password-123!"
+STATUSES = (("pending", 0.15), ("shipped", 0.25), ("delivered", 0.5), ("canceled", 0.1))
+ADJECTIVES = (
+    "steel", "cotton", "wireless", "organic", "compact", "leather", "ceramic",
+    "portable", "vintage", "smart", "bamboo", "classic", "outdoor", "premium",
+)
+NOUNS = (
+    "kettle", "backpack", "headphones", "lamp", "chair", "notebook", "blender",
+    "jacket", "speaker", "mug", "watch", "tent", "keyboard", "bottle",
+)
+HISTORY = timedelta(days=730)
+
+# Set in each worker process by _init_worker.
+_engine = None
+_options = None
+
+
+def row_id(kind: str, index: int, seed: int) -> uuid.UUID:
+    digest = hashlib.md5(f"{seed}:{kind}:{index}".encode()).digest()
+    return uuid.UUID(bytes=digest, version=4)
+
+
+def product_price_cents(index: int, seed: int) -> int:
+    digest = hashlib.md5(f"{seed}:price:{index}".encode()).digest()
+    return 100 + int.from_bytes(digest[:4], "big") % 99900
+
+
+def _timestamp(rng: random.Random, now: datetime) -> datetime:
+    return now - HISTORY * rng.random()
+
+
+def _cents(cents: int) -> str:
+    return f"{cents // 100}.{cents % 100:02d}"
+
+
+def user_rows(start: int, stop: int, options):
+    rng = random.Random(f"{options.seed}:users:{start}")
+    for index in range(start, stop):
+        created_at = _timestamp(rng, options.now)
+        yield (
+            row_id("user", index, options.seed),
+            f"user{index}",
+            f"user{index}@example.com",
+            options.hashed_password,
+            rng.random() < 0.001,
+            rng.random() < 0.97,
+            created_at.replace(tzinfo=None),
+            None,
+        )
+
+
+def product_rows(start: int, stop: int, options):
+    rng = random.Random(f"{options.seed}:products:{start}")
+    for index in range(start, stop):
+        adjective, noun = rng.choice(ADJECTIVES), rng.choice(NOUNS)
+        created_at = _timestamp(rng, options.now)
+        stock = rng.randint(0, 500)
+        yield (
+            row_id("product", index, options.seed),
+            f"{adjective.title()} {noun} {index}",
+            f"A {adjective} {noun} with {' and '.join(rng.sample(ADJECTIVES, 2))} details.",
+            _cents(product_price_cents(index, options.seed)),
+            stock,
+            stock > 0,
+            created_at.replace(tzinfo=None),
+            None,
+        )
+
+
+def order_rows(start: int, stop: int, options):
+    rng = random.Random(f"{options.seed}:orders:{start}")
+    names = [name for name, _ in STATUSES]
+    weights = [weight for _, weight in STATUSES]
+    orders, lines = [], []
+    for index in range(start, stop):
+        order_id = row_id("order", index, options.seed)
+        # Squaring skews demand towards a head of popular products.
+        product_indexes = {
+            int(options.products * rng.random() ** 2)
+            for _ in range(rng.randint(1, 5))
+        }
+        total = 0
+        for line, product_index in enumerate(sorted(product_indexes)):
+            quantity = rng.randint(1, 3)
+            total += product_price_cents(product_index, options.seed) * quantity
+            lines.append(
+                (
+                    row_id(f"line-{line}", index, options.seed),
+                    order_id,
+                    row_id("product", product_index, options.seed),
+                    quantity,
+                )
+            )
+        created_at = _timestamp(rng, options.now)
+        orders.append(
+            (
+                order_id,
+                row_id("user", rng.randrange(options.users), options.seed),
+                options.status_ids[rng.choices(names, weights)[0]],
+                _cents(total),
+                created_at,
+                None,
+            )
+        )
+    return orders, lines
+
+
+TABLES = {
+    "users": (
+        "id", "username", "email", "hashed_password", "is_admin", "is_active",
+        "created_at", "updated_at",
+    ),
+    "products": (
+        "id", "name", "description", "price", "stock", "is_available",
+        "created_at", "updated_at",
+    ),
+    "orders": ("id", "user_id", "status_id", "total_price", "created_at", "updated_at"),
+    "order_products": ("id", "order_id", "product_id", "quantity"),
+}
+
+
+def _copy(cursor, table: str, rows) -> int:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    count = 0
+    for row in rows:
+        writer.writerow(row)
+        count += 1
+    buffer.seek(0)
+    # Empty unquoted fields load as NULL (the optional updated_at columns).
+    cursor.copy_expert(
+        f"COPY {table} ({', '.join(TABLES[table])}) FROM STDIN WITH (FORMAT csv)",
+        buffer,
+    )
+    return count
+
+
+def _init_worker(options):
+    global _engine, _options
+    from sqlalchemy import create_engine
+    from sqlalchemy.pool import NullPool
+    from app.db.database import DATABASE_URL
+
+    _engine = create_engine(DATABASE_URL, poolclass=NullPool)
+    _options = options
+
+
+def load_chunk(task) -> tuple:
+    table, start, stop = task
+    connection = _engine.raw_connection()
+    try:
+        cursor = connection.cursor()
+        if table == "users":
+            count = _copy(cursor, "users", user_rows(start, stop, _options))
+        elif table == "products":
+            count = _copy(cursor, "products", product_rows(start, stop, _options))
+        else:
+            # An order chunk and its lines commit together, so lines never
+            # point at orders that are not there.
+            orders, lines = order_rows(start, stop, _options)
+            _copy(cursor, "orders", orders)
+            _copy(cursor, "order_products", lines)
+            count = len(orders)
+        connection.commit()
+    finally:
+        connection.close()
+    return table, count
+
+
+def prepare(options):
+    from sqlalchemy import select, text
+    from sqlalchemy.dialects.postgresql import insert
+    from app.api.dependencies.password_hasher import pwd_context
+    from app.api.services.order_status_registry import bump_version_statement
+    from app.db.database import SessionLocal
+    from app.models import OrderStatus
+
+    options.hashed_password = pwd_context.hash(PASSWORD)
+    options.now = datetime.now(timezone.utc)
+    with SessionLocal() as db:
+        if options.truncate:
+            db.execute(text("TRUNCATE order_products, orders, products, users CASCADE"))
+        db.execute(
+            insert(OrderStatus)
+            .values([{"name": name} for name, _ in STATUSES])
+            .on_conflict_do_nothing(index_elements=[OrderStatus.name])
+        )
+        # Running workers reload their status registry on the next check.
+        db.execute(bump_version_statement())
+        options.status_ids = dict(
+            db.execute(select(OrderStatus.name, OrderStatus.id)).all()
+        )
+        db.commit()
+
+
+def chunks(table: str, total: int, chunk_size: int):
+    return [(table, start, min(start + chunk_size, total)) for start in range(0, total, chunk_size)]
+
+
+def run_phase(pool, tasks, label: str):
+    started_at = time.perf_counter()
+    loaded = {}
+    for table, count in pool.imap_unordered(load_chunk, tasks):
+        loaded[table] = loaded.get(table, 0) + count
+    elapsed = time.perf_counter() - started_at
+    for table, count in sorted(loaded.items()):
+        print(f"{label}: {count} {table} in {elapsed:.1f}s ({count / elapsed:,.0f} rows/s)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=100000)
+    parser.add_argument("--products", type=int, default=100000)
+    parser.add_argument("--orders", type=int, default=500000)
+    parser.add_argument("--workers", type=int, default=multiprocessing.cpu_count())
+    parser.add_argument("--chunk-size", type=int, default=50000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--truncate", action="store_true", help="Empty the tables first")
+    options = parser.parse_args(argv)
+    if options.orders and not (options.users and options.products):
+        parser.error("orders need at least one user and one product")
+
+    prepare(options)
+    context = multiprocessing.get_context("spawn")
+    with context.Pool(options.workers, initializer=_init_worker, initargs=(options,)) as pool:
+        # Orders reference users and products, so those are loaded first.
+        run_phase(
+            pool,
+            chunks("users", options.users, options.chunk_size)
+            + chunks("products", options.products, options.chunk_size),
+            "catalog",
+        )
+        run_phase(pool, chunks("orders", options.orders, options.chunk_size), "orders")
+
+    from sqlalchemy import text
+    from app.db.database import SessionLocal
+
+    with SessionLocal() as db:
+        db.execute(text("ANALYZE users, products, orders, order_products"))
+        db.commit()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""Latency of OrderService.create_order by cart size.
+
+Run against a disposable database, it seeds its own products:
+
+    python -m benchmarks.order_creation --cart-sizes 1 5 10 30 100 --repeat 50
+"""
+import argparse
+import statistics
+import time
+from decimal import Decimal
+from sqlalchemy import delete, insert, select
+from app.db.database import SessionLocal
+from app.models import Order, OrderProduct, OrderStatus, Product
+from app.api.services.order_service import OrderService
+from app.schemas.order import OrderItem
+
+
+def seed_products(db, count: int):
+    rows = [
+        {
+            "name": f"bench-order-product-{index}",
+            "price": Decimal("9.99"),
+            "stock": 10_000_000,
+            "is_available": True,
+        }
+        for index in range(count)
+    ]
+    product_ids = db.execute(insert(Product).returning(Product.id), rows).scalars().all()
+    if not db.execute(select(OrderStatus.id).where(OrderStatus.name == "pending")).first():
+        db.add(OrderStatus(name="pending"))
+    db.commit()
+    return product_ids
+
+
+def percentile(samples, fraction: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def run(cart_sizes, repeat: int):
+    with SessionLocal() as db:
+        product_ids = seed_products(db, max(cart_sizes))
+
+    order_ids = []
+    print(f"{'lines':>6} {'mean ms':>10} {'p50 ms':>10} {'p95 ms':>10}")
+    try:
+        for cart_size in cart_sizes:
+            items = [
+                OrderItem(product_id=product_id, quantity=1)
+                for product_id in product_ids[:cart_size]
+            ]
+            samples = []
+            for _ in range(repeat):
+                with SessionLocal() as db:
+                    start = time.perf_counter()
+                    response = OrderService(db).create_order(order_items=items)
+                    samples.append((time.perf_counter() - start) * 1000)
+                    order_ids.append(response.id)
+            print(
+                f"{cart_size:>6} {statistics.mean(samples):>10.2f} "
+                f"{percentile(samples, 0.5):>10.2f} {percentile(samples, 0.95):>10.2f}"
+            )
+    finally:
+        with SessionLocal() as db:
+            db.execute(delete(OrderProduct).where(OrderProduct.order_id.in_(order_ids)))
+            db.execute(delete(Order).where(Order.id.in_(order_ids)))
+            db.execute(delete(Product).where(Product.id.in_(product_ids)))
+            db.commit()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cart-sizes", type=int, nargs="+", default=[1, 5, 10, 30, 100])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    run(args.cart_sizes, args.repeat)
@@ -0,0 +1,109 @@
+"""Per-page serialization time of product search responses.
+
+Needs no database: it builds transient Product rows and times turning a
+page of them into response bytes, the way each version of search did:
+
+    python -m benchmarks.serialization --page-sizes 20 100 1000 --repeat 200
+"""
+import argparse
+import json
+import statistics
+import time
+import uuid
+from datetime import datetime
+from decimal import Decimal
+import orjson
+from fastapi.encoders import jsonable_encoder
+from app.models import Product
+from app.schemas.product import ProductResponse, ProductResponseList, ProductSearchPage
+
+
+def build_products(count: int):
+    now = datetime.utcnow()
+    return [
+        Product(
+            id=uuid.uuid4(),
+            name=f"bench-serialization-product-{index}",
+            description="A product used to time response serialization.",
+            price=Decimal("19.99"),
+            stock=100,
+            is_available=True,
+            created_at=now,
+            updated_at=now,
+        )
+        for index in range(count)
+    ]
+
+
+def per_row_dict(products) -> bytes:
+    # from_orm per row into a plain dict, encoded by jsonable_encoder + json.
+    body = {
+        "page": 1,
+        "products_per_page": len(products),
+        "total_products": len(products),
+        "products": [ProductResponse.model_validate(product) for product in products],
+    }
+    return json.dumps(jsonable_encoder(body)).encode()
+
+
+def typed_page(products) -> bytes:
+    # One TypeAdapter call for the page, then exactly what GET /products/
+    # returns: an ORJSONResponse of model_dump(mode="json"), with no
+    # response_model re-validation.
+    page = ProductSearchPage(
+        page=1,
+        products_per_page=len(products),
+        total_products=len(products),
+        has_more=False,
+        products=ProductResponseList.validate_python(products, from_attributes=True),
+    )
+    return orjson.dumps(page.model_dump(mode="json"))
+
+
+def cached_page(cached: str) -> bytes:
+    # A read-cache hit: parse the stored JSON straight into the page model.
+    page = ProductSearchPage.model_validate_json(cached)
+    return orjson.dumps(page.model_dump(mode="json"))
+
+
+def percentile(samples, fraction: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def measure(fn, argument, repeat: int):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(argument)
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def run(page_sizes, repeat: int):
+    print(f"{'rows':>6} {'strategy':>12} {'mean ms':>10} {'p50 ms':>10} {'p95 ms':>10}")
+    for page_size in page_sizes:
+        products = build_products(page_size)
+        cached = ProductSearchPage(
+            products_per_page=page_size,
+            has_more=False,
+            products=ProductResponseList.validate_python(products, from_attributes=True),
+        ).model_dump_json()
+        for name, fn, argument in (
+            ("per-row", per_row_dict, products),
+            ("typed", typed_page, products),
+            ("cached", cached_page, cached),
+        ):
+            samples = measure(fn, argument, repeat)
+            print(
+                f"{page_size:>6} {name:>12} {statistics.mean(samples):>10.3f} "
+                f"{percentile(samples, 0.5):>10.3f} {percentile(samples, 0.95):>10.3f}"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--page-sizes", type=int, nargs="+", default=[20, 100, 1000])
+    parser.add_argument("--repeat", type=int, default=100)
+    args = parser.parse_args()
+    run(args.page_sizes, args.repeat)
@@ -0,0 +1,89 @@
+"""Import time of app.main, checked against a budget.
+
+Imports the app in a fresh interpreter pointed at a port nothing listens
+on, so the import fails if it tries to reach the database, then prints the
+slowest modules from -X importtime. Exits non-zero when the import errors,
+opens a connection or exceeds --budget-ms, so CI can run it as a gate:
+
+    python -m benchmarks.startup --budget-ms 1500 --repeat 5
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+PROBE = """
+import time
+started_at = time.perf_counter()
+import app.main
+from app.db.database import async_engine, engine
+elapsed_ms = (time.perf_counter() - started_at) * 1000
+connections = (
+    engine.pool.stats.connections_created
+    + async_engine.sync_engine.pool.stats.connections_created
+)
+print(f"{elapsed_ms:.3f} {connections}")
+"""
+
+
+def probe_environment() -> dict:
+    environment = dict(os.environ)
+    # Nothing listens on port 9 (discard) here, so any connection attempt fails.
+    environment.update(POSTGRES_HOST="127.0.0.1", POSTGRES_PORT="9")
+    return environment
+
+
+def import_once(environment: dict, importtime: bool = False):
+    command = [sys.executable]
+    if importtime:
+        command += ["-X", "importtime"]
+    result = subprocess.run(
+        command + ["-c", PROBE], capture_output=True, text=True, env=environment
+    )
+    if result.returncode != 0:
+        raise SystemExit(f"importing app.main failed:\n{result.stderr}")
+    elapsed_ms, connections = result.stdout.split()
+    return float(elapsed_ms), int(connections), result.stderr
+
+
+def slowest_modules(importtime_log: str, top: int):
+    # Lines look like "import time:   self [us] | cumulative | imported package".
+    modules = []
+    for line in importtime_log.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        modules.append((int(cumulative), name.strip()))
+    return sorted(modules, reverse=True)[:top]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--budget-ms", type=float, default=1500)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15, help="Slowest modules to list")
+    args = parser.parse_args(argv)
+
+    environment = probe_environment()
+    samples = []
+    for _ in range(args.repeat):
+        elapsed_ms, connections, _ = import_once(environment)
+        if connections:
+            raise SystemExit(f"importing app.main opened {connections} database connections")
+        samples.append(elapsed_ms)
+
+    _, _, importtime_log = import_once(environment, importtime=True)
+    print(f"{'cumulative ms':>14}  module")
+    for cumulative_us, name in slowest_modules(importtime_log, args.top):
+        print(f"{cumulative_us / 1000:>14.1f}  {name}")
+
+    median = statistics.median(samples)
+    print(f"import app.main: median {median:.1f} ms, max {max(samples):.1f} ms "
+          f"over {len(samples)} runs, budget {args.budget_ms:.0f} ms")
+    if median > args.budget_ms:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
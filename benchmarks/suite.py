@@ -0,0 +1,365 @@
+"""End-to-end latency and throughput of the main read and write paths.
+
+Boots the app in-process (or targets --base-url) against the configured
+Postgres, seeds its own rows, runs each scenario and prints p50/p95/p99
+latency and throughput. --output writes the same numbers as JSON so runs
+can be diffed between commits:
+
+    python -m benchmarks --products 50000 --requests 500 --concurrency 16 \\
+        --output bench-$(git rev-parse --short HEAD).json
+
+Login and order routes are not mounted in app/api/main.py, so "login" and
+the checkout scenarios drive the same code through the services and auth
+helpers; everything else goes through HTTP.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import subprocess
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from decimal import Decimal
+
+HTTP_SCENARIOS = ("browse", "deep_offset", "deep_cursor", "search", "login")
+CHECKOUT_SCENARIOS = ("checkout", "contended_checkout")
+SCENARIOS = HTTP_SCENARIOS + CHECKOUT_SCENARIOS
+SEARCH_WORDS = (
+    "steel", "cotton", "wireless", "organic", "compact", "leather", "ceramic",
+    "portable", "vintage", "smart", "bamboo", "classic", "outdoor", "premium",
+)
+BENCH_PREFIX = "bench-suite-"
+BENCH_PASSWORD = "Bench-password-1!"
+
+
+def percentile(samples, fraction: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def summarize(samples, errors: int, elapsed: float) -> dict:
+    if not samples:
+        return {"requests": 0, "errors": errors}
+    return {
+        "requests": len(samples),
+        "errors": errors,
+        "throughput_rps": round(len(samples) / elapsed, 2),
+        "latency_ms": {
+            "mean": round(statistics.mean(samples), 3),
+            "p50": round(percentile(samples, 0.50), 3),
+            "p95": round(percentile(samples, 0.95), 3),
+            "p99": round(percentile(samples, 0.99), 3),
+            "max": round(max(samples), 3),
+        },
+    }
+
+
+class Seed:
+    def __init__(self, products: int, users: int, rng: random.Random):
+        self.product_count = products
+        self.user_count = users
+        self.rng = rng
+        self.product_ids = []
+        self.user_ids = []
+        self.hashed_password = None
+        self.order_ids = []
+
+    def create(self):
+        from sqlalchemy import insert, select
+        from app.api.dependencies.password_hasher import pwd_context
+        from app.db.database import SessionLocal
+        from app.models import OrderStatus, Product, User
+
+        self.hashed_password = pwd_context.hash(BENCH_PASSWORD)
+        with SessionLocal() as db:
+            for start in range(0, self.product_count, 5000):
+                rows = [
+                    {
+                        "name": f"{BENCH_PREFIX}product-{index}",
+                        "description": " ".join(self.rng.sample(SEARCH_WORDS, 3)),
+                        "price": Decimal(self.rng.randint(100, 100000)) / 100,
+                        # Enough stock that checkouts never run dry mid-run.
+                        "stock": 10_000_000,
+                        "is_available": True,
+                    }
+                    for index in range(start, min(start + 5000, self.product_count))
+                ]
+                self.product_ids += db.execute(
+                    insert(Product).returning(Product.id), rows
+                ).scalars().all()
+            self.user_ids = db.execute(
+                insert(User).returning(User.id),
+                [
+                    {
+                        "username": f"{BENCH_PREFIX}user-{index}",
+                        "email": f"{BENCH_PREFIX}user-{index}@example.com",
+                        "hashed_password": self.hashed_password,
+                    }
+                    for index in range(self.user_count)
+                ],
+            ).scalars().all()
+            if not db.execute(select(OrderStatus.id).where(OrderStatus.name == "pending")).first():
+                db.add(OrderStatus(name="pending"))
+            db.commit()
+        # Let estimated counts and the planner see the new rows.
+        with SessionLocal() as db:
+            db.connection().exec_driver_sql("ANALYZE products")
+            db.commit()
+
+    def drop(self):
+        from sqlalchemy import delete
+        from app.db.database import SessionLocal
+        from app.models import Order, OrderProduct, Product, User
+
+        with SessionLocal() as db:
+            for start in range(0, len(self.order_ids), 5000):
+                chunk = self.order_ids[start:start + 5000]
+                db.execute(delete(OrderProduct).where(OrderProduct.order_id.in_(chunk)))
+                db.execute(delete(Order).where(Order.id.in_(chunk)))
+            db.execute(delete(Product).where(Product.name.startswith(BENCH_PREFIX)))
+            db.execute(delete(User).where(User.username.startswith(BENCH_PREFIX)))
+            db.commit()
+
+
+async def drive_http(client, make_request, total: int, concurrency: int) -> dict:
+    samples, errors = [], 0
+    remaining = total
+
+    async def worker():
+        nonlocal remaining, errors
+        while remaining > 0:
+            remaining -= 1
+            start = time.perf_counter()
+            try:
+                ok = await make_request(client)
+            except Exception:
+                ok = False
+            if ok:
+                samples.append((time.perf_counter() - start) * 1000)
+            else:
+                errors += 1
+
+    started_at = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarize(samples, errors, time.perf_counter() - started_at)
+
+
+def drive_threads(call, total: int, concurrency: int) -> dict:
+    def timed(_):
+        start = time.perf_counter()
+        try:
+            call()
+        except Exception:
+            return None
+        return (time.perf_counter() - start) * 1000
+
+    started_at = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(timed, range(total)))
+    samples = [result for result in results if result is not None]
+    return summarize(samples, len(results) - len(samples), time.perf_counter() - started_at)
+
+
+def http_scenarios(seed: Seed, args):
+    rng = seed.rng
+    products_url = "/api/v1/products/"
+    last_page = max(1, seed.product_count // 20)
+
+    async def browse(client):
+        response = await client.get(
+            products_url,
+            params={"page": rng.randint(1, 5), "page_size": 20, "count": "estimated"},
+        )
+        return response.status_code == 200
+
+    async def deep_offset(client):
+        response = await client.get(
+            products_url,
+            params={
+                "page": rng.randint(max(1, last_page - 50), last_page),
+                "page_size": 20,
+                "count": "none",
+            },
+        )
+        return response.status_code == 200
+
+    cursors = {"next": None}
+
+    async def deep_cursor(client):
+        # Walks the catalog page by page, starting over at the end.
+        params = {"page_size": 20, "sort_by": "created_at", "count": "none"}
+        if cursors["next"]:
+            params["cursor"] = cursors["next"]
+        response = await client.get(products_url, params=params)
+        cursors["next"] = response.json().get("next_cursor")
+        return response.status_code == 200
+
+    async def search(client):
+        response = await client.get(
+            products_url,
+            params={"q": " ".join(rng.sample(SEARCH_WORDS, 2)), "count": "estimated"},
+        )
+        return response.status_code == 200
+
+    async def login(client):
+        from app.api.dependencies.auth import create_access_token
+        from app.api.dependencies.password_utils import verify_password_async
+
+        user_id = rng.choice(seed.user_ids)
+        if not await verify_password_async(BENCH_PASSWORD, seed.hashed_password):
+            return False
+        # A fresh token per login, as a real client would hold.
+        token = create_access_token(data={"sub": str(user_id), "jti": uuid.uuid4().hex})
+        response = await client.get(
+            f"/api/v1/users/{user_id}", headers={"Authorization": f"Bearer {token}"}
+        )
+        return response.status_code == 200
+
+    return {
+        "browse": browse,
+        "deep_offset": deep_offset,
+        "deep_cursor": deep_cursor,
+        "search": search,
+        "login": login,
+    }
+
+
+def checkout_scenarios(seed: Seed, args):
+    from app.api.services.order_service import OrderService
+    from app.db.database import SessionLocal
+    from app.schemas.order import OrderItem
+
+    rng = seed.rng
+
+    def checkout():
+        items = [
+            OrderItem(product_id=product_id, quantity=1)
+            for product_id in rng.sample(seed.product_ids, args.lines)
+        ]
+        with SessionLocal() as db:
+            seed.order_ids.append(OrderService(db).create_order(order_items=items).id)
+
+    hot_sku = seed.product_ids[0]
+
+    def contended_checkout():
+        with SessionLocal() as db:
+            response = OrderService(db).create_order(
+                order_items=[OrderItem(product_id=hot_sku, quantity=1)]
+            )
+            seed.order_ids.append(response.id)
+
+    return {"checkout": checkout, "contended_checkout": contended_checkout}
+
+
+async def run_http(seed: Seed, args, names) -> dict:
+    import httpx
+
+    if args.base_url:
+        client = httpx.AsyncClient(base_url=args.base_url, timeout=60)
+    else:
+        from app.main import app
+
+        client = httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=60
+        )
+    scenarios = http_scenarios(seed, args)
+    results = {}
+    async with client:
+        for name in names:
+            # Warm connections, caches and plans before measuring.
+            await drive_http(client, scenarios[name], min(20, args.requests), args.concurrency)
+            results[name] = await drive_http(
+                client, scenarios[name], args.requests, args.concurrency
+            )
+            print_result(name, results[name])
+    return results
+
+
+def print_result(name: str, result: dict):
+    latency = result.get("latency_ms", {})
+    print(
+        f"{name:>20} {result['requests']:>8} {result['errors']:>7} "
+        f"{result.get('throughput_rps', 0):>10.1f} {latency.get('p50', 0):>9.2f} "
+        f"{latency.get('p95', 0):>9.2f} {latency.get('p99', 0):>9.2f}"
+    )
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def run(args) -> dict:
+    # Cached reads would measure the cache, not the query path.
+    if not args.read_cache:
+        os.environ.setdefault("READ_CACHE_BACKEND", "none")
+
+    seed = Seed(args.products, args.users, random.Random(args.seed))
+    names = [name for name in SCENARIOS if name in args.scenarios]
+    print(f"seeding {args.products} products and {args.users} users...")
+    seed.create()
+
+    print(
+        f"{'scenario':>20} {'requests':>8} {'errors':>7} {'req/s':>10} "
+        f"{'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}"
+    )
+    results = {}
+    try:
+        http_names = [name for name in names if name in HTTP_SCENARIOS]
+        if http_names:
+            results.update(asyncio.run(run_http(seed, args, http_names)))
+
+        checkouts = checkout_scenarios(seed, args)
+        for name in names:
+            if name in CHECKOUT_SCENARIOS:
+                results[name] = drive_threads(checkouts[name], args.requests, args.concurrency)
+                print_result(name, results[name])
+    finally:
+        if not args.keep_data:
+            seed.drop()
+
+    return {
+        "revision": git_revision(),
+        "finished_at": datetime.now(timezone.utc).isoformat(),
+        "parameters": {
+            "products": args.products,
+            "users": args.users,
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "lines": args.lines,
+            "seed": args.seed,
+            "db_async_enabled": os.getenv("DB_ASYNC_ENABLED", "false"),
+            "base_url": args.base_url,
+        },
+        "scenarios": results,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--products", type=int, default=10000)
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--requests", type=int, default=200, help="Timed requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--lines", type=int, default=5, help="Lines per checkout order")
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--base-url", help="Benchmark a running server instead of the in-process app")
+    parser.add_argument("--read-cache", action="store_true", help="Keep the product read cache enabled")
+    parser.add_argument("--keep-data", action="store_true", help="Leave seeded rows in place")
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    args = parser.parse_args(argv)
+
+    report = run(args)
+    if args.output:
+        with open(args.output, "w") as output:
+            json.dump(report, output, indent=2, sort_keys=True)
+        print(f"wrote {args.output}")
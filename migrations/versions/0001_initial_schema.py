@@ -0,0 +1,107 @@
+"""initial schema
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import UUID
+
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "users",
+        sa.Column("id", UUID(as_uuid=True), primary_key=True),
+        sa.Column("username", sa.String(), nullable=False),
+        sa.Column("email", sa.String(), nullable=False, unique=True),
+        sa.Column("hashed_password", sa.String(), nullable=False),
+        sa.Column("is_admin", sa.Boolean()),
+        sa.Column("is_active", sa.Boolean()),
+        sa.Column("created_at", sa.DateTime()),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+    )
+    op.create_table(
+        "order_status",
+        sa.Column("id", UUID(as_uuid=True), primary_key=True),
+        sa.Column("name", sa.String(), nullable=False, unique=True),
+        sa.Column("created_at", sa.DateTime(timezone=True)),
+        sa.Column("updated_at", sa.DateTime(timezone=True)),
+    )
+    op.create_table(
+        "products",
+        sa.Column("id", UUID(as_uuid=True), primary_key=True),
+        sa.Column("name", sa.String(), nullable=False),
+        sa.Column("description", sa.String(), nullable=True),
+        sa.Column("price", sa.DECIMAL(10, 2), nullable=False),
+        sa.Column("stock", sa.Integer(), nullable=False),
+        sa.Column("is_available", sa.Boolean()),
+        sa.Column("created_at", sa.DateTime()),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+    )
+    op.create_index("ix_products_name_id", "products", ["name", "id"])
+    op.create_index("ix_products_price_id", "products", ["price", "id"])
+    op.create_index("ix_products_stock_id", "products", ["stock", "id"])
+    op.create_index("ix_products_created_at_id", "products", ["created_at", "id"])
+    op.create_index(
+        "ix_products_is_available_id",
+        "products",
+        [sa.text("coalesce(is_available, true)"), "id"],
+    )
+    op.create_index(
+        "ix_products_updated_at_id",
+        "products",
+        [sa.text("coalesce(updated_at, created_at)"), "id"],
+    )
+    op.create_table(
+        "orders",
+        sa.Column("id", UUID(as_uuid=True), primary_key=True),
+        sa.Column(
+            "user_id",
+            UUID(as_uuid=True),
+            sa.ForeignKey("users.id", ondelete="SET NULL"),
+            nullable=True,
+        ),
+        sa.Column(
+            "status_id",
+            UUID(as_uuid=True),
+            sa.ForeignKey("order_status.id", ondelete="SET NULL"),
+            nullable=True,
+        ),
+        sa.Column("total_price", sa.DECIMAL(10, 2), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True)),
+        sa.Column("updated_at", sa.DateTime(timezone=True)),
+    )
+    op.create_table(
+        "order_products",
+        sa.Column("id", UUID(as_uuid=True), primary_key=True),
+        sa.Column(
+            "order_id",
+            UUID(as_uuid=True),
+            sa.ForeignKey("orders.id", ondelete="CASCADE"),
+            nullable=False,
+        ),
+        sa.Column(
+            "product_id",
+            UUID(as_uuid=True),
+            sa.ForeignKey("products.id", ondelete="SET NULL"),
+            nullable=True,
+        ),
+        sa.Column("quantity", sa.Integer(), nullable=False),
+    )
+    op.create_index("ix_order_products_order_id", "order_products", ["order_id"])
+    op.create_index("ix_order_products_product_id", "order_products", ["product_id"])
+
+
+def downgrade():
+    op.drop_table("order_products")
+    op.drop_table("orders")
+    op.drop_table("products")
+    op.drop_table("order_status")
+    op.drop_table("users")
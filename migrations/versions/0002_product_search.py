@@ -0,0 +1,49 @@
+"""product full-text and trigram search
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18
+"""
+from alembic import op
+
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.execute(
+        "ALTER TABLE products ADD COLUMN search_vector tsvector "
+        "GENERATED ALWAYS AS (to_tsvector('english', "
+        "coalesce(name, '') || ' ' || coalesce(description, ''))) STORED"
+    )
+
+    # Build the GIN indexes without blocking writes on a populated catalog.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_products_name_trgm",
+            "products",
+            ["name"],
+            postgresql_using="gin",
+            postgresql_ops={"name": "gin_trgm_ops"},
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            "ix_products_search_vector",
+            "products",
+            ["search_vector"],
+            postgresql_using="gin",
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_products_search_vector", "products", postgresql_concurrently=True
+        )
+        op.drop_index("ix_products_name_trgm", "products", postgresql_concurrently=True)
+    op.drop_column("products", "search_vector")
@@ -0,0 +1,26 @@
+"""cache versions for in-process registries
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "cache_versions",
+        sa.Column("name", sa.String(), primary_key=True),
+        sa.Column("version", sa.BigInteger(), nullable=False, server_default="0"),
+    )
+
+
+def downgrade():
+    op.drop_table("cache_versions")
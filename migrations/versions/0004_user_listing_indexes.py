@@ -0,0 +1,44 @@
+"""indexes for the paginated user listing
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18
+"""
+from alembic import op
+
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_users_created_at_id",
+            "users",
+            ["created_at", "id"],
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            "ix_users_email_prefix",
+            "users",
+            ["email"],
+            postgresql_ops={"email": "varchar_pattern_ops"},
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            "ix_users_username_prefix",
+            "users",
+            ["username"],
+            postgresql_ops={"username": "varchar_pattern_ops"},
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index("ix_users_username_prefix", "users", postgresql_concurrently=True)
+        op.drop_index("ix_users_email_prefix", "users", postgresql_concurrently=True)
+        op.drop_index("ix_users_created_at_id", "users", postgresql_concurrently=True)
@@ -0,0 +1,34 @@
+"""unique product names
+
+Product names were only unique by convention (create_product checks
+before inserting). Bulk import upserts with ON CONFLICT (name), which
+needs a unique index. Any existing duplicates must be resolved before
+this migration can run.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18
+"""
+from alembic import op
+
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_products_name_unique",
+            "products",
+            ["name"],
+            unique=True,
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index("ix_products_name_unique", "products", postgresql_concurrently=True)
@@ -0,0 +1,39 @@
+import pytest
+
+
+@pytest.fixture(scope="session")
+def engine():
+    database = pytest.importorskip("app.db.database")
+    from app.query_budget import instrument_query_budget
+
+    instrument_query_budget(database.engine)
+    return database.engine
+
+
+@pytest.fixture
+def db(engine):
+    # Runs against the configured database at the migration head; every test
+    # works inside one outer transaction that is rolled back afterwards, and
+    # the services' commits become savepoints.
+    from sqlalchemy.exc import OperationalError
+    from sqlalchemy.orm import Session
+    from app.api.services.read_cache import product_read_cache
+
+    try:
+        connection = engine.connect()
+    except OperationalError:
+        pytest.skip("needs a Postgres database migrated to head")
+    transaction = connection.begin()
+    session = Session(
+        bind=connection,
+        autoflush=False,
+        expire_on_commit=False,
+        join_transaction_mode="create_savepoint",
+    )
+    product_read_cache.invalidate()
+    try:
+        yield session
+    finally:
+        session.close()
+        transaction.rollback()
+        connection.close()
@@ -0,0 +1,92 @@
+import uuid
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+from fastapi import Request, Response
+
+from app.api.dependencies.http_cache import conditional_get, entity_tag
+
+CACHE_CONTROL = "public, max-age=60"
+
+
+def entity(created_at=datetime(2024, 5, 1, 12, 30, 15, 250000), updated_at=None):
+    return SimpleNamespace(id=uuid.uuid4(), created_at=created_at, updated_at=updated_at)
+
+
+def request(**headers) -> Request:
+    return Request({
+        "type": "http",
+        "method": "GET",
+        "path": "/",
+        "headers": [
+            (name.replace("_", "-").encode(), value.encode())
+            for name, value in headers.items()
+        ],
+    })
+
+
+def test_first_request_gets_validators():
+    response = Response()
+    item = entity()
+    assert conditional_get(request(), response, item, CACHE_CONTROL) is None
+    assert response.headers["etag"] == entity_tag(item)
+    assert response.headers["last-modified"] == "Wed, 01 May 2024 12:30:15 GMT"
+    assert response.headers["cache-control"] == CACHE_CONTROL
+
+
+def test_matching_etag_is_not_modified():
+    item = entity()
+    for if_none_match in (entity_tag(item), entity_tag(item).removeprefix("W/"),
+                          f'"other", {entity_tag(item)}', "*"):
+        not_modified = conditional_get(
+            request(if_none_match=if_none_match), Response(), item, CACHE_CONTROL
+        )
+        assert not_modified is not None
+        assert not_modified.status_code == 304
+        assert not_modified.headers["etag"] == entity_tag(item)
+
+
+def test_etag_changes_when_the_entity_is_updated():
+    item = entity()
+    stale_tag = entity_tag(item)
+    item.updated_at = item.created_at + timedelta(seconds=1)
+    response = Response()
+    assert conditional_get(
+        request(if_none_match=stale_tag), response, item, CACHE_CONTROL
+    ) is None
+    assert response.headers["etag"] != stale_tag
+
+
+def test_if_modified_since():
+    item = entity()
+    same_second = "Wed, 01 May 2024 12:30:15 GMT"
+    earlier = "Wed, 01 May 2024 12:30:14 GMT"
+    assert conditional_get(
+        request(if_modified_since=same_second), Response(), item, CACHE_CONTROL
+    ).status_code == 304
+    assert conditional_get(
+        request(if_modified_since=earlier), Response(), item, CACHE_CONTROL
+    ) is None
+    assert conditional_get(
+        request(if_modified_since="not a date"), Response(), item, CACHE_CONTROL
+    ) is None
+
+
+def test_if_none_match_takes_precedence_over_if_modified_since():
+    item = entity()
+    assert conditional_get(
+        request(if_none_match='"other"', if_modified_since="Thu, 01 May 2025 00:00:00 GMT"),
+        Response(),
+        item,
+        CACHE_CONTROL,
+    ) is None
+
+
+def test_naive_timestamps_are_treated_as_utc():
+    naive = entity(created_at=datetime(2024, 5, 1, 12, 30, 15))
+    aware = SimpleNamespace(
+        id=naive.id,
+        created_at=datetime(2024, 5, 1, 14, 30, 15, tzinfo=timezone(timedelta(hours=2))),
+        updated_at=None,
+    )
+    assert entity_tag(naive) == entity_tag(aware)
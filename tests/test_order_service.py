@@ -0,0 +1,184 @@
+import re
+import uuid
+import pytest
+
+pytest.importorskip("app.db.database")
+
+from sqlalchemy import event, select
+from app.api.exceptions.global_exceptions import StockReservationException
+from app.api.services.order_service import OrderService
+from app.api.services.order_status_registry import (
+    bump_version_statement,
+    order_status_registry,
+)
+from app.models import Order, OrderStatus, Product, User
+from app.query_budget import expect_queries
+from app.schemas.order import OrderItem
+
+
+@pytest.fixture
+def product(db):
+    if db.execute(select(OrderStatus.id).where(OrderStatus.name == "pending")).first() is None:
+        db.add(OrderStatus(name="pending"))
+    product = Product(name=f"test-order-product-{uuid.uuid4()}", price=5, stock=10)
+    db.add(product)
+    db.commit()
+    order_status_registry.invalidate()
+    return product
+
+
+def updated_at(db, product_id):
+    return db.execute(select(Product.updated_at).where(Product.id == product_id)).scalar_one()
+
+
+def test_create_order_touches_product_updated_at(db, product):
+    before = updated_at(db, product.id)
+    OrderService(db).create_order([OrderItem(product_id=product.id, quantity=1)])
+    after = updated_at(db, product.id)
+    assert after is not None and after != before
+
+
+def test_create_orders_touches_product_updated_at(db, product):
+    before = updated_at(db, product.id)
+    OrderService(db).create_orders([[OrderItem(product_id=product.id, quantity=1)]])
+    after = updated_at(db, product.id)
+    assert after is not None and after != before
+
+
+def test_create_orders_records_the_user(db, product):
+    user = User(
+        username=f"test-batch-{uuid.uuid4()}",
+        email=f"test-batch-{uuid.uuid4()}@example.com",
+        hashed_password="x",
+    )
+    db.add(user)
+    db.commit()
+    response = OrderService(db).create_orders(
+        [[OrderItem(product_id=product.id, quantity=1)]], user_id=user.id
+    )
+    order_id = response.results[0].order_id
+    assert db.execute(select(Order.user_id).where(Order.id == order_id)).scalar_one() == user.id
+
+
+def test_status_created_elsewhere_is_found_before_the_next_check(db):
+    from app.api.services.order_status_service import OrderStatusService
+
+    service = OrderStatusService(db)
+    service.refresh_registry()
+    # Inserted behind this worker's registry, as another worker would.
+    status = OrderStatus(name=f"test-status-{uuid.uuid4()}")
+    db.add(status)
+    db.execute(bump_version_statement())
+    db.commit()
+    assert service.get_status_id(status.name) == status.id
+
+
+def test_unknown_status_name_does_not_reload_the_registry(db):
+    from app.api.exceptions.global_exceptions import StatusNotFoundException
+    from app.api.services.order_status_service import OrderStatusService
+
+    service = OrderStatusService(db)
+    service.refresh_registry()
+    for _ in range(3):
+        with expect_queries(1, "unknown status lookup") as report:
+            with pytest.raises(StatusNotFoundException):
+                service.get_status_id(f"no-such-status-{uuid.uuid4()}")
+        assert all("cache_versions" in shape for shape in report.shapes)
+
+
+def stock(db, product_id):
+    return db.execute(select(Product.stock).where(Product.id == product_id)).scalar_one()
+
+
+def add_product(db, stock):
+    product = Product(name=f"test-order-product-{uuid.uuid4()}", price=5, stock=stock)
+    db.add(product)
+    db.commit()
+    return product
+
+
+def locked_ids(db, operation):
+    # Per FOR UPDATE statement, the ids in the order its lock query lists them.
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if "FOR UPDATE" in statement:
+            statements.append((statement, parameters))
+
+    connection = db.connection()
+    event.listen(connection, "before_cursor_execute", record)
+    try:
+        operation()
+    finally:
+        event.remove(connection, "before_cursor_execute", record)
+
+    locked = []
+    for statement, parameters in statements:
+        in_list = re.search(r"products\.id IN \(([^)]*)\)", statement).group(1)
+        locked.append(
+            [str(parameters[name]) for name in re.findall(r"%\((\w+)\)s", in_list)]
+        )
+    return locked
+
+
+def test_create_order_with_short_stock_fails_without_decrementing(db, product):
+    plenty = add_product(db, stock=10)
+    with pytest.raises(StockReservationException) as raised:
+        OrderService(db).create_order([
+            OrderItem(product_id=plenty.id, quantity=2),
+            OrderItem(product_id=product.id, quantity=11),
+        ])
+
+    assert raised.value.detail["failed_items"] == [{
+        "item": 2,
+        "product_id": str(product.id),
+        "reason": "Quantity for the product is higher than the stock.",
+    }]
+    assert stock(db, plenty.id) == 10
+    assert stock(db, product.id) == 10
+
+
+def test_create_order_locks_products_in_id_order(db, product):
+    other = add_product(db, stock=10)
+    items = [
+        OrderItem(product_id=product_id, quantity=1)
+        for product_id in sorted([product.id, other.id], reverse=True)
+    ]
+    [ids] = locked_ids(db, lambda: OrderService(db).create_order(items))
+    assert ids == sorted(ids) and len(ids) == 2
+    assert stock(db, product.id) == stock(db, other.id) == 9
+
+
+def test_create_orders_rejects_carts_beyond_the_remaining_stock(db, product):
+    response = OrderService(db).create_orders([
+        [OrderItem(product_id=product.id, quantity=6)],
+        [OrderItem(product_id=product.id, quantity=6)],
+        [OrderItem(product_id=product.id, quantity=4)],
+    ])
+
+    assert [result.status for result in response.results] == ["created", "failed", "created"]
+    assert response.results[1].failed_items == [{
+        "item": 1,
+        "product_id": str(product.id),
+        "reason": "Quantity for the product is higher than the stock.",
+    }]
+    assert stock(db, product.id) == 0
+
+
+def test_create_orders_with_only_failed_carts_leaves_stock_alone(db, product):
+    response = OrderService(db).create_orders(
+        [[OrderItem(product_id=product.id, quantity=11)]]
+    )
+    assert response.created == 0 and response.failed == 1
+    assert stock(db, product.id) == 10
+
+
+def test_create_orders_locks_products_in_id_order(db, product):
+    other = add_product(db, stock=10)
+    carts = [
+        [OrderItem(product_id=product_id, quantity=1)]
+        for product_id in sorted([product.id, other.id], reverse=True)
+    ]
+    locked = locked_ids(db, lambda: OrderService(db).create_orders(carts))
+    assert locked and all(ids == sorted(ids) and len(ids) == 2 for ids in locked)
+    assert stock(db, product.id) == stock(db, other.id) == 9
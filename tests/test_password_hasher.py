@@ -0,0 +1,72 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+import pytest
+from app.api.dependencies.password_hasher import PasswordHasher, _hash
+
+
+@pytest.fixture
+def hasher():
+    hasher = PasswordHasher(workers=1, queue_limit=2, timeout=5)
+    # Threads instead of spawned processes keep the test fast; the slot
+    # accounting under test is the same.
+    hasher._executor = ThreadPoolExecutor(max_workers=1)
+    yield hasher
+    hasher.shutdown()
+
+
+def test_verify_with_malformed_hash_frees_its_slot(hasher):
+    for _ in range(hasher.queue_limit + 1):
+        with pytest.raises(ValueError):
+            hasher.verify("x", "not-a-bcrypt-hash")
+    assert hasher.stats()["queue_depth"] == 0
+    assert hasher.verify("secret", _hash("secret"))
+
+
+def test_verify_async_with_malformed_hash_frees_its_slot(hasher):
+    async def verify_all():
+        for _ in range(hasher.queue_limit + 1):
+            with pytest.raises(ValueError):
+                await hasher.verify_async("x", "not-a-bcrypt-hash")
+
+    asyncio.run(verify_all())
+    assert hasher.stats()["queue_depth"] == 0
+
+
+def test_cancelled_verify_async_frees_its_slot(hasher):
+    async def cancel_verify():
+        task = asyncio.create_task(hasher.verify_async("secret", _hash("secret")))
+        await asyncio.sleep(0)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(cancel_verify())
+    hasher._executor.shutdown(wait=True)
+    assert hasher.stats()["queue_depth"] == 0
+
+
+def test_timed_out_job_keeps_its_slot_until_it_finishes(hasher):
+    hasher.timeout = 0.05
+    with pytest.raises(FutureTimeoutError):
+        hasher._run(time.sleep, 0.3)
+    stats = hasher.stats()
+    assert stats["timeouts"] == 1
+    assert stats["queue_depth"] == 1
+
+    hasher._executor.shutdown(wait=True)
+    assert hasher.stats()["queue_depth"] == 0
+
+
+def test_timed_out_async_job_keeps_its_slot_until_it_finishes(hasher):
+    hasher.timeout = 0.05
+
+    async def run():
+        with pytest.raises(asyncio.TimeoutError):
+            await hasher._run_async(time.sleep, 0.3)
+        return hasher.stats()["queue_depth"]
+
+    assert asyncio.run(run()) == 1
+    hasher._executor.shutdown(wait=True)
+    assert hasher.stats()["queue_depth"] == 0
@@ -0,0 +1,72 @@
+import csv
+import io
+import json
+import uuid
+
+import pytest
+
+pytest.importorskip("app.db.database")
+
+from sqlalchemy.orm import Session
+from app.api.services import product_export
+from app.api.services.product_export import EXPORT_FIELDS, export_products
+from app.models import Product
+from app.schemas.product import ProductSearchParams
+
+
+@pytest.fixture
+def products(db, monkeypatch):
+    # Ten rows exported three at a time: three full partitions and one short.
+    monkeypatch.setattr(product_export, "PRODUCT_EXPORT_BATCH_SIZE", 3)
+    marker = uuid.uuid4().hex
+    products = [
+        Product(name=f"test-export-{marker}-{index}", price=index + 1, stock=index)
+        for index in range(10)
+    ]
+    db.add_all(products)
+    db.commit()
+    return marker, products
+
+
+def export(db, marker: str, format: str) -> list:
+    connection = db.connection()
+    return list(
+        export_products(
+            ProductSearchParams(name=marker),
+            format,
+            session_factory=lambda: Session(
+                bind=connection, join_transaction_mode="create_savepoint"
+            ),
+        )
+    )
+
+
+def test_ndjson_export_matches_the_rows(db, products):
+    marker, created = products
+    chunks = export(db, marker, "ndjson")
+
+    assert len(chunks) == 4
+    rows = [json.loads(line) for chunk in chunks for line in chunk.splitlines()]
+    assert [row["id"] for row in rows] == sorted(str(product.id) for product in created)
+    by_id = {str(product.id): product for product in created}
+    for row in rows:
+        product = by_id[row["id"]]
+        assert list(row) == EXPORT_FIELDS
+        assert (row["name"], row["price"], row["stock"]) == (
+            product.name, float(product.price), product.stock
+        )
+
+
+def test_csv_export_writes_one_header_and_every_row_once(db, products):
+    marker, created = products
+    chunks = export(db, marker, "csv")
+
+    assert len(chunks) == 4
+    rows = list(csv.reader(io.StringIO(b"".join(chunks).decode())))
+    assert rows[0] == EXPORT_FIELDS
+    assert sorted(row[0] for row in rows[1:]) == sorted(str(product.id) for product in created)
+
+
+def test_empty_csv_export_still_has_a_header(db):
+    chunks = export(db, uuid.uuid4().hex, "csv")
+    assert b"".join(chunks).decode().splitlines() == [",".join(EXPORT_FIELDS)]
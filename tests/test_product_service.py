@@ -0,0 +1,154 @@
+import uuid
+import pytest
+
+pytest.importorskip("app.db.database")
+
+from app.api.exceptions.global_exceptions import ProductAlreadyExistsException
+from app.api.services.product_service import ProductService
+from app.query_budget import expect_queries
+from app.schemas.product import ProductCreate, ProductImportRequest, ProductSearchParams
+
+
+def new_product(**fields) -> ProductCreate:
+    values = {"name": f"test-product-{uuid.uuid4()}", "price": 9.99, "stock": 3}
+    values.update(fields)
+    return ProductCreate(**values)
+
+
+def test_create_product_is_one_statement(db):
+    with expect_queries(1, "create_product"):
+        created = ProductService(db).create_product(new_product())
+    assert created.id is not None
+
+
+def test_create_product_defaults_is_available(db):
+    created = ProductService(db).create_product(new_product())
+    assert created.is_available is True
+
+
+def test_create_product_keeps_explicit_is_available(db):
+    created = ProductService(db).create_product(new_product(is_available=False))
+    assert created.is_available is False
+
+
+def test_create_product_with_taken_name_is_one_statement(db):
+    product = new_product()
+    ProductService(db).create_product(product)
+    with expect_queries(1, "create_product conflict"):
+        with pytest.raises(ProductAlreadyExistsException):
+            ProductService(db).create_product(product)
+
+
+@pytest.mark.parametrize(
+    "filters",
+    [{"q": "shoe"}, {"name": "50%"}, {"q": "red shoe", "name": "10%_off"}],
+)
+def test_estimated_count_with_filters(db, filters):
+    page = ProductService(db).search_products(
+        ProductSearchParams(count="estimated", **filters)
+    )
+    assert page.total_products is None or page.total_products >= 0
+
+
+@pytest.mark.parametrize("sort_by", ["relevance", "name", "price", "created_at"])
+@pytest.mark.parametrize("sort_order", ["asc", "desc"])
+def test_cursor_paging_visits_every_row_once(db, sort_by, sort_order):
+    from app.models import Product
+
+    words = ["alpha", "beta", "gamma", "delta"]
+    products = [
+        Product(
+            name=f"zyxwvq {words[index % 4]} {index}",
+            description=" ".join(["zyxwvq"] * (index % 7 + 1)),
+            price=index % 5 + 1,
+            stock=1,
+        )
+        for index in range(120)
+    ]
+    db.add_all(products)
+    db.commit()
+    expected = {product.id for product in products}
+
+    seen = []
+    cursor = None
+    service = ProductService(db)
+    while True:
+        page = service.search_products(
+            ProductSearchParams(
+                q="zyxwvq",
+                page_size=20,
+                sort_by=sort_by,
+                sort_order=sort_order,
+                cursor=cursor,
+                count="none",
+            )
+        )
+        seen += [product.id for product in page.products]
+        if not page.next_cursor:
+            break
+        cursor = page.next_cursor
+
+    assert len(seen) == len(set(seen))
+    assert expected <= set(seen)
+
+
+@pytest.fixture
+def import_rows(db, monkeypatch):
+    from app.api.services import product_import
+
+    # Twelve rows in batches of five; the first two names already exist.
+    monkeypatch.setattr(product_import, "PRODUCT_IMPORT_BATCH_SIZE", 5)
+    prefix = f"test-import-{uuid.uuid4()}"
+    rows = [{"name": f"{prefix}-{index}", "price": 2, "stock": 1} for index in range(12)]
+    for row in rows[:2]:
+        ProductService(db).create_product(ProductCreate(**{**row, "price": 1}))
+    return rows
+
+
+def import_products(db, rows, on_conflict):
+    return ProductService(db).import_products(
+        ProductImportRequest(products=rows, on_conflict=on_conflict)
+    )
+
+
+def test_import_checks_existing_names_once_per_batch(db, import_rows):
+    # Per batch: one SELECT of the batch's existing names, one INSERT.
+    with expect_queries(6, "import_products") as report:
+        import_products(db, import_rows, "skip")
+    existing_checks = [
+        shape for shape in report.shapes if shape.startswith("SELECT products.name")
+    ]
+    assert len(existing_checks) == 1
+    assert report.shapes[existing_checks[0]] == 3
+
+
+@pytest.mark.parametrize(
+    "on_conflict, expected",
+    [
+        ("error", {"created": 10, "updated": 0, "skipped": 0, "failed": 2}),
+        ("skip", {"created": 10, "updated": 0, "skipped": 2, "failed": 0}),
+        ("update", {"created": 10, "updated": 2, "skipped": 0, "failed": 0}),
+    ],
+)
+def test_import_reports_conflicting_rows(db, import_rows, on_conflict, expected):
+    from app.models import Product
+
+    response = import_products(db, import_rows, on_conflict)
+
+    assert response.model_dump(exclude={"errors"}) == expected
+    if on_conflict == "error":
+        assert [error.index for error in response.errors] == [0, 1]
+    prices = dict(
+        db.query(Product.name, Product.price)
+        .filter(Product.name.in_([row["name"] for row in import_rows]))
+        .all()
+    )
+    assert len(prices) == 12
+    conflicting_price = 2 if on_conflict == "update" else 1
+    assert [prices[row["name"]] for row in import_rows[:2]] == [conflicting_price] * 2
+
+
+def test_import_reports_duplicate_names_within_the_request(db, import_rows):
+    response = import_products(db, import_rows[2:] + [import_rows[5]], "error")
+    assert response.created == 10
+    assert [error.index for error in response.errors] == [10]
@@ -0,0 +1,37 @@
+import pytest
+from app.query_budget import (
+    QueryBudgetExceeded,
+    QueryReport,
+    _tracker,
+    expect_queries,
+    statement_shape,
+)
+
+
+def test_statement_shape_collapses_in_lists():
+    assert statement_shape("SELECT * FROM t WHERE id IN (%(id_1)s, %(id_2)s)") == (
+        statement_shape("SELECT *\n  FROM t WHERE id IN (%(id_1)s, %(id_2)s, %(id_3)s)")
+    )
+
+
+def test_repeated_shapes_are_flagged():
+    report = QueryReport("test")
+    for _ in range(3):
+        report.record("SELECT * FROM products WHERE id = %(id_1)s")
+    report.record("SELECT * FROM orders")
+    assert report.repeated(threshold=3) == {
+        "SELECT * FROM products WHERE id = %(id_1)s": 3
+    }
+
+
+def test_expect_queries_raises_over_budget():
+    with pytest.raises(QueryBudgetExceeded):
+        with expect_queries(1, "two statements"):
+            _tracker.get().record("SELECT 1")
+            _tracker.get().record("SELECT 2")
+
+
+def test_expect_queries_within_budget():
+    with expect_queries(1) as report:
+        _tracker.get().record("SELECT 1")
+    assert report.count == 1
@@ -0,0 +1,157 @@
+import asyncio
+import time
+import uuid
+
+import pytest
+
+from app.api.services.read_cache import (
+    MemoryBackend,
+    NullBackend,
+    ProductReadCache,
+    RedisBackend,
+)
+
+SEARCH_PARAMS = ("widget", None, None, "relevance", "desc", 20, 0)
+
+
+@pytest.fixture
+def redis_backend(monkeypatch):
+    fakeredis = pytest.importorskip("fakeredis")
+    import redis
+    import redis.asyncio
+
+    server = fakeredis.FakeServer()
+    monkeypatch.setattr(
+        redis.Redis, "from_url",
+        lambda url, **kwargs: fakeredis.FakeRedis(server=server, **kwargs),
+    )
+    monkeypatch.setattr(
+        redis.asyncio.Redis, "from_url",
+        lambda url, **kwargs: fakeredis.FakeAsyncRedis(server=server, **kwargs),
+    )
+    return RedisBackend("redis://cache.invalid:6379/0")
+
+
+@pytest.fixture(params=["memory", "redis"])
+def cache(request):
+    if request.param == "memory":
+        return ProductReadCache(MemoryBackend(max_entries=100), ttl=30)
+    return ProductReadCache(request.getfixturevalue("redis_backend"), ttl=30)
+
+
+def test_product_round_trip_and_invalidate(cache):
+    product_id = uuid.uuid4()
+    generation, value = cache.get_product(product_id)
+    assert value is None
+
+    cache.set_product(product_id, '{"name": "Widget"}', generation)
+    assert cache.get_product(product_id)[1] == '{"name": "Widget"}'
+
+    cache.invalidate([product_id])
+    assert cache.get_product(product_id)[1] is None
+    assert cache.stats()["product"] == {"hits": 1, "misses": 2, "hit_rate": 0.3333}
+
+
+def test_invalidate_bumps_search_generation(cache):
+    generation, key, value = cache.get_search(SEARCH_PARAMS)
+    assert value is None
+    cache.set_search(key, '{"items": []}', generation)
+    assert cache.get_search(SEARCH_PARAMS)[2] == '{"items": []}'
+
+    cache.invalidate()
+
+    new_generation, new_key, value = cache.get_search(SEARCH_PARAMS)
+    assert new_generation != generation
+    assert new_key != key
+    assert value is None
+
+
+def test_read_that_raced_a_write_is_not_stored(cache):
+    product_id = uuid.uuid4()
+    generation, _ = cache.get_product(product_id)
+    _, key, _ = cache.get_search(SEARCH_PARAMS)
+
+    # A write commits and invalidates while the read is still querying.
+    cache.invalidate([product_id])
+    cache.set_product(product_id, '{"name": "Stale"}', generation)
+    cache.set_search(key, '{"items": ["stale"]}', generation)
+
+    assert cache.get_product(product_id)[1] is None
+    assert cache.backend.get(key) is None
+
+
+def test_async_round_trip_and_invalidate(cache):
+    product_id = uuid.uuid4()
+
+    async def scenario():
+        generation, value = await cache.aget_product(product_id)
+        assert value is None
+        await cache.aset_product(product_id, '{"name": "Widget"}', generation)
+        assert (await cache.aget_product(product_id))[1] == '{"name": "Widget"}'
+
+        generation, key, _ = await cache.aget_search(SEARCH_PARAMS)
+        await cache.ainvalidate([product_id])
+        await cache.aset_search(key, '{"items": ["stale"]}', generation)
+        assert (await cache.aget_product(product_id))[1] is None
+        assert (await cache.aget_search(SEARCH_PARAMS))[2] is None
+
+    asyncio.run(scenario())
+
+
+def test_memory_entries_expire_after_ttl():
+    backend = MemoryBackend(max_entries=100)
+    backend.set("key", "value", ttl=0.05)
+    assert backend.get("key") == "value"
+    time.sleep(0.1)
+    assert backend.get("key") is None
+
+
+def test_memory_evicts_least_recently_used():
+    backend = MemoryBackend(max_entries=2)
+    backend.set("a", "1", ttl=30)
+    backend.set("b", "2", ttl=30)
+    backend.get("a")
+    backend.set("c", "3", ttl=30)
+    assert backend.get("a") == "1"
+    assert backend.get("b") is None
+
+
+def test_memory_generation_is_never_evicted():
+    backend = MemoryBackend(max_entries=1)
+    backend.incr("generation")
+    backend.set("a", "1", ttl=30)
+    backend.set("b", "2", ttl=30)
+    assert backend.get("generation") == "1"
+
+
+def test_redis_entries_carry_ttl(redis_backend):
+    cache = ProductReadCache(redis_backend, ttl=30)
+    product_id = uuid.uuid4()
+    cache.set_product(product_id, "{}", cache.get_product(product_id)[0])
+    ttl_ms = redis_backend._client.pttl(cache.product_key(product_id))
+    assert 0 < ttl_ms <= 30_000
+
+
+def test_redis_errors_are_counted_as_misses(redis_backend, monkeypatch):
+    import redis
+
+    def unreachable(*args, **kwargs):
+        raise redis.ConnectionError("unreachable")
+
+    monkeypatch.setattr(redis_backend._client, "get", unreachable)
+    cache = ProductReadCache(redis_backend, ttl=30)
+    assert cache.get_product(uuid.uuid4()) == (None, None)
+    assert cache.stats()["errors"] == 2
+
+
+def test_null_backend_never_stores():
+    cache = ProductReadCache(NullBackend(), ttl=30)
+    product_id = uuid.uuid4()
+    generation, _ = cache.get_product(product_id)
+    cache.set_product(product_id, "{}", generation)
+    assert cache.get_product(product_id)[1] is None
+
+    generation, key, _ = cache.get_search(SEARCH_PARAMS)
+    cache.set_search(key, "{}", generation)
+    cache.invalidate([product_id])
+    assert cache.get_search(SEARCH_PARAMS)[2] is None
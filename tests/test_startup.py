@@ -0,0 +1,11 @@
+import pytest
+
+pytest.importorskip("app.db.database")
+
+from benchmarks.startup import import_once, probe_environment
+
+
+def test_importing_the_app_needs_no_database():
+    elapsed_ms, connections, _ = import_once(probe_environment())
+    assert connections == 0
+    assert elapsed_ms < 5000
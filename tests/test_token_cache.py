@@ -0,0 +1,17 @@
+import time
+
+from app.api.dependencies.token_cache import VerifiedTokenCache
+
+
+def test_entries_expire_at_ttl_before_token_exp():
+    cache = VerifiedTokenCache(ttl=0.05, max_entries=10)
+    cache.put("token", {"sub": "user", "exp": time.time() + 3600})
+    assert cache.get("token")["sub"] == "user"
+    time.sleep(0.1)
+    assert cache.get("token") is None
+
+
+def test_entries_expire_at_token_exp_before_ttl():
+    cache = VerifiedTokenCache(ttl=3600, max_entries=10)
+    cache.put("token", {"sub": "user", "exp": time.time() - 1})
+    assert cache.get("token") is None
@@ -0,0 +1,106 @@
+import json
+import uuid
+from datetime import datetime
+
+import pytest
+
+pytest.importorskip("app.db.database")
+
+from app.api.exceptions.global_exceptions import EmailAlreadyExistsException
+from app.api.services import user_service
+from app.api.services.user_service import UserService, stream_users
+from app.models import User
+from app.query_budget import expect_queries
+from app.schemas.user import UserCreateRequest, UserListParams
+
+PASSWORD = "Secret-pass1"
+
+
+def add_users(db, count: int, created_at=None) -> list:
+    prefix = f"test-user-{uuid.uuid4()}"
+    users = [
+        User(
+            username=f"{prefix}-{index}",
+            email=f"{prefix}-{index}@example.com",
+            hashed_password="x",
+            created_at=created_at or datetime.utcnow(),
+        )
+        for index in range(count)
+    ]
+    db.add_all(users)
+    db.commit()
+    return users
+
+
+def test_list_users_pages_through_tied_created_at(db):
+    users = add_users(db, 7, created_at=datetime(2024, 1, 1, 12, 0, 0))
+    prefix = users[0].email.rsplit("-", 1)[0]
+
+    seen = []
+    cursor = None
+    service = UserService(db)
+    while True:
+        page = service.list_users(
+            UserListParams(email_prefix=prefix, limit=2, cursor=cursor)
+        )
+        assert len(page.users) <= 2
+        seen += [user.id for user in page.users]
+        if not page.has_more:
+            break
+        cursor = page.next_cursor
+
+    # Ties on created_at are broken by id, so no row is skipped or repeated.
+    assert seen == sorted(user.id for user in users)
+
+
+def test_create_user_with_taken_email_is_one_statement(db):
+    email = f"test-user-{uuid.uuid4()}@example.com"
+    service = UserService(db)
+    service.create_user(UserCreateRequest(username="first", email=email, password=PASSWORD))
+
+    with expect_queries(1, "create_user conflict"):
+        with pytest.raises(EmailAlreadyExistsException):
+            service.create_user(
+                UserCreateRequest(username="second", email=email, password=PASSWORD)
+            )
+    assert db.query(User).filter(User.email == email).one().username == "first"
+
+
+def test_stream_users_writes_one_json_line_per_user(db, monkeypatch):
+    from sqlalchemy import event
+    from sqlalchemy.orm import Session
+
+    users = add_users(db, 5)
+    prefix = users[0].email.rsplit("-", 1)[0]
+    monkeypatch.setattr(user_service, "USER_STREAM_BATCH_SIZE", 2)
+
+    executions = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if "FROM users" in statement:
+            executions.append((context.execution_options.get("yield_per"), cursor.name))
+
+    connection = db.connection()
+    event.listen(connection, "after_cursor_execute", record)
+    try:
+        lines = list(
+            stream_users(
+                UserListParams(email_prefix=prefix),
+                session_factory=lambda: Session(
+                    bind=connection, join_transaction_mode="create_savepoint"
+                ),
+            )
+        )
+    finally:
+        event.remove(connection, "after_cursor_execute", record)
+
+    assert all(line.endswith(b"\n") and line.count(b"\n") == 1 for line in lines)
+    streamed = [json.loads(line) for line in lines]
+    ordered = sorted(users, key=lambda user: (user.created_at, user.id))
+    assert [row["email"] for row in streamed] == [user.email for user in ordered]
+    assert all("hashed_password" not in row for row in streamed)
+    # One query on a named (server-side) cursor, fetched two rows at a time.
+    assert len(executions) == 1
+    yield_per, cursor_name = executions[0]
+    assert yield_per == 2
+    assert cursor_name is not None